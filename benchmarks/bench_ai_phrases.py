@@ -0,0 +1,95 @@
+"""Benchmark: AI phrase detection cost as the phrase list grows.
+
+Compares the compiled matcher against the previous per-line, per-phrase
+loop on the same synthetic source text, then a RULE_COUNT-entry list of
+plain phrases against one of the same size that is mostly regex and fuzzy
+rules. Run with::
+
+    python benchmarks/bench_ai_phrases.py
+"""
+import random
+import time
+from pathlib import Path
+
+from vibe_sweeper.detectors.ai_phrases import compile_phrases, detect_ai_phrases
+
+PHRASE_COUNTS = (6, 50, 500, 2000)
+RULE_COUNT = 10_000
+LINES = 50_000
+SEED = 1234
+
+
+def legacy_detect(path: Path, text: str, phrases):
+    results = []
+    for idx, line in enumerate(text.lower().splitlines(), start=1):
+        for phrase in phrases:
+            if phrase in line:
+                results.append({"file": str(path), "line": idx, "phrase": phrase, "kind": "ai_phrase"})
+    return results
+
+
+def make_corpus(rnd: random.Random):
+    vocab = ["".join(rnd.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rnd.randint(2, 9))) for _ in range(5000)]
+    lines = []
+    for i in range(LINES):
+        words = " ".join(rnd.choice(vocab) for _ in range(rnd.randint(3, 10)))
+        lines.append(f"    # {words}" if i % 4 == 0 else f"    value_{i} = compute({words!r})")
+    return vocab, "\n".join(lines)
+
+
+def best_of(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    rnd = random.Random(SEED)
+    vocab, text = make_corpus(rnd)
+    path = Path("bench.py")
+    print(f"corpus: {LINES} lines, {len(text) / 1e6:.1f} MB")
+    print(f"{'phrases':>8} {'compile s':>10} {'compiled s':>11} {'legacy s':>9} {'speedup':>8}")
+    for count in PHRASE_COUNTS:
+        phrases = [" ".join(rnd.choice(vocab) for _ in range(rnd.randint(2, 5))) for _ in range(count)]
+        start = time.perf_counter()
+        matcher = compile_phrases(phrases)
+        compile_s = time.perf_counter() - start
+        compiled_s = best_of(lambda: detect_ai_phrases(path, text, matcher))
+        legacy_s = best_of(lambda: legacy_detect(path, text, phrases), repeat=1)
+        assert detect_ai_phrases(path, text, matcher) == legacy_detect(path, text, phrases)
+        print(f"{count:>8} {compile_s:>10.3f} {compiled_s:>11.3f} {legacy_s:>9.3f} {legacy_s / compiled_s:>7.1f}x")
+
+    print(f"\n{RULE_COUNT} entries")
+    print(f"{'entries':>8} {'compile s':>10} {'scan s':>8} {'findings':>9}")
+    for label, entries in (("phrases", make_phrases(rnd, vocab)), ("rules", make_rules(rnd, vocab))):
+        start = time.perf_counter()
+        matcher = compile_phrases(entries)
+        compile_s = time.perf_counter() - start
+        scan_s = best_of(lambda: detect_ai_phrases(path, text, matcher))
+        found = len(detect_ai_phrases(path, text, matcher))
+        print(f"{label:>8} {compile_s:>10.3f} {scan_s:>8.3f} {found:>9}")
+
+
+def make_phrases(rnd: random.Random, vocab):
+    return [" ".join(rnd.choice(vocab) for _ in range(rnd.randint(2, 4))) for _ in range(RULE_COUNT)]
+
+
+def make_rules(rnd: random.Random, vocab):
+    """A quarter plain phrases, half regexes with alternations, a quarter fuzzy phrases."""
+    rules = []
+    for i in range(RULE_COUNT):
+        words = [rnd.choice(vocab) for _ in range(rnd.randint(2, 4))]
+        if i % 4 == 0:
+            rules.append(" ".join(words))
+        elif i % 4 == 3:
+            rules.append({"fuzzy": ", ".join(words)})
+        else:
+            rules.append({"regex": rf"\b{words[0]} {words[1]}(?:\s+(?:{rnd.choice(vocab)}|{rnd.choice(vocab)}))?\b"})
+    return rules
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Benchmark: loading a large baseline and filtering findings against it.
+
+Writes a synthetic project of FILES files holding FINDINGS AI phrase
+findings in total, records its baseline, and times loading the baseline
+file, filtering every finding against it (re-reading each file once) and,
+for comparison, the same filter without a baseline (only the check for
+``vibe: ignore`` markers). Run with::
+
+    python benchmarks/bench_baseline.py
+"""
+import tempfile
+import time
+from pathlib import Path
+
+from vibe_sweeper.baseline import Baseline, FindingFilter
+from vibe_sweeper.findings import AI_PHRASE, Finding
+
+FINDINGS = 500_000
+FILES = 5_000
+PHRASE = "as an ai language model"
+
+
+def make_project(root: Path):
+    per_file = FINDINGS // FILES
+    reports = []
+    for i in range(FILES):
+        path = root / f"pkg_{i % 50}" / f"module_{i}.py"
+        path.parent.mkdir(exist_ok=True)
+        lines = [f"# As an AI language model, note {n} of module {i}" for n in range(per_file)]
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        reports.append((path, [Finding(str(path), AI_PHRASE, n + 1, phrase=PHRASE) for n in range(per_file)]))
+    return reports
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        reports = make_project(root)
+        recorded = set()
+        collector = FindingFilter(root, collect=recorded)
+        _, record_time = timed(lambda: [collector.filter(path, findings) for path, findings in reports])
+        target = root / ".vibe-baseline"
+        _, save_time = timed(lambda: Baseline(recorded).save(target))
+
+        baseline, load_time = timed(lambda: Baseline.load(target))
+        finding_filter = FindingFilter(root, baseline=baseline)
+        kept, filter_time = timed(lambda: sum(len(finding_filter.filter(p, f)) for p, f in reports))
+        plain = FindingFilter(root)
+        _, plain_time = timed(lambda: [plain.filter(path, findings) for path, findings in reports])
+
+        print(f"{len(baseline)} fingerprints, {target.stat().st_size / 1e6:.1f} MB baseline")
+        print(f"  record      {record_time * 1000:8.1f} ms")
+        print(f"  save        {save_time * 1000:8.1f} ms")
+        print(f"  load        {load_time * 1000:8.1f} ms")
+        print(f"  filter      {filter_time * 1000:8.1f} ms   {kept} new")
+        print(f"  no baseline {plain_time * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Benchmark: language-aware comment lexing against the plain prefix check.
+
+Runs the long comment block detector over the same sources twice, once with
+the lexer for their language and once with ``PREFIX_SYNTAX`` (any line
+starting with ``#``, ``//``, ``/*`` or ``*``, the behaviour before the
+lexer), on both the byte path and the text path. The sources are the
+standard library's own modules, which are heavy in docstrings, and a
+synthetic file with a comment every fourth line.
+
+A second table times the two ways of classifying the lines between
+multi-line tokens, the NumPy arrays (when NumPy is installed) and the regex
+fallback, over a generated source of two million lines in which comments
+come in runs of one to three lines and, rarely, forty. Run with::
+
+    python benchmarks/bench_comments.py
+"""
+import glob
+import os
+import random
+import time
+from pathlib import Path
+
+from vibe_sweeper.detectors import CommentBlockLineDetector
+from vibe_sweeper.detectors import lexer
+from vibe_sweeper.detectors.lexer import PREFIX_SYNTAX, syntax_for
+from vibe_sweeper.scanner import MappedText
+
+SEED = 1234
+REPEATS = 3
+
+
+def stdlib_source() -> str:
+    lib = os.path.dirname(os.__file__)
+    parts = []
+    for name in sorted(glob.glob(os.path.join(lib, "*.py"))):
+        with open(name, encoding="utf-8", errors="replace") as handle:
+            parts.append(handle.read().rstrip("\n") + "\n")
+    return "".join(parts)
+
+
+def synthetic_source(rnd: random.Random, lines: int = 200_000) -> str:
+    vocab = ["".join(rnd.choice("abcdefghij") for _ in range(rnd.randint(2, 9))) for _ in range(500)]
+    out = []
+    for j in range(lines):
+        words = " ".join(rnd.choice(vocab) for _ in range(rnd.randint(3, 10)))
+        out.append(f"    # {words}" if j % 4 == 0 else f"    value_{j} = compute({words!r}, 'x')")
+    return "\n".join(out) + "\n"
+
+
+def generated_source(rnd: random.Random, lines: int = 2_000_000) -> str:
+    out = []
+    while len(out) < lines:
+        run = 40 if rnd.random() < 0.01 else rnd.choice((1, 1, 2, 3))
+        out.extend(f"    # generated note {len(out)}" for _ in range(run))
+        out.extend(f"    field_{len(out)} = Field({len(out)}, 'x')" for _ in range(rnd.randint(1, 6)))
+    return "\n".join(out) + "\n"
+
+
+def best(fn) -> float:
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def bench(label: str, path: Path, text: str):
+    data = text.encode("utf-8")
+    lines = text.splitlines()
+    print(f"{label}: {len(data) / 1e6:.1f} MB, {len(lines)} lines")
+    for name, syntax in (("prefix", PREFIX_SYNTAX), ("lexer", syntax_for(path))):
+        found = len(CommentBlockLineDetector(path, syntax=syntax).scan_bytes(MappedText(data)))
+        byte_time = best(lambda: CommentBlockLineDetector(path, syntax=syntax).scan_bytes(MappedText(data)))
+
+        def feed():
+            detector = CommentBlockLineDetector(path, syntax=syntax)
+            for start in range(0, len(lines), 1000):
+                detector.feed(start + 1, lines[start : start + 1000])
+            detector.finish()
+
+        text_time = best(feed)
+        print(f"  {name:<7} bytes {byte_time * 1000:7.1f} ms   text {text_time * 1000:7.1f} ms   {found} blocks")
+
+
+def bench_classifiers(label: str, path: Path, text: str):
+    data = text.encode("utf-8")
+    lines = text.splitlines()
+    print(f"{label}: {len(data) / 1e6:.1f} MB, {len(lines)} lines")
+    has_numpy = lexer._load_numpy() is not None
+    for name, min_chars in (("regex", 1 << 62), ("numpy", lexer.NUMPY_MIN_CHARS)):
+        if name == "numpy" and not has_numpy:
+            print("  numpy   not installed")
+            continue
+        saved, lexer.NUMPY_MIN_CHARS = lexer.NUMPY_MIN_CHARS, min_chars
+        try:
+            found = len(CommentBlockLineDetector(path).scan_bytes(MappedText(data)))
+            byte_time = best(lambda: CommentBlockLineDetector(path).scan_bytes(MappedText(data)))
+
+            def feed():
+                detector = CommentBlockLineDetector(path)
+                for start in range(0, len(lines), 1000):
+                    detector.feed(start + 1, lines[start : start + 1000])
+                detector.finish()
+
+            text_time = best(feed)
+        finally:
+            lexer.NUMPY_MIN_CHARS = saved
+        print(f"  {name:<7} bytes {byte_time * 1000:7.1f} ms   text {text_time * 1000:7.1f} ms   {found} blocks")
+
+
+def main():
+    rnd = random.Random(SEED)
+    bench("stdlib modules", Path("stdlib.py"), stdlib_source())
+    synthetic = synthetic_source(rnd)
+    bench("synthetic python", Path("synthetic.py"), synthetic)
+    bench("synthetic javascript", Path("synthetic.js"), synthetic.replace("    # ", "    // "))
+    print()
+    bench_classifiers("generated python", Path("generated.py"), generated_source(rnd))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Benchmark: byte-level (mmap) scanning against the text read path.
+
+Scans the same synthetic files three ways: ``read_file_text`` plus the
+whole-text detectors (the original path), the streamed line batches, and
+the zero-copy byte path. Reports wall time and the peak traced allocation
+of each. Run with::
+
+    python benchmarks/bench_mmap.py
+"""
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from vibe_sweeper.config import load_default_config
+from vibe_sweeper.detectors import detect_ai_phrases, detect_long_comment_blocks
+from vibe_sweeper.engine import analyze_file
+from vibe_sweeper.scanner import read_file_text
+
+FILES = 200
+SEED = 1234
+# Lines per file, from small modules to large generated sources.
+SIZES = (40, 400, 4000, 20000)
+
+
+def make_tree(root: Path, rnd: random.Random):
+    vocab = ["".join(rnd.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rnd.randint(2, 9))) for _ in range(2000)]
+    files = []
+    for i in range(FILES):
+        lines = []
+        for j in range(SIZES[i % len(SIZES)]):
+            words = " ".join(rnd.choice(vocab) for _ in range(rnd.randint(3, 10)))
+            lines.append(f"    # {words}" if j % 4 == 0 else f"    value_{j} = compute({words!r})")
+        path = root / f"mod_{i}.py"
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        files.append(path)
+    return files
+
+
+def text_path(files, cfg):
+    findings = []
+    for path in files:
+        text = read_file_text(path)
+        findings.extend(detect_ai_phrases(path, text, cfg["ai_phrases"]))
+        findings.extend(detect_long_comment_blocks(path, text, cfg["max_comment_block_lines"]))
+    return findings
+
+
+def engine_path(files, cfg):
+    findings = []
+    for path in files:
+        findings.extend(analyze_file(path, cfg))
+    return findings
+
+
+def measure(fn, *args):
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    root = Path(tempfile.mkdtemp(prefix="vibe-bench-"))
+    try:
+        files = make_tree(root, random.Random(SEED))
+        total = sum(p.stat().st_size for p in files)
+        # Keep the largest files in play.
+        cfg = dict(load_default_config(), max_file_bytes=0)
+        print(f"corpus: {len(files)} files, {total / 1e6:.1f} MB")
+        print(f"{'path':>10} {'seconds':>8} {'MB/s':>7} {'peak alloc MB':>14}")
+        runs = {
+            "read_text": (text_path, dict(cfg)),
+            "stream": (engine_path, dict(cfg, mmap=False)),
+            "mmap": (engine_path, dict(cfg, mmap=True)),
+        }
+        for name, (fn, run_cfg) in runs.items():
+            seconds, peak = measure(fn, files, run_cfg)
+            print(f"{name:>10} {seconds:>8.3f} {total / 1e6 / seconds:>7.1f} {peak / 1e6:>14.2f}")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark: building the report in memory against streaming it.
+
+Writes a Markdown report of FINDINGS synthetic findings to a temporary file
+the old way (collect every finding, join one string, write it) and through
+MarkdownReportWriter while the findings are produced. Reports the time to
+the first byte on disk, the total time and the peak traced allocation.
+Run with::
+
+    python benchmarks/bench_report.py
+"""
+import os
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from vibe_sweeper.findings import AI_PHRASE, LONG_COMMENT_BLOCK, Finding
+from vibe_sweeper.report import MarkdownReportWriter, build_markdown_report
+
+FINDINGS = 1_000_000
+FILES = 10_000
+
+
+def produce():
+    files = [f"/repo/src/pkg_{i % 97}/module_{i}.py" for i in range(FILES)]
+    for n in range(FINDINGS):
+        file = files[n % FILES]
+        if n % 5:
+            yield Finding(file, AI_PHRASE, n, phrase="as an ai language model")
+        else:
+            yield Finding(file, LONG_COMMENT_BLOCK, n, end_line=n + 30, lines=31, preview="# ...")
+
+
+def in_memory(path: Path, first_byte):
+    findings = list(produce())
+    report = build_markdown_report(Path("/repo"), range(FILES), findings)
+    with open(path, "w", encoding="utf-8") as out:
+        out.write(report[:1])
+        out.flush()
+        first_byte.append(time.perf_counter())
+        out.write(report[1:])
+
+
+def streamed(path: Path, first_byte):
+    with open(path, "w", encoding="utf-8") as out:
+        writer = MarkdownReportWriter(out, Path("/repo"), patch_summary=True)
+        writer.begin()
+        out.flush()
+        first_byte.append(time.perf_counter())
+        for finding in produce():
+            writer.add(finding)
+        writer.end(FILES)
+
+
+def measure(fn, path: Path):
+    first_byte = []
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn(path, first_byte)
+    total = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return first_byte[0] - start, total, peak, os.path.getsize(path)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{FINDINGS} findings")
+        print(f"{'writer':>10} {'first byte s':>13} {'total s':>8} {'peak MB':>8} {'report MB':>10}")
+        for name, fn in (("in-memory", in_memory), ("streamed", streamed)):
+            ttfb, total, peak, size = measure(fn, Path(tmp) / f"{name}.md")
+            print(f"{name:>10} {ttfb:>13.3f} {total:>8.2f} {peak / 1e6:>8.1f} {size / 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
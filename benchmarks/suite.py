@@ -0,0 +1,205 @@
+"""Benchmark suite: scan throughput on a synthetic repository.
+
+Generates a deterministic repository (see ``synthrepo.py``) and times each
+scenario in a fresh interpreter, so peak RSS is measured per scenario:
+
+- ``walk``: ``walk_project`` over the tree
+- ``read``: ``read_file_text`` of every file
+- ``detect``: ``analyze_file`` of every file (serial, no cache)
+- ``report``: streaming the findings through every report format
+- ``cli``: ``vibe-sweeper scan --no-cache`` end to end, as a subprocess
+
+Each scenario records the best wall time of ``--repeat`` runs, files/sec and
+MB/sec over the whole corpus, and peak RSS. Results are compared with the
+stored baseline (``baseline.json`` next to this file); a throughput drop or
+RSS growth beyond ``--tolerance`` is reported as a regression and makes the
+suite exit with status 1. Baselines are machine-specific: record one with
+``--save-baseline`` on the machine you compare on. Run with::
+
+    python benchmarks/suite.py
+    python benchmarks/suite.py --scenarios detect,cli --files 5000
+    python benchmarks/suite.py --save-baseline
+"""
+import argparse
+import io
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from synthrepo import RepoSpec, generate_repo
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SCENARIOS = ("walk", "read", "detect", "report", "cli")
+BASELINE = Path(__file__).with_name("baseline.json")
+# Metrics where a higher value is better; everything else is lower-is-better.
+HIGHER_IS_BETTER = ("files_per_sec", "mb_per_sec")
+COMPARED = HIGHER_IS_BETTER + ("peak_rss_mb",)
+
+
+def _peak_rss_mb(who: int) -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def _best_of(fn: Callable[[], None], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _scenario(name: str, root: Path, repeat: int) -> Dict:
+    """Run one scenario in this process and return its raw measurements."""
+    from vibe_sweeper.config import load_default_config
+    from vibe_sweeper.engine import analyze_file
+    from vibe_sweeper.report import REPORT_FORMATS, create_writer
+    from vibe_sweeper.scanner import read_file_text, walk_project
+
+    files = walk_project(root)
+    cfg = load_default_config()
+    rss_of = resource.RUSAGE_SELF if resource else 0
+    extra: Dict = {}
+
+    if name == "walk":
+        seconds = _best_of(lambda: walk_project(root), repeat)
+    elif name == "read":
+        seconds = _best_of(lambda: [read_file_text(p) for p in files], repeat)
+    elif name == "detect":
+        seconds = _best_of(lambda: [analyze_file(p, cfg) for p in files], repeat)
+        extra["findings"] = sum(len(analyze_file(p, cfg)) for p in files)
+    elif name == "report":
+        findings = [f for p in files for f in analyze_file(p, cfg)]
+
+        def write_all():
+            for fmt in REPORT_FORMATS:
+                writer = create_writer(fmt, io.StringIO(), root)
+                writer.begin()
+                for finding in findings:
+                    writer.add(finding)
+                writer.end(len(files))
+
+        seconds = _best_of(write_all, repeat)
+        extra["findings"] = len(findings)
+    elif name == "cli":
+        out = root.parent / "report.md"
+        command = [sys.executable, "-m", "vibe_sweeper.cli", "scan", str(root), "--no-cache", "-o", str(out)]
+        seconds = _best_of(lambda: subprocess.run(command, check=True, stdout=subprocess.DEVNULL), repeat)
+        rss_of = resource.RUSAGE_CHILDREN if resource else 0
+    else:
+        raise ValueError(f"unknown scenario: {name}")
+
+    return {"seconds": seconds, "peak_rss_mb": _peak_rss_mb(rss_of), **extra}
+
+
+def _run_isolated(name: str, root: Path, repeat: int) -> Dict:
+    command = [sys.executable, __file__, "--_child", name, "--_root", str(root), "--repeat", str(repeat)]
+    done = subprocess.run(command, check=True, capture_output=True, text=True)
+    return json.loads(done.stdout)
+
+
+def _compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for metric in COMPARED:
+            new, old = result.get(metric), base.get(metric)
+            if not new or not old:
+                continue
+            change = new / old - 1
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            if worse > tolerance:
+                regressions.append(f"{name}.{metric}: {old:.1f} -> {new:.1f} ({change:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated scenarios to run.")
+    parser.add_argument("--files", type=int, default=RepoSpec.files)
+    parser.add_argument("--lines-per-file", type=int, default=RepoSpec.lines_per_file)
+    parser.add_argument("--seed", type=int, default=RepoSpec.seed)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario; the fastest counts.")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression.")
+    parser.add_argument("--json", type=Path, help="Also write the results to this file.")
+    parser.add_argument("--_child", help=argparse.SUPPRESS)
+    parser.add_argument("--_root", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args._child:
+        print(json.dumps(_scenario(args._child, args._root, args.repeat)))
+        return 0
+
+    names = [n for n in args.scenarios.split(",") if n]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    spec = RepoSpec(files=args.files, lines_per_file=args.lines_per_file, seed=args.seed)
+    tmp = Path(tempfile.mkdtemp(prefix="vibe-bench-"))
+    try:
+        manifest = generate_repo(tmp / "repo", spec)
+        mb = manifest.bytes / 1e6
+        print(f"corpus: {len(manifest.files)} files, {mb:.1f} MB (seed {spec.seed})")
+        print(f"{'scenario':>9} {'seconds':>8} {'files/s':>9} {'MB/s':>7} {'peak RSS MB':>12}")
+        results = {}
+        for name in names:
+            raw = _run_isolated(name, tmp / "repo", args.repeat)
+            seconds = raw.pop("seconds")
+            results[name] = {
+                "seconds": round(seconds, 4),
+                "files_per_sec": round(len(manifest.files) / seconds, 1),
+                "mb_per_sec": round(mb / seconds, 2),
+                **raw,
+            }
+            rss = raw.get("peak_rss_mb")
+            rss_text = f"{rss:.1f}" if rss is not None else "n/a"
+            r = results[name]
+            print(f"{name:>9} {seconds:>8.3f} {r['files_per_sec']:>9.0f} {r['mb_per_sec']:>7.1f} {rss_text:>12}")
+    finally:
+        shutil.rmtree(tmp)
+
+    document = {"spec": spec.as_dict(), "python": sys.version.split()[0], "results": results}
+    if args.json:
+        args.json.write_text(json.dumps(document, indent=2) + "\n", encoding="utf-8")
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(document, indent=2) + "\n", encoding="utf-8")
+        print(f"baseline written to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print("no baseline to compare with (use --save-baseline)")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    if baseline.get("spec") != spec.as_dict():
+        print(f"baseline was recorded with a different corpus; not comparing ({args.baseline})")
+        return 0
+    regressions = _compare(results, baseline["results"], args.tolerance)
+    if regressions:
+        print(f"regressions against {args.baseline} (tolerance {args.tolerance:.0%}):")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"no regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""Deterministic synthetic repositories for the benchmarks.
+
+``generate_repo(root, spec)`` writes a tree of source files whose size,
+language mix, comment-block density and AI phrase hit rate are set by a
+RepoSpec. The same spec (seed included) always produces byte-identical
+files, so timings from different runs and machines scan the same input.
+Generate a tree to poke at by hand with::
+
+    python benchmarks/synthrepo.py /tmp/synth --files 2000
+"""
+import argparse
+import random
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# How a comment line is written in each generated language.
+COMMENT_SYNTAX = {
+    ".py": ("# ", ""),
+    ".js": ("// ", ""),
+    ".ts": ("// ", ""),
+    ".tsx": ("// ", ""),
+    ".css": ("/* ", " */"),
+    ".html": ("<!-- ", " -->"),
+}
+
+PHRASES = (
+    "as an ai language model",
+    "in this code snippet",
+    "this function is responsible for",
+    "as a large language model",
+)
+
+
+@dataclass(frozen=True)
+class RepoSpec:
+    files: int = 1000
+    # Mean lines per file; actual sizes are spread between half and twice this.
+    lines_per_file: int = 200
+    # Relative weight of each file extension.
+    language_mix: Dict[str, float] = field(
+        default_factory=lambda: {".py": 5, ".ts": 2, ".js": 1.5, ".css": 0.5, ".html": 0.5, ".json": 0.5}
+    )
+    # Chance per line that a long comment block (30 lines) starts there.
+    comment_block_density: float = 0.002
+    # Fraction of comment lines that contain one of PHRASES.
+    phrase_hit_rate: float = 0.01
+    # Files are spread over this many directories (nested two deep).
+    dirs: int = 40
+    seed: int = 1234
+
+    def as_dict(self) -> Dict:
+        return asdict(self)
+
+
+@dataclass
+class RepoManifest:
+    files: List[Path]
+    bytes: int
+    planted_phrases: int
+    planted_blocks: int
+
+
+def _vocabulary(rnd: random.Random, size: int = 3000) -> List[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rnd.choice(letters) for _ in range(rnd.randint(2, 9))) for _ in range(size)]
+
+
+def _pick_extension(rnd: random.Random, mix: List[Tuple[str, float]]) -> str:
+    return rnd.choices([ext for ext, _ in mix], weights=[w for _, w in mix])[0]
+
+
+def _json_file(rnd: random.Random, vocab: List[str], lines: int) -> List[str]:
+    body = [f'  "{rnd.choice(vocab)}_{i}": "{" ".join(rnd.sample(vocab, 4))}",' for i in range(max(lines - 2, 1))]
+    body[-1] = body[-1].rstrip(",")
+    return ["{", *body, "}"]
+
+
+def _code_line(ext: str, rnd: random.Random, vocab: List[str], n: int) -> str:
+    words = " ".join(rnd.choice(vocab) for _ in range(rnd.randint(3, 10)))
+    if ext == ".py":
+        return f"    value_{n} = compute({words!r})"
+    if ext == ".css":
+        return f".{rnd.choice(vocab)}-{n} {{ content: \"{words}\"; }}"
+    if ext == ".html":
+        return f"<p class=\"{rnd.choice(vocab)}\">{words}</p>"
+    return f"  const value{n} = compute(\"{words}\");"
+
+
+def generate_repo(root: Path, spec: RepoSpec = RepoSpec()) -> RepoManifest:
+    """Write the tree described by ``spec`` under ``root``."""
+    rnd = random.Random(spec.seed)
+    vocab = _vocabulary(rnd)
+    mix = sorted(spec.language_mix.items())
+    dirs = [Path(f"pkg_{i % 8}") / f"mod_{i}" for i in range(max(spec.dirs, 1))]
+    manifest = RepoManifest([], 0, 0, 0)
+
+    for i in range(spec.files):
+        ext = _pick_extension(rnd, mix)
+        size = max(4, int(spec.lines_per_file * rnd.uniform(0.5, 2.0)))
+        if ext == ".json":
+            lines = _json_file(rnd, vocab, size)
+        else:
+            opener, closer = COMMENT_SYNTAX[ext]
+            lines = []
+            block = 0
+            for n in range(size):
+                if not block and rnd.random() < spec.comment_block_density:
+                    block = 30
+                    manifest.planted_blocks += 1
+                if block or n % 5 == 0:
+                    block = max(block - 1, 0)
+                    words = " ".join(rnd.choice(vocab) for _ in range(rnd.randint(3, 10)))
+                    if rnd.random() < spec.phrase_hit_rate:
+                        words = f"{words} {rnd.choice(PHRASES)}"
+                        manifest.planted_phrases += 1
+                    lines.append(f"{opener}{words}{closer}")
+                else:
+                    lines.append(_code_line(ext, rnd, vocab, n))
+        path = root / dirs[i % len(dirs)] / f"file_{i}{ext}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+        path.write_bytes(data)
+        manifest.files.append(path)
+        manifest.bytes += len(data)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("root", type=Path)
+    parser.add_argument("--files", type=int, default=RepoSpec.files)
+    parser.add_argument("--lines-per-file", type=int, default=RepoSpec.lines_per_file)
+    parser.add_argument("--comment-block-density", type=float, default=RepoSpec.comment_block_density)
+    parser.add_argument("--phrase-hit-rate", type=float, default=RepoSpec.phrase_hit_rate)
+    parser.add_argument("--seed", type=int, default=RepoSpec.seed)
+    args = parser.parse_args()
+    spec = RepoSpec(
+        files=args.files,
+        lines_per_file=args.lines_per_file,
+        comment_block_density=args.comment_block_density,
+        phrase_hit_rate=args.phrase_hit_rate,
+        seed=args.seed,
+    )
+    manifest = generate_repo(args.root, spec)
+    print(
+        f"{len(manifest.files)} files, {manifest.bytes / 1e6:.1f} MB, "
+        f"{manifest.planted_phrases} phrases, {manifest.planted_blocks} comment blocks"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,3 @@
-from .metrics import basic_stats
+from .metrics import Counts, MetricsAggregator, basic_stats
 
-__all__ = ["basic_stats"]
+__all__ = ["Counts", "MetricsAggregator", "basic_stats"]
@@ -1,9 +1,122 @@
-from typing import List, Dict
+"""Project metrics, aggregated while files are scanned.
+
+MetricsAggregator is fed each scanned file's line counts and each finding
+as they are streamed, and keeps one set of counters per language, per
+directory and per finding kind. Memory grows with the number of files with
+findings and of directories, not with findings, and nothing is read twice.
+"""
+import os
 from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from ..findings import Finding
+
+# Language of files whose extension is not in EXT_LANG_MAP.
+OTHER_LANGUAGE = "other"
 
 
-def basic_stats(files: List[Path], findings: List[Dict]) -> Dict[str, int]:
+def basic_stats(files: List[Path], findings: List[Finding]) -> Dict[str, int]:
     return {
         "file_count": len(files),
         "issue_count": len(findings),
     }
+
+
+class Counts:
+    """Files, lines, comment lines and findings of one group of files."""
+
+    __slots__ = ("files", "lines", "comment_lines", "findings")
+
+    def __init__(self) -> None:
+        self.files = 0
+        self.lines = 0
+        self.comment_lines = 0
+        self.findings = 0
+
+    @property
+    def comment_density(self) -> float:
+        """Share of lines that are comment lines."""
+        return self.comment_lines / self.lines if self.lines else 0.0
+
+    @property
+    def findings_per_kloc(self) -> float:
+        """Findings per thousand lines."""
+        return self.findings * 1000 / self.lines if self.lines else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "files": self.files,
+            "lines": self.lines,
+            "comment_lines": self.comment_lines,
+            "findings": self.findings,
+            "comment_density": round(self.comment_density, 4),
+            "findings_per_kloc": round(self.findings_per_kloc, 2),
+        }
+
+
+class MetricsAggregator:
+    """Per-language, per-directory and per-kind metrics of a scan, built incrementally.
+
+    Call ``add_file()`` for every scanned file and ``add_finding()`` for
+    every finding, in any order. Findings are only counted per file and per
+    kind as they arrive; each file's count is attributed to its language and
+    directory once, by ``as_dict()``. Directories are relative to ``root``
+    ("." for the root itself) and only count the files directly in them.
+    """
+
+    def __init__(self, root: Path):
+        # Imported here: the scanner is not needed to start the CLI.
+        from ..scanner import EXT_LANG_MAP
+
+        self.root = os.path.abspath(root)
+        self.totals = Counts()
+        self.languages: Dict[str, Counts] = {}
+        self.directories: Dict[str, Counts] = {}
+        self.kinds: Dict[str, int] = {}
+        self._ext_lang = EXT_LANG_MAP
+        # Counts of each directory by its path as given, before making it relative.
+        self._by_dirname: Dict[str, Counts] = {}
+        # Findings per file not yet attributed to the file's groups.
+        self._findings: Dict[str, int] = {}
+
+    def _groups_of(self, file: str) -> Tuple[Counts, Counts, Counts]:
+        """The totals, language and directory counts of ``file``."""
+        dirname, name = os.path.split(file)
+        directory = self._by_dirname.get(dirname)
+        if directory is None:
+            key = os.path.relpath(os.path.abspath(dirname), self.root).replace(os.sep, "/")
+            directory = self._by_dirname[dirname] = self.directories.setdefault(key, Counts())
+        language = self._ext_lang.get(os.path.splitext(name)[1].lower(), OTHER_LANGUAGE)
+        counts = self.languages.get(language)
+        if counts is None:
+            counts = self.languages[language] = Counts()
+        return self.totals, counts, directory
+
+    def add_file(self, file: str, lines: int, comment_lines: int) -> None:
+        """Count one scanned file."""
+        for counts in self._groups_of(file):
+            counts.files += 1
+            counts.lines += lines
+            counts.comment_lines += comment_lines
+
+    def add_finding(self, finding: Finding) -> None:
+        """Count one finding towards its file and its kind."""
+        file, kind = finding.file, finding.kind
+        self._findings[file] = self._findings.get(file, 0) + 1
+        self.kinds[kind] = self.kinds.get(kind, 0) + 1
+
+    def _attribute_findings(self) -> None:
+        for file, found in self._findings.items():
+            for counts in self._groups_of(file):
+                counts.findings += found
+        self._findings.clear()
+
+    def as_dict(self) -> Dict[str, Any]:
+        """The metrics as plain data, groups sorted by name."""
+        self._attribute_findings()
+        return {
+            "totals": self.totals.as_dict(),
+            "languages": {name: self.languages[name].as_dict() for name in sorted(self.languages)},
+            "directories": {name: self.directories[name].as_dict() for name in sorted(self.directories)},
+            "kinds": dict(sorted(self.kinds.items())),
+        }
@@ -0,0 +1,189 @@
+"""Baselines of known findings and inline ``vibe: ignore`` suppressions.
+
+A baseline records a fingerprint of every finding at one point in time, so
+that ``check --baseline`` only fails on findings added since. A fingerprint
+hashes the file's path relative to the project root, the finding's kind and
+phrase, and the text of its first line with whitespace collapsed. Line
+numbers are left out, so a finding keeps its fingerprint when code above it
+moves. The n-th identical finding of a file hashes n in as well, so a copy
+pasted next to a known finding is still new.
+
+The file holds the fingerprints as an open-addressing hash table of 64-bit
+little-endian integers after a header line. It is loaded as is, in a single
+read and without creating an object per fingerprint, and a lookup probes
+one or two slots of it.
+"""
+import array
+import hashlib
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+from .findings import Finding
+from .scanner import decode_bytes
+
+BASELINE_FILE_NAME = ".vibe-baseline"
+
+# A line holding this (after a comment marker, e.g. ``# vibe: ignore``)
+# suppresses the findings that span it.
+SUPPRESSION_MARKER = "vibe: ignore"
+
+_MAGIC = b"vibe-sweeper baseline 1\n"
+_MARKER_BYTES = SUPPRESSION_MARKER.encode("ascii")
+
+
+class BaselineError(Exception):
+    """A baseline file could not be read or written."""
+
+
+class Baseline:
+    """A set of finding fingerprints, kept as a hash table ready to be written out."""
+
+    def __init__(self, fingerprints: Iterable[int] = ()):
+        unique = set(fingerprints)
+        capacity = 8
+        while capacity < 2 * len(unique):
+            capacity *= 2
+        table = array.array("Q", bytes(8 * capacity))
+        mask = capacity - 1
+        for value in unique:
+            slot = value & mask
+            while table[slot]:
+                slot = (slot + 1) & mask
+            table[slot] = value
+        self._table = table
+
+    @classmethod
+    def load(cls, path: Path) -> "Baseline":
+        try:
+            data = Path(path).read_bytes()
+        except OSError as exc:
+            raise BaselineError(f"cannot read baseline {path}: {exc.strerror}") from None
+        size = len(data) - len(_MAGIC)
+        if not data.startswith(_MAGIC) or size < 64 or size & (size - 1):
+            raise BaselineError(f"{path} is not a vibe-sweeper baseline")
+        table = array.array("Q")
+        table.frombytes(memoryview(data)[len(_MAGIC) :])
+        if sys.byteorder != "little":
+            table.byteswap()
+        baseline = cls()
+        baseline._table = table
+        return baseline
+
+    def save(self, path: Path) -> None:
+        table = self._table
+        if sys.byteorder != "little":
+            table = array.array("Q", table)
+            table.byteswap()
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        try:
+            tmp.write_bytes(_MAGIC + table.tobytes())
+            os.replace(tmp, path)
+        except OSError as exc:
+            raise BaselineError(f"cannot write baseline {path}: {exc.strerror}") from None
+
+    def __len__(self) -> int:
+        return len(self._table) - self._table.count(0)
+
+    def __contains__(self, fingerprint: object) -> bool:
+        table = self._table
+        mask = len(table) - 1
+        slot = fingerprint & mask  # type: ignore[operator]
+        while True:
+            value = table[slot]
+            if value == fingerprint:
+                return True
+            if not value:
+                return False
+            slot = (slot + 1) & mask
+
+
+def _fingerprint(key: str) -> int:
+    digest = hashlib.blake2b(key.encode("utf-8", "surrogateescape"), digest_size=8).digest()
+    # 0 marks an empty slot of the table.
+    return int.from_bytes(digest, "little") or 1
+
+
+def _suppressed(finding: Finding, marker_lines: Sequence[int]) -> bool:
+    """True if one of the lines ``finding`` spans is in ``marker_lines``."""
+    first = finding.line
+    if not first:
+        return False
+    last = first if finding.end_line is None else finding.end_line
+    return any(first <= line <= last for line in marker_lines)
+
+
+def _read(path: Path) -> bytes:
+    try:
+        return Path(path).read_bytes()
+    except OSError:
+        return b""
+
+
+class FindingFilter:
+    """Drops findings suppressed inline, and those recorded in ``baseline``.
+
+    Pass the ``marker_lines`` the scan recorded (FileReport.marker_lines) and
+    a file is only read again to fingerprint its findings, that is with a
+    baseline or ``collect``. Without them, files with findings are read to
+    look for markers, and decoded only if one is there or to fingerprint.
+    With ``collect``, the fingerprints of the findings kept are added to it,
+    to write a baseline from.
+    """
+
+    def __init__(self, root: Path, baseline: Optional[Baseline] = None, collect: Optional[Set[int]] = None):
+        # Resolved, like the scanned paths, so fingerprints do not depend on
+        # how the root was spelled (e.g. through a symlink).
+        self.root = os.path.realpath(root)
+        self.baseline = baseline
+        self.collect = collect
+        self.suppressed = 0
+        self.baselined = 0
+
+    def filter(
+        self, path: Path, findings: Sequence[Finding], marker_lines: Optional[Sequence[int]] = None
+    ) -> List[Finding]:
+        """The findings of the file at ``path`` that are neither suppressed nor in the baseline."""
+        if not findings:
+            return list(findings)
+        baseline, collect = self.baseline, self.collect
+        fingerprint = baseline is not None or collect is not None
+        lines: List[str] = []
+        if marker_lines is None:
+            data = _read(path)
+            if _MARKER_BYTES not in data:
+                marker_lines = ()
+            if marker_lines is None or fingerprint:
+                lines = decode_bytes(data).splitlines()
+            if marker_lines is None:
+                marker_lines = [n for n, line in enumerate(lines, 1) if SUPPRESSION_MARKER in line]
+        elif fingerprint:
+            lines = decode_bytes(_read(path)).splitlines()
+        if not marker_lines and not fingerprint:
+            return list(findings)
+        # Fingerprints hash "path, kind, phrase, normalized first line, occurrence".
+        prefix = os.path.relpath(os.path.realpath(path), self.root).replace(os.sep, "/") if fingerprint else ""
+        seen: Dict[str, int] = {}
+        kept: List[Finding] = []
+        for finding in findings:
+            if marker_lines and _suppressed(finding, marker_lines):
+                self.suppressed += 1
+                continue
+            if not fingerprint:
+                kept.append(finding)
+                continue
+            first = finding.line
+            text = " ".join(lines[first - 1].split()) if 0 < first <= len(lines) else ""
+            key = f"{finding.kind}\0{finding.phrase or ''}\0{text}"
+            occurrence = seen.get(key, 0)
+            seen[key] = occurrence + 1
+            digest = _fingerprint(f"{prefix}\0{key}\0{occurrence}")
+            if baseline is not None and digest in baseline:
+                self.baselined += 1
+                continue
+            kept.append(finding)
+            if collect is not None:
+                collect.add(digest)
+        return kept
@@ -0,0 +1,226 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from . import __version__
+from .detectors import available_detectors
+from .findings import Finding
+
+if TYPE_CHECKING:
+    from .config import ConfigIndex
+
+CACHE_DIR_NAME = ".vibe-sweeper-cache"
+CACHE_FILE_NAME = "findings.json"
+CACHE_VERSION = 7
+DEFAULT_MAX_ENTRIES = 50_000
+
+# Files modified this close to the moment they were cached may have changed
+# again without their mtime moving, so they are always re-hashed.
+RACY_WINDOW_NS = 2_000_000_000
+
+# (mtime_ns, size, content digest) of a file as it was analysed. The digest
+# is None for files that were skipped without being read in full.
+FileStamp = Tuple[int, int, Optional[str]]
+
+# Cached findings for a file, the reason it was skipped (if it was), its
+# line and comment line counts, and the lines holding a suppression marker.
+CachedResult = Tuple[List[Finding], Optional[str], int, int, Tuple[int, ...]]
+
+
+def content_hasher():
+    return hashlib.blake2b(digest_size=16)
+
+
+def content_digest(data: bytes) -> str:
+    hasher = content_hasher()
+    hasher.update(data)
+    return hasher.hexdigest()
+
+
+def _jsonable(value: Any) -> Any:
+    # Compiled configs are read-only mappings rather than dicts.
+    return dict(value) if isinstance(value, Mapping) else str(value)
+
+
+def config_digest(cfg: Mapping[str, Any]) -> str:
+    payload = json.dumps(cfg, sort_keys=True, default=_jsonable).encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def cache_dir(root: Path) -> Path:
+    return root.resolve() / CACHE_DIR_NAME
+
+
+def clear_cache(root: Path) -> bool:
+    """Delete the cache directory under ``root``. Returns False if there was none."""
+    directory = cache_dir(root)
+    if not directory.exists():
+        return False
+    shutil.rmtree(directory)
+    return True
+
+
+class FindingsCache:
+    """Per-file findings persisted between runs, with LRU eviction.
+
+    Entries are keyed by file path and validated against the file's mtime and
+    size; when those changed but the content digest did not, the entry is
+    reused as well. The whole cache is dropped when the root config or the
+    set of detectors (and therefore potentially every finding) changes. With
+    ``configs``, an entry also records the digest of its file's directory
+    config when that differs from the root config, and is only reused while
+    the file still gets the same config, so the cache stays valid whichever
+    subset of the tree a run scans.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        cfg: Dict[str, Any],
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        configs: Optional["ConfigIndex"] = None,
+    ):
+        self.path = cache_dir(root) / CACHE_FILE_NAME
+        # Installing or removing a detector plugin changes the findings too.
+        self.config = config_digest({"config": cfg, "detectors": sorted(available_detectors())})
+        self.configs = configs
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._dirty = False
+
+    @classmethod
+    def load(
+        cls,
+        root: Path,
+        cfg: Dict[str, Any],
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        configs: Optional["ConfigIndex"] = None,
+    ) -> "FindingsCache":
+        cache = cls(root, cfg, max_entries=max_entries, configs=configs)
+        try:
+            data = json.loads(cache.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cache
+        if (
+            data.get("version") != CACHE_VERSION
+            or data.get("tool") != __version__
+            or data.get("config") != cache.config
+        ):
+            cache._dirty = True
+            return cache
+        # Entries are stored least recently used first.
+        cache._entries.update(data.get("entries", {}))
+        return cache
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _directory_config(self, path: Path) -> Optional[str]:
+        """Digest of the config of ``path``, or None when it is the root config."""
+        if self.configs is None:
+            return None
+        digest = self.configs.config_for(path).digest
+        return None if digest == self.configs.config.digest else digest
+
+    def lookup(self, path: Path) -> Optional[CachedResult]:
+        """Return the CachedResult for ``path`` or None if it must be rescanned."""
+        key = str(path)
+        entry = self._entries.get(key)
+        if entry is not None and entry.get("config") == self._directory_config(path):
+            try:
+                st = os.stat(key)
+            except OSError:
+                st = None
+            if st is not None and entry["size"] == st.st_size:
+                fresh = entry["mtime"] == st.st_mtime_ns and not entry.get("racy")
+                if not fresh and entry["digest"] is not None:
+                    try:
+                        with open(key, "rb") as fh:
+                            fresh = content_digest(fh.read()) == entry["digest"]
+                    except OSError:
+                        fresh = False
+                    if fresh:
+                        entry["mtime"] = st.st_mtime_ns
+                        entry["racy"] = _is_racy(st.st_mtime_ns)
+                        self._dirty = True
+                if fresh:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    findings = [Finding.from_dict(f) for f in entry["findings"]]
+                    return (
+                        findings,
+                        entry.get("skipped"),
+                        entry.get("lines", 0),
+                        entry.get("comment_lines", 0),
+                        tuple(entry.get("markers", ())),
+                    )
+        self.misses += 1
+        return None
+
+    def store(
+        self,
+        path: Path,
+        stamp: FileStamp,
+        findings: List[Finding],
+        skipped: Optional[str] = None,
+        lines: int = 0,
+        comment_lines: int = 0,
+        marker_lines: Sequence[int] = (),
+    ) -> None:
+        key = str(path)
+        mtime, size, digest = stamp
+        entry = self._entries[key] = {
+            "mtime": mtime,
+            "size": size,
+            "digest": digest,
+            "racy": _is_racy(mtime),
+            "findings": [f.as_dict() for f in findings],
+        }
+        if skipped is not None:
+            entry["skipped"] = skipped
+        if lines:
+            entry["lines"] = lines
+            entry["comment_lines"] = comment_lines
+        if marker_lines:
+            entry["markers"] = list(marker_lines)
+        directory_config = self._directory_config(path)
+        if directory_config is not None:
+            entry["config"] = directory_config
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._dirty = True
+
+    def save(self) -> None:
+        """Write the cache to disk if it changed. Failures are ignored."""
+        if not self._dirty:
+            return
+        directory = self.path.parent
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            marker = directory / ".gitignore"
+            if not marker.exists():
+                marker.write_text("# Created by vibe-sweeper\n*\n", encoding="utf-8")
+            tmp = self.path.with_suffix(".tmp")
+            payload = {
+                "version": CACHE_VERSION,
+                "tool": __version__,
+                "config": self.config,
+                "entries": self._entries,
+            }
+            tmp.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError:
+            return
+        self._dirty = False
+
+
+def _is_racy(mtime_ns: int) -> bool:
+    return mtime_ns >= time.time_ns() - RACY_WINDOW_NS
@@ -1,100 +1,649 @@
+import json
+import sys
+import time
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
-from typing import Optional, List, Dict, Tuple
+from typing import TYPE_CHECKING, Callable, Optional, List, Dict, Iterator, Mapping, Set, TextIO, Tuple
 
 import typer
 
-from .scanner import walk_project, detect_languages, read_file_text
-from .detectors import detect_ai_phrases, detect_long_comment_blocks
-from .refactors import run_formatters
-from .report import build_markdown_report
-from .config import load_config_from_path
+from .profiling import DEFAULT_SLOWEST, PROFILE_FORMATS, Profiler
+from .report import REPORT_FORMATS, ReportWriter, create_writer
+
+# The scanner, engine, config (yaml), formatters (asyncio), git and daemon
+# modules are imported by the commands that use them, so that `--help`,
+# `query` and commands that skip a feature do not pay for loading it.
+if TYPE_CHECKING:
+    from .baseline import Baseline, FindingFilter
+    from .config import ConfigIndex
+    from .daemon import ScanIndex
+    from .engine import FileReport
+    from .findings import Finding
 
 app = typer.Typer(help="vibe-sweeper – clean up AI-ish / vibe-coded repositories.")
+cache_app = typer.Typer(help="Manage the incremental scan cache.")
+app.add_typer(cache_app, name="cache")
+
+
+def _set_option():
+    return typer.Option(
+        None,
+        "--set",
+        metavar="KEY=VALUE",
+        help="Override a config value, e.g. --set max_comment_block_lines=30 (repeatable).",
+    )
+
+
+def _load_config(root: Path, config: Optional[str], settings: Optional[List[str]] = None) -> "ConfigIndex":
+    from .config import ConfigError, ConfigIndex, load_config, parse_override
+
+    cfg_path = Path(config) if config else (root / "vibe.yaml")
+    try:
+        layers = [parse_override(item) for item in settings or ()]
+        return ConfigIndex(root, load_config(cfg_path if cfg_path.exists() else None, layers), layers)
+    except ConfigError as exc:
+        typer.echo(f"Error: invalid config: {exc}", err=True)
+        raise typer.Exit(code=2)
 
 
-def _collect_findings(root: Path, cfg: Dict) -> Tuple[List[Path], List[Dict]]:
-    files = walk_project(root)
-    findings: List[Dict] = []
-    for path in files:
-        text = read_file_text(path)
-        if not text:
-            continue
-        findings.extend(detect_ai_phrases(path, text, cfg.get("ai_phrases")))
-        findings.extend(
-            detect_long_comment_blocks(path, text, max_lines=cfg.get("max_comment_block_lines", 20))
+def _scan_reports(
+    root: Path,
+    configs: "ConfigIndex",
+    jobs: Optional[int] = None,
+    use_cache: bool = True,
+    since: Optional[str] = None,
+    staged: bool = False,
+    only_changed_lines: bool = False,
+    profiler: Optional[Profiler] = None,
+    finding_filter: Optional["FindingFilter"] = None,
+) -> Tuple[List[Path], Iterator["FileReport"]]:
+    """Walk ``root`` and return its files and an iterator scanning them.
+
+    Findings suppressed with ``vibe: ignore`` are dropped, as are those in
+    the baseline of ``finding_filter`` when one is given.
+    """
+    from .baseline import FindingFilter
+    from .cache import DEFAULT_MAX_ENTRIES, FindingsCache
+    from .config import ConfigError
+    from .engine import iter_file_reports
+    from .gitdiff import GitError, changed_files, changed_lines, filter_changed_lines
+    from .scanner import walk_project
+
+    if since and staged:
+        raise typer.BadParameter("--since and --staged cannot be combined.")
+    if only_changed_lines and not (since or staged):
+        raise typer.BadParameter("--changed-lines requires --since or --staged.")
+
+    try:
+        with profiler.stage("walk") if profiler is not None else nullcontext() as stage:
+            files = changed_files(root, since=since, staged=staged) if (since or staged) else walk_project(root)
+            configs.add_files(files)
+            if stage is not None:
+                stage.files = len(files)
+        lines = changed_lines(root, since=since, staged=staged) if only_changed_lines else None
+    except GitError as exc:
+        typer.echo(f"Error: {exc}", err=True)
+        raise typer.Exit(code=2)
+    except ConfigError as exc:
+        typer.echo(f"Error: invalid config: {exc}", err=True)
+        raise typer.Exit(code=2)
+
+    cfg = configs.config
+    cache = None
+    if use_cache:
+        cache = FindingsCache.load(
+            root,
+            cfg,
+            max_entries=cfg.get("cache_max_entries", DEFAULT_MAX_ENTRIES),
+            configs=configs,
         )
-    return files, findings
+
+    if finding_filter is None:
+        finding_filter = FindingFilter(root)
+
+    def reports() -> Iterator["FileReport"]:
+        # Closing this iterator early closes the scan too, which stops its workers.
+        scan = iter_file_reports(files, cfg, jobs=jobs, cache=cache, profiler=profiler, configs=configs)
+        try:
+            for report in scan:
+                if lines is not None:
+                    report.findings = filter_changed_lines(report.findings, lines)
+                if report.findings:
+                    report.findings = finding_filter.filter(report.path, report.findings, report.marker_lines)
+                yield report
+        finally:
+            scan.close()
+            if cache is not None:
+                cache.save()
+
+    return files, reports()
+
+
+def _check_profile_format(value: str) -> str:
+    if value not in PROFILE_FORMATS:
+        raise typer.BadParameter(f"must be one of: {', '.join(PROFILE_FORMATS)}.")
+    return value
+
+
+def _profile_option():
+    return typer.Option(
+        False, "--profile", help="Time each stage, detector and the slowest files, and add it to the report."
+    )
+
+
+def _profile_output_option():
+    return typer.Option(
+        None, "--profile-output", help="Write the profile to this file instead of the report (implies --profile)."
+    )
+
+
+def _profile_format_option():
+    return typer.Option(
+        "json",
+        "--profile-format",
+        callback=_check_profile_format,
+        help="Format of --profile-output: json, or chrome for chrome://tracing and Perfetto.",
+    )
+
+
+def _profile_slowest_option():
+    return typer.Option(DEFAULT_SLOWEST, "--profile-slowest", min=0, help="Number of slowest files to list.")
+
+
+def _make_profiler(profile: bool, profile_output: Optional[str], slowest: int) -> Optional[Profiler]:
+    return Profiler(slowest=slowest) if (profile or profile_output) else None
+
+
+def _finish_profile(
+    profiler: Optional[Profiler], profile_output: Optional[str], profile_format: str
+) -> Optional[Dict]:
+    """Write the profile to ``profile_output``, or return it for the report."""
+    if profiler is None:
+        return None
+    if not profile_output:
+        return profiler.as_dict()
+    profiler.write(Path(profile_output), profile_format)
+    typer.echo(f"Profile written to {Path(profile_output)}", err=True)
+    return None
+
+
+def _check_format(value: str) -> str:
+    if value not in REPORT_FORMATS:
+        raise typer.BadParameter(f"must be one of: {', '.join(REPORT_FORMATS)}.")
+    return value
+
+
+def _format_option():
+    return typer.Option(
+        "markdown",
+        "--format",
+        "-f",
+        callback=_check_format,
+        help=f"Report format: {', '.join(REPORT_FORMATS)}.",
+    )
+
+
+@contextmanager
+def _report_output(output: Optional[str]) -> Iterator[Tuple[TextIO, bool]]:
+    """Yield the stream to write the report to and whether it can be patched."""
+    if not output:
+        yield sys.stdout, False
+        return
+    with open(output, "w", encoding="utf-8") as fh:
+        yield fh, True
+
+
+def _write_reports(
+    writer: ReportWriter, reports: Iterator["FileReport"], profiler: Optional[Profiler] = None
+) -> Set[str]:
+    """Stream findings and skipped files to ``writer``; return the files with findings."""
+    flagged: Set[str] = set()
+    writer.begin()
+    if profiler is None:
+        for report in reports:
+            _write_report(writer, report, flagged)
+        return flagged
+    # "scan" covers the whole loop; "report" only the time spent writing.
+    with profiler.stage("scan") as stage:
+        for report in reports:
+            wall0, cpu0 = time.perf_counter(), time.process_time()
+            _write_report(writer, report, flagged)
+            profiler.add_stage("report", time.perf_counter() - wall0, time.process_time() - cpu0, 1)
+            stage.files += 1
+    return flagged
+
+
+def _first_findings(reports: Iterator["FileReport"], limit: int) -> Tuple[List["Finding"], int]:
+    """Collect findings until there are ``limit`` of them, then stop the scan.
+
+    Return the findings and the number of files scanned.
+    """
+    findings: List["Finding"] = []
+    scanned = 0
+    try:
+        for report in reports:
+            scanned += 1
+            findings.extend(report.findings)
+            if len(findings) >= limit:
+                break
+    finally:
+        reports.close()  # type: ignore[attr-defined]
+    return findings[:limit], scanned
+
+
+def _write_report(writer: ReportWriter, report: "FileReport", flagged: Set[str]) -> None:
+    if report.skipped is not None:
+        writer.skip(str(report.path), report.skipped)
+    else:
+        writer.scanned(str(report.path), report.lines, report.comment_lines)
+    if report.findings:
+        flagged.add(str(report.path))
+        for finding in report.findings:
+            writer.add(finding)
 
 
 @app.command()
 def scan(
     path: str = typer.Argument(".", help="Path to the project root."),
     config: Optional[str] = typer.Option(None, "--config", "-c", help="Path to config YAML (vibe.yaml)."),
+    settings: Optional[List[str]] = _set_option(),
+    jobs: Optional[int] = typer.Option(
+        None, "--jobs", "-j", min=1, help="Worker processes for scanning files (default: CPU count)."
+    ),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Ignore and do not update the scan cache."),
+    since: Optional[str] = typer.Option(
+        None, "--since", help="Only scan files changed since the merge base with this git ref."
+    ),
+    staged: bool = typer.Option(False, "--staged", help="Only scan files staged in the git index."),
+    only_changed_lines: bool = typer.Option(
+        False, "--changed-lines", help="With --since/--staged, only report findings on changed lines."
+    ),
     output: Optional[str] = typer.Option(None, "--output", "-o", help="Write report to this file path."),
+    output_format: str = _format_option(),
+    profile: bool = _profile_option(),
+    profile_output: Optional[str] = _profile_output_option(),
+    profile_format: str = _profile_format_option(),
+    profile_slowest: int = _profile_slowest_option(),
 ):
-    """Scan the repo and print a Markdown report."""
+    """Scan the repo and print a Markdown report (or JSON, JSON Lines, SARIF)."""
     root = Path(path)
-    cfg_path = Path(config) if config else (root / "vibe.yaml")
-    cfg = load_config_from_path(cfg_path if cfg_path.exists() else None)
+    configs = _load_config(root, config, settings)
+    profiler = _make_profiler(profile, profile_output, profile_slowest)
 
-    files, findings = _collect_findings(root, cfg)
-    report = build_markdown_report(root, files, findings, formatter_results=None)
+    files, reports = _scan_reports(
+        root,
+        configs,
+        jobs=jobs,
+        use_cache=not no_cache,
+        since=since,
+        staged=staged,
+        only_changed_lines=only_changed_lines,
+        profiler=profiler,
+    )
+    with _report_output(output) as (out, seekable):
+        writer = create_writer(output_format, out, root, seekable)
+        _write_reports(writer, reports, profiler)
+        writer.end(len(files), profile=_finish_profile(profiler, profile_output, profile_format))
 
     if output:
-        out_path = Path(output)
-        out_path.write_text(report, encoding="utf-8")
-        typer.echo(f"Report written to {out_path}")
-    else:
-        typer.echo(report)
+        typer.echo(f"Report written to {Path(output)}")
 
 
 @app.command()
 def run(
     path: str = typer.Argument(".", help="Path to the project root."),
     apply: bool = typer.Option(False, "--apply", help="Apply external formatters where possible."),
+    findings_only: bool = typer.Option(
+        False, "--findings-only", help="With --apply, only format files that have findings."
+    ),
     config: Optional[str] = typer.Option(None, "--config", "-c", help="Path to config YAML (vibe.yaml)."),
+    settings: Optional[List[str]] = _set_option(),
+    jobs: Optional[int] = typer.Option(
+        None, "--jobs", "-j", min=1, help="Worker processes for scanning files (default: CPU count)."
+    ),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Ignore and do not update the scan cache."),
+    since: Optional[str] = typer.Option(
+        None, "--since", help="Only scan files changed since the merge base with this git ref."
+    ),
+    staged: bool = typer.Option(False, "--staged", help="Only scan files staged in the git index."),
+    only_changed_lines: bool = typer.Option(
+        False, "--changed-lines", help="With --since/--staged, only report findings on changed lines."
+    ),
     output: Optional[str] = typer.Option(None, "--output", "-o", help="Write report to this file path."),
+    output_format: str = _format_option(),
+    profile: bool = _profile_option(),
+    profile_output: Optional[str] = _profile_output_option(),
+    profile_format: str = _profile_format_option(),
+    profile_slowest: int = _profile_slowest_option(),
 ):
     """Scan the repo, optionally run formatters, and print a report."""
     root = Path(path)
-    cfg_path = Path(config) if config else (root / "vibe.yaml")
-    cfg = load_config_from_path(cfg_path if cfg_path.exists() else None)
+    configs = _load_config(root, config, settings)
+    profiler = _make_profiler(profile, profile_output, profile_slowest)
 
-    files, findings = _collect_findings(root, cfg)
-    languages = detect_languages(files)
-    formatter_results = None
+    files, reports = _scan_reports(
+        root,
+        configs,
+        jobs=jobs,
+        use_cache=not no_cache,
+        since=since,
+        staged=staged,
+        only_changed_lines=only_changed_lines,
+        profiler=profiler,
+    )
+    with _report_output(output) as (out, seekable):
+        writer = create_writer(output_format, out, root, seekable)
+        flagged = _write_reports(writer, reports, profiler)
 
-    if apply:
-        formatter_results = run_formatters(root, languages)
+        formatter_results = None
+        if apply:
+            targets = [p for p in files if str(p) in flagged] if findings_only else files
+            with profiler.stage("formatters") if profiler is not None else nullcontext():
+                from .refactors import run_formatters
+                from .scanner import detect_languages
 
-    report = build_markdown_report(root, files, findings, formatter_results=formatter_results)
+                formatter_results = run_formatters(
+                    root, detect_languages(targets), timeout=configs.config.get("formatter_timeouts", {})
+                )
+        writer.end(
+            len(files),
+            formatter_results=formatter_results,
+            profile=_finish_profile(profiler, profile_output, profile_format),
+        )
 
     if output:
-        out_path = Path(output)
-        out_path.write_text(report, encoding="utf-8")
-        typer.echo(f"Report written to {out_path}")
-    else:
-        typer.echo(report)
+        typer.echo(f"Report written to {Path(output)}")
 
 
 @app.command()
 def check(
     path: str = typer.Argument(".", help="Path to the project root."),
     config: Optional[str] = typer.Option(None, "--config", "-c", help="Path to config YAML (vibe.yaml)."),
+    settings: Optional[List[str]] = _set_option(),
+    jobs: Optional[int] = typer.Option(
+        None, "--jobs", "-j", min=1, help="Worker processes for scanning files (default: CPU count)."
+    ),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Ignore and do not update the scan cache."),
+    since: Optional[str] = typer.Option(
+        None, "--since", help="Only scan files changed since the merge base with this git ref."
+    ),
+    staged: bool = typer.Option(False, "--staged", help="Only scan files staged in the git index."),
+    only_changed_lines: bool = typer.Option(
+        False, "--changed-lines", help="With --since/--staged, only report findings on changed lines."
+    ),
+    baseline: Optional[str] = typer.Option(
+        None, "--baseline", help="Only report findings missing from this baseline file (see the baseline command)."
+    ),
+    fail_fast: bool = typer.Option(
+        False, "--fail-fast", help="Stop at the first finding and print a short summary (same as --max-findings 1)."
+    ),
+    max_findings: Optional[int] = typer.Option(
+        None, "--max-findings", min=1, help="Stop after this many findings and print a short summary."
+    ),
+    output_format: str = _format_option(),
+    profile: bool = _profile_option(),
+    profile_output: Optional[str] = _profile_output_option(),
+    profile_format: str = _profile_format_option(),
+    profile_slowest: int = _profile_slowest_option(),
 ):
     """Check mode for CI – exits with non-zero status if issues are found."""
+    limit = 1 if fail_fast else max_findings
+    if fail_fast and max_findings is not None:
+        raise typer.BadParameter("--fail-fast and --max-findings cannot be combined.")
+    if limit is not None and output_format != "markdown":
+        raise typer.BadParameter("--fail-fast and --max-findings print a summary and cannot be combined with --format.")
     root = Path(path)
-    cfg_path = Path(config) if config else (root / "vibe.yaml")
-    cfg = load_config_from_path(cfg_path if cfg_path.exists() else None)
+    configs = _load_config(root, config, settings)
+    profiler = _make_profiler(profile, profile_output, profile_slowest)
+    finding_filter = None
+    if baseline:
+        from .baseline import FindingFilter
 
-    files, findings = _collect_findings(root, cfg)
-    report = build_markdown_report(root, files, findings, formatter_results=None)
-    typer.echo(report)
+        finding_filter = FindingFilter(root, baseline=_load_baseline(Path(baseline)))
 
-    if findings:
+    files, reports = _scan_reports(
+        root,
+        configs,
+        jobs=jobs,
+        use_cache=not no_cache,
+        since=since,
+        staged=staged,
+        only_changed_lines=only_changed_lines,
+        profiler=profiler,
+        finding_filter=finding_filter,
+    )
+    if limit is not None:
+        _check_until(reports, limit, len(files), finding_filter, profiler, profile_output, profile_format)
+    writer = create_writer(output_format, sys.stdout, root)
+    _write_reports(writer, reports, profiler)
+    writer.end(len(files), profile=_finish_profile(profiler, profile_output, profile_format))
+    if finding_filter is not None:
+        typer.echo(f"{finding_filter.baselined} known issue(s) matched the baseline.", err=True)
+
+    if writer.finding_count:
         raise typer.Exit(code=1)
     raise typer.Exit(code=0)
 
 
+def _check_until(
+    reports: Iterator["FileReport"],
+    limit: int,
+    file_count: int,
+    finding_filter: Optional["FindingFilter"],
+    profiler: Optional[Profiler],
+    profile_output: Optional[str],
+    profile_format: str,
+) -> None:
+    """check with --max-findings: print the first ``limit`` findings and exit."""
+    from .report.summary import finding_line, profile_lines
+
+    if profiler is None:
+        findings, scanned = _first_findings(reports, limit)
+    else:
+        with profiler.stage("scan") as stage:
+            findings, scanned = _first_findings(reports, limit)
+            stage.files = scanned
+    for finding in findings:
+        typer.echo(finding_line(finding))
+    if len(findings) >= limit and scanned < file_count:
+        typer.echo(f"Stopped after {len(findings)} issue(s) in {scanned} of {file_count} files.")
+    else:
+        typer.echo(f"Found {len(findings)} issue(s) in {file_count} files.")
+    for line in profile_lines(_finish_profile(profiler, profile_output, profile_format)):
+        typer.echo(line)
+    if finding_filter is not None:
+        typer.echo(f"{finding_filter.baselined} known issue(s) matched the baseline.", err=True)
+    raise typer.Exit(code=1 if findings else 0)
+
+
+def _load_baseline(path: Path) -> "Baseline":
+    from .baseline import Baseline, BaselineError
+
+    try:
+        return Baseline.load(path)
+    except BaselineError as exc:
+        typer.echo(f"Error: {exc}", err=True)
+        raise typer.Exit(code=2)
+
+
+@app.command("baseline")
+def baseline_command(
+    path: str = typer.Argument(".", help="Path to the project root."),
+    output: Optional[str] = typer.Option(
+        None, "--output", "-o", help="Baseline file to write (default: .vibe-baseline in the project root)."
+    ),
+    config: Optional[str] = typer.Option(None, "--config", "-c", help="Path to config YAML (vibe.yaml)."),
+    settings: Optional[List[str]] = _set_option(),
+    jobs: Optional[int] = typer.Option(
+        None, "--jobs", "-j", min=1, help="Worker processes for scanning files (default: CPU count)."
+    ),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Ignore and do not update the scan cache."),
+):
+    """Record the current findings, so that check --baseline only reports new ones."""
+    from .baseline import BASELINE_FILE_NAME, Baseline, BaselineError, FindingFilter
+
+    root = Path(path)
+    configs = _load_config(root, config, settings)
+    recorded: Set[int] = set()
+    files, reports = _scan_reports(
+        root, configs, jobs=jobs, use_cache=not no_cache, finding_filter=FindingFilter(root, collect=recorded)
+    )
+    for _ in reports:
+        pass
+    target = Path(output) if output else root / BASELINE_FILE_NAME
+    try:
+        Baseline(recorded).save(target)
+    except BaselineError as exc:
+        typer.echo(f"Error: {exc}", err=True)
+        raise typer.Exit(code=2)
+    typer.echo(f"Baseline of {len(recorded)} issue(s) in {len(files)} files written to {target}")
+
+
+def _run_daemon(
+    path: str,
+    config: Optional[str],
+    settings: Optional[List[str]],
+    jobs: Optional[int],
+    no_cache: bool,
+    socket_path: Optional[str],
+    polling: bool,
+    poll_interval: Optional[float],
+    on_update: Optional[Callable[["ScanIndex", List[Path]], None]] = None,
+) -> None:
+    from .daemon import DEFAULT_POLL_INTERVAL, Daemon, DaemonError, ScanIndex, create_watcher, default_socket_path
+
+    root = Path(path)
+    configs = _load_config(root, config, settings)
+    index = ScanIndex(root, configs.config, jobs=jobs, configs=configs)
+    index.refresh(use_cache=not no_cache)
+    sock = Path(socket_path) if socket_path else default_socket_path(root)
+    watcher = create_watcher(root, polling=polling, interval=poll_interval or DEFAULT_POLL_INTERVAL)
+    daemon = Daemon(index, sock, watcher, (lambda paths: on_update(index, paths)) if on_update else None)
+    try:
+        daemon.start()
+    except DaemonError as exc:
+        typer.echo(f"Error: {exc}", err=True)
+        raise typer.Exit(code=2)
+    mode = "polling" if daemon.watcher.fileno() is None else "inotify"
+    typer.echo(
+        f"Watching {index.root} ({len(index)} files, {index.issue_count()} issues, {mode}); socket {sock}",
+        err=True,
+    )
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+def _daemon_socket_option():
+    return typer.Option(None, "--socket", help="Unix socket path (default: .vibe-sweeper-cache/daemon.sock).")
+
+
+def _daemon_polling_option():
+    return typer.Option(False, "--polling", help="Poll for changes instead of using inotify.")
+
+
+def _daemon_interval_option():
+    return typer.Option(None, "--poll-interval", min=0.05, help="Seconds between polls (default: 1).")
+
+
+@app.command()
+def serve(
+    path: str = typer.Argument(".", help="Path to the project root."),
+    config: Optional[str] = typer.Option(None, "--config", "-c", help="Path to config YAML (vibe.yaml)."),
+    settings: Optional[List[str]] = _set_option(),
+    jobs: Optional[int] = typer.Option(
+        None, "--jobs", "-j", min=1, help="Worker processes for the initial scan (default: CPU count)."
+    ),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Do not use the scan cache for the initial scan."),
+    socket_path: Optional[str] = _daemon_socket_option(),
+    polling: bool = _daemon_polling_option(),
+    poll_interval: Optional[float] = _daemon_interval_option(),
+):
+    """Keep the project scanned in memory and answer queries over a Unix socket."""
+    _run_daemon(path, config, settings, jobs, no_cache, socket_path, polling, poll_interval)
+
+
+@app.command()
+def watch(
+    path: str = typer.Argument(".", help="Path to the project root."),
+    config: Optional[str] = typer.Option(None, "--config", "-c", help="Path to config YAML (vibe.yaml)."),
+    settings: Optional[List[str]] = _set_option(),
+    jobs: Optional[int] = typer.Option(
+        None, "--jobs", "-j", min=1, help="Worker processes for the initial scan (default: CPU count)."
+    ),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Do not use the scan cache for the initial scan."),
+    socket_path: Optional[str] = _daemon_socket_option(),
+    polling: bool = _daemon_polling_option(),
+    poll_interval: Optional[float] = _daemon_interval_option(),
+):
+    """Like serve, and print the findings of every file as it changes."""
+
+    from .report.summary import finding_line
+
+    def on_update(index: "ScanIndex", paths: List[Path]) -> None:
+        for changed in paths:
+            reports = index.reports(changed)
+            if not reports:
+                typer.echo(f"{changed}: removed")
+                continue
+            findings = reports[0].findings
+            typer.echo(f"{changed}: {len(findings)} issue(s)")
+            for finding in findings:
+                typer.echo(f"  {finding_line(finding)}")
+
+    _run_daemon(path, config, settings, jobs, no_cache, socket_path, polling, poll_interval, on_update)
+
+
+@app.command()
+def query(
+    path: str = typer.Argument(".", help="Path to the project root the daemon serves."),
+    file: Optional[str] = typer.Option(None, "--file", help="Only report this file or directory."),
+    socket_path: Optional[str] = _daemon_socket_option(),
+    status: bool = typer.Option(False, "--status", help="Print the daemon status instead of findings."),
+    stop: bool = typer.Option(False, "--stop", help="Stop the daemon."),
+    as_json: bool = typer.Option(False, "--json", help="Print the raw JSON response."),
+):
+    """Ask a running daemon for findings – exits with non-zero status if issues are found."""
+    from .daemon import DaemonError, default_socket_path, findings_of, request
+    from .report.summary import finding_line
+
+    sock = Path(socket_path) if socket_path else default_socket_path(Path(path))
+    if stop:
+        payload: Dict = {"cmd": "shutdown"}
+    elif status:
+        payload = {"cmd": "status"}
+    else:
+        payload = {"cmd": "findings"}
+        if file:
+            payload["path"] = str(Path(file).resolve())
+    try:
+        response = request(sock, payload)
+    except DaemonError as exc:
+        typer.echo(f"Error: {exc}", err=True)
+        raise typer.Exit(code=2)
+    if as_json or payload["cmd"] != "findings":
+        typer.echo(json.dumps(response))
+        raise typer.Exit(code=0 if response.get("ok") else 2)
+    findings = findings_of(response)
+    for finding in findings:
+        typer.echo(finding_line(finding))
+    raise typer.Exit(code=1 if findings else 0)
+
+
+@cache_app.command("clear")
+def cache_clear(
+    path: str = typer.Argument(".", help="Path to the project root."),
+):
+    """Delete the scan cache of a project."""
+    from .cache import CACHE_DIR_NAME, clear_cache
+
+    root = Path(path)
+    if clear_cache(root):
+        typer.echo(f"Removed {root.resolve() / CACHE_DIR_NAME}")
+    else:
+        typer.echo("No cache to remove.")
+
+
 if __name__ == "__main__":
     app()
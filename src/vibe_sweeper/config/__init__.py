@@ -1,18 +1,167 @@
-from importlib.resources import files
+import hashlib
+import json
+import marshal
+import os
+import pickle
 from pathlib import Path
-import yaml
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+from .. import __version__
+from .compiled import (
+    CompiledConfig,
+    ConfigError,
+    FrozenDict,
+    deep_merge,
+    parse_override,
+    thaw,
+    validate_layer,
+)
+from .directories import CONFIG_FILE_NAME, ConfigIndex
+
+__all__ = [
+    "CONFIG_FILE_NAME",
+    "CompiledConfig",
+    "ConfigIndex",
+    "ConfigError",
+    "DEFAULT_RULES",
+    "FrozenDict",
+    "deep_merge",
+    "load_config",
+    "load_config_from_path",
+    "load_default_config",
+    "load_layer",
+    "parse_override",
+    "thaw",
+    "user_cache_dir",
+    "validate_layer",
+]
+
+DEFAULT_RULES = Path(__file__).with_name("default_rules.yaml")
+
+# The parsed default config is cached in marshal form, keyed by a digest of
+# the YAML, so that most runs never import or run the YAML parser.
+_PRECOMPILED_NAME = "default_rules-{digest}.marshal"
+# Other config files (nested vibe.yaml) are cached the same way.
+_LAYER_NAME = "layer-{digest}.marshal"
+
+# Compiled configs (merged layers plus matchers) are pickled under a digest of
+# every layer's bytes. Only the most recently written few are kept.
+_COMPILED_NAME = "config-{digest}.pickle"
+COMPILED_CACHE_ENTRIES = 32
+# Part of that digest; bump it whenever the pickled form of CompiledConfig or
+# of the matchers it carries changes, so older pickles are not loaded.
+COMPILED_FORMAT = 2
+
+
+def user_cache_dir() -> Path:
+    """Per-user cache directory (``$XDG_CACHE_HOME/vibe-sweeper``)."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "vibe-sweeper"
+
+
+def _parse_yaml(text: str) -> Any:
+    import yaml
+
+    return yaml.safe_load(text)
+
+
+def _parse_cached(data: bytes, template: str) -> Any:
+    # YAML parsed once per distinct content (and tool version), then read
+    # back from a marshal copy.
+    digest = hashlib.blake2b(data + __version__.encode(), digest_size=12).hexdigest()
+    precompiled = user_cache_dir() / template.format(digest=digest)
+    try:
+        return marshal.loads(precompiled.read_bytes())
+    except (OSError, ValueError, EOFError, TypeError):
+        pass
+    parsed = _parse_yaml(data.decode("utf-8"))
+    try:
+        _write_atomic(precompiled, marshal.dumps(parsed))
+    except (OSError, ValueError):
+        pass  # read-only home: parse the YAML every time
+    return parsed
 
 
 def load_default_config() -> Dict[str, Any]:
-    data = files("vibe_sweeper.config").joinpath("default_rules.yaml").read_text(encoding="utf-8")
-    return yaml.safe_load(data)
+    return _parse_cached(DEFAULT_RULES.read_bytes(), _PRECOMPILED_NAME)
+
+
+def load_layer(path: Path, data: Optional[bytes] = None) -> Dict[str, Any]:
+    """Parse and validate one YAML config file (``data`` is its bytes, if already read)."""
+    if data is None:
+        data = path.read_bytes()
+    return validate_layer(_parse_cached(data, _LAYER_NAME), str(path))
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
 
 
 def load_config_from_path(path: Optional[Path]) -> Dict[str, Any]:
+    """The defaults deep-merged with the YAML file at ``path`` (if it exists), as a plain dict."""
     cfg = load_default_config()
     if path and path.is_file():
-        user_data = path.read_text(encoding="utf-8")
-        user_cfg = yaml.safe_load(user_data) or {}
-        cfg.update(user_cfg)
+        cfg = deep_merge(cfg, load_layer(path))
     return cfg
+
+
+def _prune_compiled(directory: Path) -> None:
+    try:
+        entries = sorted(directory.glob(_COMPILED_NAME.format(digest="*")), key=lambda p: p.stat().st_mtime)
+        for stale in entries[:-COMPILED_CACHE_ENTRIES]:
+            stale.unlink()
+    except OSError:
+        pass
+
+
+def load_config(
+    path: Optional[Path] = None,
+    settings: Sequence[Mapping[str, Any]] = (),
+    use_cache: bool = True,
+) -> CompiledConfig:
+    """Build the CompiledConfig for a run.
+
+    Layers, lowest precedence first: the built-in defaults, the YAML file at
+    ``path`` (usually the repo's ``vibe.yaml``; skipped if missing) and
+    ``settings`` (``--set`` flags). Each layer is validated, then they are
+    deep-merged and compiled. The result is cached under
+    ``user_cache_dir()``, keyed by a digest of the defaults, the file and the
+    settings, so a warm start reads two files and unpickles one.
+    """
+    user_data = path.read_bytes() if path is not None and path.is_file() else b""
+    hasher = hashlib.blake2b(digest_size=16)
+    for part in (
+        f"{__version__}/{COMPILED_FORMAT}".encode(),
+        DEFAULT_RULES.read_bytes(),
+        user_data,
+        json.dumps([thaw(layer) for layer in settings], sort_keys=True, default=str).encode("utf-8"),
+    ):
+        hasher.update(len(part).to_bytes(8, "little"))
+        hasher.update(part)
+    digest = hasher.hexdigest()
+    cached = user_cache_dir() / _COMPILED_NAME.format(digest=digest)
+    if use_cache:
+        try:
+            with cached.open("rb") as fh:
+                compiled = pickle.load(fh)
+            if isinstance(compiled, CompiledConfig) and compiled.digest == digest:
+                return compiled
+        except Exception:
+            pass  # missing, truncated or from an incompatible version: rebuild
+
+    cfg = load_default_config()
+    if user_data:
+        cfg = deep_merge(cfg, load_layer(path, user_data))
+    for layer in settings:
+        cfg = deep_merge(cfg, validate_layer(layer, "--set"))
+    compiled = CompiledConfig(cfg, digest)
+    if use_cache:
+        try:
+            _write_atomic(cached, pickle.dumps(compiled, protocol=pickle.HIGHEST_PROTOCOL))
+            _prune_compiled(cached.parent)
+        except (OSError, pickle.PicklingError):
+            pass
+    return compiled
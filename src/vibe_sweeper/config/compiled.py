@@ -0,0 +1,182 @@
+"""Layered config: deep merge, validation and the compiled, read-only form."""
+import json
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, Tuple
+
+from ..detectors.ai_phrases import PhraseMatcher, compile_phrases, phrase_rule
+
+
+class ConfigError(ValueError):
+    """A config layer has the wrong shape or a value of the wrong type."""
+
+
+def deep_merge(base: Mapping[str, Any], override: Mapping[str, Any]) -> Dict[str, Any]:
+    """Return ``base`` updated with ``override``; nested mappings are merged key by key.
+
+    Any other value in ``override`` (lists included) replaces the one in
+    ``base``. Neither argument is modified.
+    """
+    merged = dict(base)
+    for key, value in override.items():
+        current = merged.get(key)
+        if isinstance(value, Mapping) and isinstance(current, Mapping):
+            merged[key] = deep_merge(current, value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def parse_override(text: str) -> Dict[str, Any]:
+    """Turn a ``--set`` flag such as ``detectors.ai_phrases=false`` into a config layer.
+
+    Dots in the key address nested sections. The value is read as JSON
+    (numbers, booleans, lists, ``null``); anything else is kept as a string.
+    """
+    key, sep, raw = text.partition("=")
+    if not sep or not key.strip():
+        raise ConfigError(f"expected KEY=VALUE, got {text!r}")
+    try:
+        value: Any = json.loads(raw)
+    except ValueError:
+        value = raw
+    for part in reversed(key.strip().split(".")):
+        value = {part: value}
+    return value
+
+
+def _is_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _string_list(value: Any) -> bool:
+    return isinstance(value, (list, tuple)) and all(isinstance(item, str) for item in value)
+
+
+def _mapping_of(check: Callable[[Any], bool]) -> Callable[[Any], bool]:
+    return lambda value: isinstance(value, Mapping) and all(
+        isinstance(key, str) and check(item) for key, item in value.items()
+    )
+
+
+# Built-in keys and what their values must be. Other keys are kept as they
+# are, for plugin detectors to read.
+_SCHEMA: Dict[str, Tuple[Callable[[Any], bool], str]] = {
+    "ai_phrases": (lambda v: isinstance(v, (list, tuple)), "a list of phrases and rules"),
+    "max_comment_block_lines": (lambda v: _is_int(v) and v >= 1, "an integer >= 1"),
+    "max_file_bytes": (lambda v: v is None or (_is_int(v) and v >= 0), "an integer >= 0"),
+    "mmap": (lambda v: isinstance(v, bool), "true or false"),
+    "detectors": (_mapping_of(lambda v: isinstance(v, bool)), "a mapping of detector names to true/false"),
+    "formatter_timeouts": (_mapping_of(lambda v: _is_number(v) and v > 0), "a mapping of formatters to seconds"),
+    "cache_max_entries": (lambda v: _is_int(v) and v >= 1, "an integer >= 1"),
+}
+
+
+def validate_layer(layer: Any, source: str) -> Dict[str, Any]:
+    """Check one config layer (a parsed ``vibe.yaml``, ``--set`` flag, ...) and return it.
+
+    An empty layer is returned as ``{}``. Raises ConfigError naming
+    ``source`` and the offending key.
+    """
+    if layer is None:
+        return {}
+    if not isinstance(layer, Mapping):
+        raise ConfigError(f"{source}: expected a mapping of config keys, got {type(layer).__name__}")
+    for key, value in layer.items():
+        rule = _SCHEMA.get(key)
+        if rule is not None and not rule[0](value):
+            raise ConfigError(f"{source}: {key} must be {rule[1]}, got {value!r}")
+    if "ai_phrases" in layer:
+        for index, entry in enumerate(layer["ai_phrases"]):
+            try:
+                phrase_rule(entry)
+            except ValueError as exc:
+                raise ConfigError(f"{source}: ai_phrases[{index}]: {exc}") from None
+    if "overrides" in layer:
+        _validate_sections(layer["overrides"], f"{source}: overrides")
+    return dict(layer)
+
+
+def _validate_sections(sections: Any, source: str) -> None:
+    if not isinstance(sections, (list, tuple)):
+        raise ConfigError(f"{source} must be a list of sections, got {sections!r}")
+    for index, section in enumerate(sections):
+        where = f"{source}[{index}]"
+        if not isinstance(section, Mapping):
+            raise ConfigError(f"{where}: expected a mapping, got {section!r}")
+        paths = section.get("paths")
+        if not paths or not _string_list(paths):
+            raise ConfigError(f"{where}: paths must be a non-empty list of directory patterns")
+        if any(pattern.startswith("!") for pattern in paths):
+            raise ConfigError(f"{where}: paths cannot be negated")
+        if "overrides" in section:
+            raise ConfigError(f"{where}: sections cannot be nested")
+        validate_layer(section_layer(section), where)
+
+
+def section_layer(section: Mapping[str, Any]) -> Dict[str, Any]:
+    """The config keys of an ``overrides:`` section (everything but ``paths``)."""
+    return {key: value for key, value in section.items() if key != "paths"}
+
+
+class FrozenDict(Mapping):
+    """Read-only mapping used for the nested sections of a CompiledConfig."""
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: Mapping[str, Any] = ()):
+        self._data = {key: _freeze(value) for key, value in dict(data).items()}
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._data!r})"
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, Mapping) and not isinstance(value, FrozenDict):
+        return FrozenDict(value)
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Plain dicts and lists for a (possibly frozen) config value, e.g. to dump it."""
+    if isinstance(value, Mapping):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+class CompiledConfig(FrozenDict):
+    """The merged, validated config, frozen, with its matchers built once.
+
+    It reads like the plain config dict, so detectors and plugins keep
+    using ``cfg.get(...)``. ``phrase_matcher`` is the compiled
+    ``ai_phrases`` list and ``digest`` identifies the layers it came from.
+    Instances are picklable, matchers included, which is how they are
+    cached on disk and sent to worker processes.
+    """
+
+    __slots__ = ("digest", "phrase_matcher")
+
+    def __init__(self, data: Mapping[str, Any], digest: str = "", phrase_matcher: Optional[PhraseMatcher] = None):
+        super().__init__(data)
+        self.digest = digest
+        if phrase_matcher is None:
+            phrase_matcher = compile_phrases(self._data.get("ai_phrases"))
+        self.phrase_matcher = phrase_matcher
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(digest={self.digest!r})"
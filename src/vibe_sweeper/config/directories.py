@@ -0,0 +1,142 @@
+"""Per-directory config from nested ``vibe.yaml`` files and ``overrides:`` sections."""
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Pattern, Sequence, Tuple
+
+from ..ignore import parse_rule
+from .compiled import CompiledConfig, ConfigError, deep_merge, section_layer, thaw, validate_layer
+
+CONFIG_FILE_NAME = "vibe.yaml"
+
+# An ``overrides:`` section in effect: the directory of the file that
+# declared it (relative to the root, "" or ending in "/"), its combined path
+# regex and its config keys.
+_Section = Tuple[str, Pattern, Dict[str, Any]]
+
+
+class _Node:
+    __slots__ = ("config", "sections", "children")
+
+    def __init__(self, config: CompiledConfig, sections: Tuple[_Section, ...]):
+        self.config = config
+        self.sections = sections
+        self.children: Dict[str, "_Node"] = {}
+
+
+def _compile_sections(sections: Any, prefix: str, source: str) -> Tuple[_Section, ...]:
+    compiled = []
+    for index, section in enumerate(sections or ()):
+        patterns = []
+        for pattern in section["paths"]:
+            rule = parse_rule(pattern)
+            if rule is None:
+                raise ConfigError(f"{source}: overrides[{index}]: empty path pattern {pattern!r}")
+            patterns.append(rule.regex.pattern)
+        regex = re.compile("|".join(f"(?:{p})" for p in patterns), re.DOTALL)
+        compiled.append((prefix, regex, thaw(section_layer(section))))
+    return tuple(compiled)
+
+
+class ConfigIndex:
+    """The effective config of each directory under ``root``, kept in a prefix trie.
+
+    A directory's node is built once, the first time a path under it is
+    looked up: the ``overrides:`` sections in effect are matched against the
+    directory, its own ``vibe.yaml`` is merged in, and the result is
+    compiled. Directories where neither applies share their parent's
+    CompiledConfig. After that, finding a file's config is one dict step per
+    directory level, whatever the number of patterns. ``add_files()`` builds
+    the nodes of a whole walk up front, so worker processes receive a
+    complete trie.
+
+    Precedence, lowest first: ``config`` (defaults and the root config
+    file), then for each directory from the root down the sections that
+    match it in declaration order and its ``vibe.yaml``, and finally
+    ``settings`` (``--set`` flags), which always win. Section paths are
+    .gitignore-style directory patterns relative to the file that declares
+    them; a matching directory applies the section to everything below it.
+    """
+
+    def __init__(self, root: Path, config: CompiledConfig, settings: Sequence[Mapping[str, Any]] = ()):
+        # Resolved, like the paths walk_project() yields.
+        self.root = str(Path(root).resolve())
+        self.settings = [validate_layer(thaw(layer), "--set") for layer in settings]
+        self._root = _Node(config, _compile_sections(config.get("overrides"), "", "config"))
+        # (directory relative to root, digest) of every node with its own config.
+        self._layers: List[Tuple[str, str]] = []
+        self._last: Tuple[Optional[str], CompiledConfig] = (None, config)
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["_last"] = (None, self._root.config)
+        return state
+
+    @property
+    def config(self) -> CompiledConfig:
+        """The config of the root directory."""
+        return self._root.config
+
+    @property
+    def uniform(self) -> bool:
+        """True while every directory seen so far uses the root config."""
+        return not self._layers
+
+    def config_for(self, path: Path) -> CompiledConfig:
+        """The effective config of the file at ``path``."""
+        name = os.fspath(path)
+        if not name.startswith(self.root):
+            name = os.path.realpath(name)
+        directory = name.rpartition(os.sep)[0]
+        last_dir, last_config = self._last
+        if directory == last_dir:
+            return last_config
+        node = self._root
+        if directory != self.root and directory.startswith(self.root) and directory[len(self.root)] == os.sep:
+            rel = ""
+            for name in directory[len(self.root) + 1 :].split(os.sep):
+                rel += name + "/"
+                child = node.children.get(name)
+                if child is None:
+                    child = node.children[name] = self._enter(node, rel)
+                node = child
+        self._last = (directory, node.config)
+        return node.config
+
+    def add_files(self, files: Iterable[Path]) -> None:
+        """Build the nodes of every directory holding one of ``files``."""
+        for path in files:
+            self.config_for(path)
+
+    def _enter(self, parent: _Node, rel: str) -> _Node:
+        name = rel[:-1]
+        layers = [
+            layer
+            for prefix, regex, layer in parent.sections
+            if name.startswith(prefix) and regex.fullmatch(name[len(prefix) :])
+        ]
+        sections = parent.sections
+        config_path = os.path.join(self.root, rel, CONFIG_FILE_NAME)
+        try:
+            data: Optional[bytes] = Path(config_path).read_bytes()
+        except OSError:
+            data = None
+        if data is not None:
+            from . import load_layer
+
+            own = load_layer(Path(config_path), data)
+            sections = sections + _compile_sections(own.pop("overrides", None), rel, config_path)
+            layers.append(own)
+        if not layers:
+            return _Node(parent.config, sections)
+
+        hasher = hashlib.blake2b(parent.config.digest.encode(), digest_size=16)
+        hasher.update(json.dumps(layers, sort_keys=True, default=str).encode("utf-8"))
+        merged = thaw(parent.config)
+        for layer in layers + self.settings:
+            merged = deep_merge(merged, layer)
+        config = CompiledConfig(merged, hasher.hexdigest())
+        self._layers.append((rel, config.digest))
+        return _Node(config, sections)
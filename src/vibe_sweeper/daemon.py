@@ -0,0 +1,499 @@
+"""Long-running scan daemon for editors and hooks.
+
+The daemon walks and scans the project once, then keeps the file index,
+the config (with its compiled phrase matcher) and every file's findings in
+memory. File system events (inotify on Linux, polling elsewhere) trigger a
+rescan of just the files that changed. Clients query the in-memory state
+over a Unix socket with one JSON object per line::
+
+    {"cmd": "findings", "path": "src/"}   -> {"ok": true, "files": 12, "findings": [...]}
+    {"cmd": "status"}                     -> {"ok": true, "files": ..., "issues": ..., "generation": ...}
+    {"cmd": "rescan"}                     -> walks the tree again, then answers like "status"
+    {"cmd": "shutdown"}                   -> {"ok": true}; the daemon exits
+"""
+import ctypes
+import ctypes.util
+import errno
+import json
+import os
+import selectors
+import socket
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .baseline import FindingFilter
+from .cache import CACHE_DIR_NAME, DEFAULT_MAX_ENTRIES, FindingsCache
+from .engine import FileReport, iter_file_reports
+from .findings import Finding
+from .ignore import IGNORE_FILE_NAMES
+from .scanner import DEFAULT_IGNORES, EXT_LANG_MAP, walk_project
+
+if TYPE_CHECKING:
+    from .config import ConfigIndex
+
+SOCKET_NAME = "daemon.sock"
+DEFAULT_POLL_INTERVAL = 1.0
+# Events are collected for this long after the last one before rescanning,
+# so an editor's save (truncate, write, rename) costs a single rescan.
+DEBOUNCE = 0.05
+# Longest request line accepted from a client.
+MAX_REQUEST_BYTES = 1 << 16
+
+# (mtime_ns, size, inode) of a file as it was scanned.
+_Stamp = Tuple[int, int, int]
+
+
+class DaemonError(RuntimeError):
+    """The daemon could not be started or reached."""
+
+
+def default_socket_path(root: Path) -> Path:
+    return root.resolve() / CACHE_DIR_NAME / SOCKET_NAME
+
+
+def _stamp(path: Path) -> Optional[_Stamp]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+class ScanIndex:
+    """The project's files and their latest FileReport, kept up to date incrementally.
+
+    Findings suppressed by ``vibe: ignore`` are dropped from the reports, as
+    in ``scan`` and ``check``.
+    """
+
+    def __init__(
+        self, root: Path, cfg: Dict[str, Any], jobs: Optional[int] = None, configs: Optional["ConfigIndex"] = None
+    ):
+        self.root = root.resolve()
+        self.cfg = cfg
+        self.configs = configs
+        self.jobs = jobs
+        self.generation = 0
+        self.scanned_at = 0.0
+        self._stamps: Dict[Path, _Stamp] = {}
+        self._reports: Dict[Path, FileReport] = {}
+        self._filter = FindingFilter(self.root)
+
+    def __len__(self) -> int:
+        return len(self._reports)
+
+    def issue_count(self) -> int:
+        return sum(len(report.findings) for report in self._reports.values())
+
+    def _scan(self, paths: List[Path], jobs: Optional[int], cache: Optional[FindingsCache] = None) -> None:
+        stamps = {path: _stamp(path) for path in paths}
+        if self.configs is not None:
+            self.configs.add_files(paths)
+        for report in iter_file_reports(paths, self.cfg, jobs=jobs, cache=cache, configs=self.configs):
+            if report.findings:
+                report.findings = self._filter.filter(report.path, report.findings, report.marker_lines)
+            self._reports[report.path] = report
+        self._stamps.update((path, stamp) for path, stamp in stamps.items() if stamp is not None)
+
+    def refresh(self, use_cache: bool = False) -> List[Path]:
+        """Walk the tree again; rescan new and changed files and forget removed ones.
+
+        Returns the paths whose reports changed (removed files included).
+        """
+        files = walk_project(self.root)
+        current = set(files)
+        removed = [path for path in self._reports if path not in current]
+        stale = [path for path in files if path not in self._stamps or _stamp(path) != self._stamps[path]]
+        cache = None
+        if use_cache:
+            if self.configs is not None:
+                self.configs.add_files(files)
+            cache = FindingsCache.load(
+                self.root,
+                self.cfg,
+                max_entries=self.cfg.get("cache_max_entries", DEFAULT_MAX_ENTRIES),
+                configs=self.configs,
+            )
+        # Only the initial scan is worth spreading over a process pool.
+        self._scan(stale, self.jobs if not self._reports else 1, cache)
+        if cache is not None:
+            cache.save()
+        for path in removed:
+            del self._reports[path]
+            self._stamps.pop(path, None)
+        # Keep the reports in walk order.
+        self._reports = {path: self._reports[path] for path in files if path in self._reports}
+        self._bump()
+        return stale + removed
+
+    def update(self, paths: Iterable[Path]) -> List[Path]:
+        """Rescan the indexed ``paths`` whose stamp changed.
+
+        Paths that are not indexed are ignored; new files are only picked up
+        by ``refresh()``, which applies the ignore files.
+        """
+        stale = []
+        for path in paths:
+            if path in self._stamps and _stamp(path) != self._stamps[path]:
+                stale.append(path)
+        if stale:
+            self._scan(stale, 1)
+            self._bump()
+        return stale
+
+    def _bump(self) -> None:
+        self.generation += 1
+        self.scanned_at = time.time()
+
+    def reports(self, prefix: Optional[Path] = None) -> List[FileReport]:
+        """Reports of all files, or of ``prefix`` and the files under it."""
+        if prefix is None:
+            return list(self._reports.values())
+        prefix = prefix if prefix.is_absolute() else self.root / prefix
+        exact = os.path.normpath(prefix)
+        report = self._reports.get(Path(exact))
+        if report is not None:
+            return [report]
+        under = exact.rstrip(os.sep) + os.sep
+        return [report for path, report in self._reports.items() if str(path).startswith(under)]
+
+
+class PollingWatcher:
+    """Reports nothing itself; the daemon refreshes the index every ``interval`` seconds."""
+
+    def __init__(self, interval: float = DEFAULT_POLL_INTERVAL):
+        self.interval = interval
+
+    def fileno(self) -> Optional[int]:
+        return None
+
+    def close(self) -> None:
+        pass
+
+
+# inotify(7) constants.
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    | IN_DELETE_SELF | IN_MOVE_SELF
+)
+# Events after which the set of files may differ, so the tree is walked again.
+_STRUCTURE_MASK = IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+_EVENT = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """Linux inotify watches on every directory of the tree that is not in DEFAULT_IGNORES."""
+
+    def __init__(self, root: Path):
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or libc_name is None:
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._fd = fd
+        self._dirs: Dict[int, Path] = {}
+        self.root = root.resolve()
+        self._watch_tree(self.root)
+
+    def _watch_tree(self, top: Path) -> None:
+        for dirpath, dirnames, _ in os.walk(top):
+            dirnames[:] = [d for d in dirnames if d not in DEFAULT_IGNORES]
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dirpath), _WATCH_MASK | IN_ONLYDIR)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == errno.ENOSPC:
+                    raise OSError(err, "inotify watch limit reached (fs.inotify.max_user_watches)")
+                continue
+            self._dirs[wd] = Path(dirpath)
+
+    def fileno(self) -> int:
+        return self._fd
+
+    def read_changes(self) -> Optional[Set[Path]]:
+        """Drain pending events: the changed files, or None if the tree must be walked again."""
+        changed: Set[Path] = set()
+        restructured = False
+        while True:
+            try:
+                data = os.read(self._fd, 1 << 16)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    restructured = True
+                    continue
+                directory = self._dirs.get(wd)
+                if mask & IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                    continue
+                if directory is None:
+                    continue
+                path = directory / name if name else directory
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO) and name not in DEFAULT_IGNORES:
+                        self._watch_tree(path)
+                    restructured = True
+                elif name in IGNORE_FILE_NAMES:
+                    restructured = True
+                elif mask & _STRUCTURE_MASK:
+                    if os.path.splitext(name)[1].lower() in EXT_LANG_MAP:
+                        restructured = True
+                else:
+                    changed.add(path)
+        return None if restructured else changed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+def create_watcher(root: Path, polling: bool = False, interval: float = DEFAULT_POLL_INTERVAL):
+    """An InotifyWatcher where available, otherwise a PollingWatcher."""
+    if not polling:
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(interval)
+
+
+class _Client:
+    __slots__ = ("sock", "buffer")
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.buffer = b""
+
+
+class Daemon:
+    """Serves a ScanIndex over a Unix socket while keeping it up to date.
+
+    Everything runs on one thread: the selector multiplexes the listening
+    socket, client connections and the watcher, so the index needs no
+    locking. ``on_update(paths)`` is called after every rescan with the
+    files whose reports changed.
+    """
+
+    def __init__(
+        self,
+        index: ScanIndex,
+        socket_path: Path,
+        watcher: Any = None,
+        on_update: Optional[Callable[[List[Path]], None]] = None,
+    ):
+        self.index = index
+        self.socket_path = Path(socket_path)
+        self.watcher = watcher if watcher is not None else PollingWatcher()
+        self.on_update = on_update
+        self._stopped = False
+        self._server: Optional[socket.socket] = None
+
+    def _listen(self) -> socket.socket:
+        path = str(self.socket_path)
+        if self.socket_path.exists():
+            try:
+                request(self.socket_path, {"cmd": "status"}, timeout=1.0)
+            except DaemonError:
+                os.unlink(path)  # left behind by a daemon that died
+            else:
+                raise DaemonError(f"a daemon is already listening on {path}")
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            server.bind(path)
+        except OSError as exc:
+            server.close()
+            raise DaemonError(f"cannot listen on {path}: {exc}") from exc
+        server.listen()
+        server.setblocking(False)
+        return server
+
+    def start(self) -> None:
+        """Bind the socket; call before serve_forever() to know when clients can connect."""
+        if self._server is None:
+            self._server = self._listen()
+
+    def stop(self) -> None:
+        self._stopped = True
+
+    def serve_forever(self) -> None:
+        self.start()
+        selector = selectors.DefaultSelector()
+        selector.register(self._server, selectors.EVENT_READ, None)
+        watch_fd = self.watcher.fileno()
+        if watch_fd is not None:
+            selector.register(watch_fd, selectors.EVENT_READ, self.watcher)
+        poll_interval = getattr(self.watcher, "interval", None)
+        next_poll = time.monotonic() + poll_interval if poll_interval else None
+        pending: Set[Path] = set()
+        full_refresh = False
+        due: Optional[float] = None
+        try:
+            while not self._stopped:
+                now = time.monotonic()
+                deadlines = [t for t in (due, next_poll) if t is not None]
+                timeout = max(min(deadlines) - now, 0.0) if deadlines else None
+                for key, _ in selector.select(timeout):
+                    if key.fileobj is self._server:
+                        self._accept(selector)
+                    elif key.data is self.watcher:
+                        changes = self.watcher.read_changes()
+                        if changes is None:
+                            full_refresh = True
+                        else:
+                            pending |= changes
+                        due = time.monotonic() + DEBOUNCE
+                    else:
+                        self._read(selector, key.data)
+                now = time.monotonic()
+                if next_poll is not None and now >= next_poll:
+                    full_refresh = True
+                    due = now
+                    next_poll = now + poll_interval
+                if due is not None and now >= due:
+                    updated = self.index.refresh() if full_refresh else self.index.update(pending)
+                    pending, full_refresh, due = set(), False, None
+                    if updated and self.on_update is not None:
+                        self.on_update(updated)
+        finally:
+            for key in list(selector.get_map().values()):
+                if isinstance(key.data, _Client):
+                    key.data.sock.close()
+            selector.close()
+            self.watcher.close()
+            self._server.close()
+            self._server = None
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+
+    def _accept(self, selector: selectors.BaseSelector) -> None:
+        try:
+            sock, _ = self._server.accept()
+        except BlockingIOError:
+            return
+        sock.setblocking(False)
+        selector.register(sock, selectors.EVENT_READ, _Client(sock))
+
+    def _read(self, selector: selectors.BaseSelector, client: _Client) -> None:
+        try:
+            data = client.sock.recv(1 << 16)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            selector.unregister(client.sock)
+            client.sock.close()
+            return
+        client.buffer += data
+        if len(client.buffer) > MAX_REQUEST_BYTES:
+            client.buffer = b""
+            self._reply(client, {"ok": False, "error": "request too large"})
+        while b"\n" in client.buffer:
+            line, client.buffer = client.buffer.split(b"\n", 1)
+            if line.strip():
+                self._reply(client, self.handle(line))
+
+    def _reply(self, client: _Client, response: Dict[str, Any]) -> None:
+        payload = (json.dumps(response, ensure_ascii=False) + "\n").encode("utf-8")
+        client.sock.setblocking(True)
+        try:
+            client.sock.sendall(payload)
+        except OSError:
+            pass
+        finally:
+            client.sock.setblocking(False)
+
+    def _status(self) -> Dict[str, Any]:
+        return {
+            "ok": True,
+            "root": str(self.index.root),
+            "files": len(self.index),
+            "issues": self.index.issue_count(),
+            "generation": self.index.generation,
+            "scanned_at": self.index.scanned_at,
+        }
+
+    def handle(self, line: bytes) -> Dict[str, Any]:
+        """Answer one request line."""
+        try:
+            req = json.loads(line)
+            cmd = req["cmd"]
+        except (ValueError, KeyError, TypeError):
+            return {"ok": False, "error": "expected a JSON object with a 'cmd' key"}
+        if cmd == "status":
+            return self._status()
+        if cmd == "findings":
+            path = req.get("path")
+            reports = self.index.reports(Path(path) if path else None)
+            return {
+                "ok": True,
+                "generation": self.index.generation,
+                "files": len(reports),
+                "findings": [finding.as_dict() for report in reports for finding in report.findings],
+                "skipped": [{"file": str(r.path), "reason": r.skipped} for r in reports if r.skipped is not None],
+            }
+        if cmd == "rescan":
+            self.index.refresh()
+            return self._status()
+        if cmd == "shutdown":
+            self.stop()
+            return {"ok": True}
+        return {"ok": False, "error": f"unknown command: {cmd!r}"}
+
+
+def request(socket_path: Path, payload: Dict[str, Any], timeout: float = 30.0) -> Dict[str, Any]:
+    """Send one request to a running daemon and return its response."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(str(socket_path))
+        sock.sendall((json.dumps(payload) + "\n").encode("utf-8"))
+        chunks = []
+        while True:
+            chunk = sock.recv(1 << 16)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            if chunk.endswith(b"\n"):
+                break
+    except OSError as exc:
+        raise DaemonError(f"no daemon on {socket_path}: {exc}") from exc
+    finally:
+        sock.close()
+    try:
+        return json.loads(b"".join(chunks))
+    except ValueError as exc:
+        raise DaemonError(f"invalid response from {socket_path}") from exc
+
+
+def findings_of(response: Dict[str, Any]) -> List[Finding]:
+    """The findings of a ``findings`` response as Finding records."""
+    return [Finding.from_dict(data) for data in response.get("findings", ())]
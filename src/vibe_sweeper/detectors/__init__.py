@@ -1,7 +1,28 @@
-from .ai_phrases import detect_ai_phrases
-from .comments import detect_long_comment_blocks
+from .base import LineDetector
+from .ai_phrases import AIPhraseLineDetector, PhraseMatcher, compile_phrases, detect_ai_phrases
+from .comments import CommentBlockLineDetector, CommentLineCounter, detect_long_comment_blocks
+from .registry import (
+    TextDetector,
+    available_detectors,
+    build_detectors,
+    enabled_detectors,
+    register_detector,
+    unregister_detector,
+)
 
 __all__ = [
+    "AIPhraseLineDetector",
+    "CommentBlockLineDetector",
+    "CommentLineCounter",
+    "LineDetector",
+    "PhraseMatcher",
+    "TextDetector",
+    "available_detectors",
+    "build_detectors",
+    "compile_phrases",
     "detect_ai_phrases",
     "detect_long_comment_blocks",
+    "enabled_detectors",
+    "register_detector",
+    "unregister_detector",
 ]
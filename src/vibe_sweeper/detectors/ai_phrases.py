@@ -1,5 +1,18 @@
+import heapq
+import re
+from collections import deque
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Pattern, Set, Tuple
+
+from ..findings import AI_PHRASE, Finding
+from ..scanner import MappedText, decode_bytes
+from .base import LineDetector
+
+try:  # Python 3.11+
+    from re import _parser as sre_parse
+except ImportError:  # pragma: no cover
+    import sre_parse
 
 
 DEFAULT_AI_PHRASES = [
@@ -11,21 +24,419 @@ DEFAULT_AI_PHRASES = [
     "as a large language model",
 ]
 
+# Up to this many phrases, lowercased bytes are searched with one bytes.find()
+# pass per phrase, which beats the trie regex for short lists.
+BYTE_LITERAL_MAX = 16
+
+# Kinds of ``ai_phrases`` entries: plain strings, and ``{kind: pattern}`` rules.
+PHRASE = "phrase"
+RULE_KINDS = ("regex", "fuzzy")
+
+# Characters other than "\n" that str.splitlines() treats as line boundaries.
+_EXOTIC_BREAKS = re.compile("[\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]")
+
+# The words of a fuzzy rule; whatever is between them in the text is a
+# separator. _SEPARATOR_KEY marks separators in the prefilter trie.
+_WORD = re.compile(r"[^\W_]+")
+_NON_WORD = re.compile(r"[\W_]+")
+_SEPARATOR = _NON_WORD.pattern
+_SEPARATOR_KEY = "\0"
+
+_REPEATS = tuple(
+    getattr(sre_parse, name) for name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT") if hasattr(sre_parse, name)
+)
+
+
+class PhraseRule(NamedTuple):
+    """One ``ai_phrases`` entry: a literal phrase, a regex or a fuzzy phrase.
+
+    ``pattern`` is also what findings report as their phrase.
+    """
+
+    kind: str
+    pattern: str
+
+
+def phrase_rule(entry: Any) -> PhraseRule:
+    """Read an ``ai_phrases`` entry: a string, ``{regex: ...}`` or ``{fuzzy: ...}``.
+
+    Raises ValueError for any other shape, an invalid regex, or a fuzzy
+    phrase without words.
+    """
+    if isinstance(entry, PhraseRule):
+        return entry
+    if isinstance(entry, str):
+        return PhraseRule(PHRASE, entry)
+    if isinstance(entry, Mapping) and len(entry) == 1:
+        ((kind, pattern),) = entry.items()
+        if kind in RULE_KINDS and isinstance(pattern, str):
+            if kind == "fuzzy":
+                _fuzzy_phrase(pattern)
+            else:
+                _parse_regex(pattern)
+            return PhraseRule(kind, pattern)
+    raise ValueError(f"expected a phrase, {{regex: ...}} or {{fuzzy: ...}}, got {entry!r}")
+
+
+def _parse_regex(pattern: str):
+    """The parsed form of a regex rule's pattern; ValueError if it is invalid."""
+    try:
+        return sre_parse.parse(pattern, re.IGNORECASE)
+    except re.error as exc:
+        raise ValueError(f"invalid regex {pattern!r}: {exc}") from None
+
+
+def _fuzzy_phrase(pattern: str) -> str:
+    """A fuzzy rule's words, lowercased and joined by single spaces."""
+    words = _WORD.findall(pattern.lower())
+    if not words:
+        raise ValueError(f"fuzzy phrase {pattern!r} has no words")
+    return " ".join(words)
+
+
+def _normalize(line: str) -> str:
+    """Collapse each run of whitespace and punctuation in ``line`` into one space."""
+    return _NON_WORD.sub(" ", line)
+
+
+def _regex_literals(pattern: str) -> Optional[FrozenSet[str]]:
+    """Lowercase literals one of which occurs in every match of ``pattern``, or None."""
+    return _required_literals(_parse_regex(pattern))
+
+
+def _required_literals(parsed) -> Optional[FrozenSet[str]]:
+    """The literals of _regex_literals() for a parsed regex.
+
+    Candidates are runs of ASCII literal characters, groups, repeats of at
+    least one, and alternations whose every branch has candidates (their
+    union). The most selective is kept: the one whose shortest literal is
+    longest.
+    """
+    candidates: List[FrozenSet[str]] = []
+    run: List[str] = []
+    for op, av in list(parsed) + [(None, None)]:
+        if op is sre_parse.LITERAL and av < 128:
+            run.append(chr(av).lower())
+            continue
+        if run:
+            candidates.append(frozenset(("".join(run),)))
+            run = []
+        found = None
+        if op is sre_parse.SUBPATTERN:
+            found = _required_literals(av[-1])
+        elif op is sre_parse.BRANCH:
+            branches = [_required_literals(branch) for branch in av[1]]
+            if all(branches):
+                found = frozenset().union(*branches)
+        elif op in _REPEATS and av[0] >= 1:
+            found = _required_literals(av[2])
+        if found:
+            candidates.append(found)
+    return max(candidates, key=lambda literals: (min(map(len, literals)), -len(literals)), default=None)
+
+
+def _search_lines(pattern: Pattern, text, newline) -> Iterator[Tuple[int, int]]:
+    """Yield ``(start, end)`` of each line of ``text`` where ``pattern`` finds a match, once each."""
+    search = pattern.search
+    m = search(text)
+    while m is not None:
+        start = text.rfind(newline, 0, m.start()) + 1
+        end = text.find(newline, m.start())
+        if end == -1:
+            end = len(text)
+        yield start, end
+        m = search(text, end + 1)
+
+
+def _unique(lines: Iterable[Tuple[int, int]]) -> Iterator[Tuple[int, int]]:
+    last = None
+    for line in lines:
+        if line != last:
+            yield line
+            last = line
+
+
+def _trie_pattern(phrases: Iterable[str]) -> str:
+    """Build a regex that matches any of ``phrases``, factored as a trie.
+
+    Branches are only taken on the next character, so ``re`` never retries
+    every phrase at every position the way a flat alternation would. A
+    terminal node ends its branch: once a shorter phrase has matched the
+    longer ones sharing its prefix cannot change the answer. _SEPARATOR_KEY
+    in a phrase stands for any run of whitespace and punctuation.
+    """
+    trie: Dict[str, Dict] = {}
+    for phrase in phrases:
+        node = trie
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node.clear()
+        node[""] = {}
+
+    def emit(node: Dict[str, Dict]) -> str:
+        if "" in node:
+            return ""
+        alts = [
+            (_SEPARATOR if ch == _SEPARATOR_KEY else re.escape(ch)) + emit(child) for ch, child in sorted(node.items())
+        ]
+        if len(alts) == 1:
+            return alts[0]
+        return "(?:" + "|".join(alts) + ")"
+
+    return emit(trie)
+
 
-def detect_ai_phrases(path: Path, text: str, phrases=None) -> List[Dict]:
+class _Automaton:
+    """Aho-Corasick automaton mapping each literal it finds to the rules that need it."""
+
+    def __init__(self, literals: Iterable[Tuple[str, int]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+        for literal, index in literals:
+            self._add(literal, index)
+        self._build()
+
+    def _add(self, phrase: str, index: int) -> None:
+        state = 0
+        for ch in phrase:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+                self._goto[state][ch] = nxt
+            state = nxt
+        self._out[state] += (index,)
+
+    def _build(self) -> None:
+        goto, fail, out = self._goto, self._fail, self._out
+        # Depth-1 states keep the root as their failure link.
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt] += out[fail[nxt]]
+
+    def hits(self, line: str, found: Set[int]) -> None:
+        """Add the rule indexes of every literal in ``line`` to ``found``."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for ch in line:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+
+
+class PhraseMatcher:
+    """Aho-Corasick automaton over a fixed list of phrases and rules.
+
+    Matching cost depends on the length of the text, not on how many phrases
+    are configured. A trie-shaped regex is used to jump straight to the lines
+    that contain at least one phrase; only those lines are walked through the
+    automaton to collect every phrase they contain.
+
+    Rules share that engine. A regex rule is entered in the trie and the
+    automaton by literals that every match must contain (its most selective
+    literal run or alternation), and its regex only runs on lines where one
+    of them was found. A fuzzy rule enters the trie with a separator pattern
+    between its words, and candidate lines are confirmed with a second
+    automaton over the line with whitespace and punctuation collapsed.
+    Regexes without a required literal are searched for over the whole text,
+    so they cost a pass each.
+    """
+
+    def __init__(self, phrases: Iterable[Any]):
+        self.rules: Tuple[PhraseRule, ...] = tuple(phrase_rule(entry) for entry in phrases)
+        self.phrases: Tuple[str, ...] = tuple(rule.pattern for rule in self.rules)
+        # Rule index -> regex confirming a candidate line, for regex rules;
+        # compiled the first time one of its literals is found.
+        self._regexes: Dict[int, Optional[Pattern[str]]] = {}
+        # Regex rules without a required literal, and the same compiled to
+        # search a whole text for them.
+        self._unfiltered: Tuple[int, ...] = ()
+        self._scans: Tuple[Pattern[str], ...] = ()
+
+        literals: List[Tuple[str, int]] = []
+        fuzzy: List[Tuple[str, int]] = []
+        for index, rule in enumerate(self.rules):
+            if rule.kind == "fuzzy":
+                fuzzy.append((_fuzzy_phrase(rule.pattern), index))
+                continue
+            if rule.kind == PHRASE:
+                required: Optional[FrozenSet[str]] = frozenset((rule.pattern,))
+            else:
+                self._regexes[index] = None
+                required = _regex_literals(rule.pattern)
+            if required is None:
+                self._unfiltered += (index,)
+                self._scans += (re.compile(rule.pattern, re.IGNORECASE | re.MULTILINE),)
+                continue
+            for literal in sorted(required):
+                # Phrases can never span lines, and the empty phrase is meaningless.
+                if literal and literal == "".join(literal.splitlines()):
+                    literals.append((literal, index))
+        self._automaton = _Automaton(literals)
+        self._fuzzy = _Automaton(fuzzy) if fuzzy else None
+
+        searchable = list(dict.fromkeys(literal for literal, _ in literals))
+        trie = searchable + [phrase.replace(" ", _SEPARATOR_KEY) for phrase, _ in fuzzy]
+        self._prefilter = re.compile(_trie_pattern(trie)) if trie else None
+        # Searching lowercased bytes is only exact when every phrase is ASCII,
+        # where bytes.lower() agrees with str.lower(). Regexes without a
+        # literal are only run on text.
+        self.bytes_searchable = all(phrase.isascii() for phrase in trie) and not self._unfiltered
+        self._byte_literals: Tuple[bytes, ...] = ()
+        self._byte_prefilter: Optional[Pattern[bytes]] = None
+        if trie and self.bytes_searchable:
+            if len(trie) <= BYTE_LITERAL_MAX and not fuzzy:
+                self._byte_literals = tuple(p.encode("ascii") for p in searchable)
+            else:
+                self._byte_prefilter = re.compile(_trie_pattern(trie).encode("ascii"))
+
+    @property
+    def literal_only(self) -> bool:
+        """True if every entry is a plain phrase, so finding a literal is a match."""
+        return len(self._regexes) == len(self._unfiltered) == 0 and self._fuzzy is None
+
+    def match_line(self, line: str) -> List[str]:
+        """Return the phrases and rules found in an already-lowercased line, in list order."""
+        hits = set(self._unfiltered)
+        self._automaton.hits(line, hits)
+        regexes = self._regexes
+        if regexes:
+            hits = {i for i in hits if i not in regexes or self._regex(i).search(line)}
+        if self._fuzzy is not None:
+            self._fuzzy.hits(_normalize(line), hits)
+        return [self.phrases[i] for i in sorted(hits)]
+
+    def _regex(self, index: int) -> Pattern[str]:
+        regex = self._regexes[index]
+        if regex is None:
+            regex = self._regexes[index] = re.compile(self.phrases[index], re.IGNORECASE)
+        return regex
+
+    def iter_byte_lines(self, lowered: bytes) -> Iterator[Tuple[int, int]]:
+        """Yield ``(start, end)`` of each line of lowercased bytes that may hold a phrase.
+
+        Lines end at newline bytes only and are yielded in order, once each. Only
+        valid when ``bytes_searchable`` is true.
+        """
+        if self._byte_prefilter is not None:
+            yield from _search_lines(self._byte_prefilter, lowered, b"\n")
+            return
+        lines: Dict[int, int] = {}
+        for literal in self._byte_literals:
+            pos = lowered.find(literal)
+            while pos != -1:
+                start = lowered.rfind(b"\n", 0, pos) + 1
+                end = lowered.find(b"\n", pos)
+                if end == -1:
+                    end = len(lowered)
+                lines[start] = end
+                pos = lowered.find(literal, end)
+        yield from sorted(lines.items())
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, str]]:
+        """Yield ``(line_number, phrase)`` for every phrase found in ``text``.
+
+        Matching is case-insensitive and line numbers follow
+        ``str.splitlines()``.
+        """
+        searches = ([self._prefilter] if self._prefilter is not None else []) + list(self._scans)
+        if not searches:
+            return
+        lowered = text.lower()
+
+        if _EXOTIC_BREAKS.search(lowered) is not None:
+            for lineno, line in enumerate(lowered.splitlines(), start=1):
+                if any(pattern.search(line) for pattern in searches):
+                    for phrase in self.match_line(line):
+                        yield lineno, phrase
+            return
+
+        if len(searches) == 1:
+            lines = _search_lines(searches[0], lowered, "\n")
+        else:
+            lines = _unique(heapq.merge(*(_search_lines(pattern, lowered, "\n") for pattern in searches)))
+        lineno = 1
+        counted = 0
+        for start, end in lines:
+            lineno += lowered.count("\n", counted, start)
+            counted = start
+            for phrase in self.match_line(lowered[start:end]):
+                yield lineno, phrase
+
+
+@lru_cache(maxsize=32)
+def _compile(phrases: Tuple[PhraseRule, ...]) -> PhraseMatcher:
+    return PhraseMatcher(phrases)
+
+
+def compile_phrases(phrases=None) -> PhraseMatcher:
+    """Return a (cached) matcher for ``phrases``, defaulting to DEFAULT_AI_PHRASES.
+
+    Entries are phrases or ``{regex: ...}``/``{fuzzy: ...}`` rules, see
+    phrase_rule().
+    """
+    if isinstance(phrases, PhraseMatcher):
+        return phrases
     if phrases is None:
         phrases = DEFAULT_AI_PHRASES
-    lowered = text.lower().splitlines()
-    results: List[Dict] = []
-    for idx, line in enumerate(lowered, start=1):
-        for phrase in phrases:
-            if phrase in line:
-                results.append(
-                    {
-                        "file": str(path),
-                        "line": idx,
-                        "phrase": phrase,
-                        "kind": "ai_phrase",
-                    }
-                )
-    return results
+    return _compile(tuple(phrase_rule(entry) for entry in phrases))
+
+
+def detect_ai_phrases(path: Path, text: str, phrases=None) -> List[Finding]:
+    matcher = compile_phrases(phrases)
+    file = str(path)
+    return [Finding(file, AI_PHRASE, lineno, phrase=phrase) for lineno, phrase in matcher.iter_matches(text)]
+
+
+class AIPhraseLineDetector(LineDetector):
+    """Streaming form of detect_ai_phrases."""
+
+    def __init__(self, path: Path, phrases=None):
+        self.file = str(path)
+        self.matcher = compile_phrases(phrases)
+        self._results: List[Finding] = []
+
+    @classmethod
+    def from_config(cls, path: Path, cfg: Dict) -> "AIPhraseLineDetector":
+        # A CompiledConfig carries the matcher; plain dicts are compiled here.
+        matcher = getattr(cfg, "phrase_matcher", None)
+        return cls(path, matcher if matcher is not None else cfg.get("ai_phrases"))
+
+    def feed(self, first_line: int, lines: List[str]) -> None:
+        offset = first_line - 1
+        for lineno, phrase in self.matcher.iter_matches("\n".join(lines)):
+            self._results.append(Finding(self.file, AI_PHRASE, offset + lineno, phrase=phrase))
+
+    def finish(self) -> List[Finding]:
+        return self._results
+
+    def scan_bytes(self, text: MappedText) -> Optional[List[Finding]]:
+        if not self.matcher.bytes_searchable:
+            return None
+        literal_only = self.matcher.literal_only
+        for offset, chunk in text.iter_windows():
+            lowered = chunk.lower()
+            for start, end in self.matcher.iter_byte_lines(lowered):
+                lineno = text.line_number(offset + start)
+                line = lowered[start:end]
+                # Only ASCII bytes can be part of a literal match, so latin-1
+                # stands in for the real encoding unless a regex needs it.
+                if literal_only or line.isascii():
+                    line = line.decode("latin-1")
+                else:
+                    line = decode_bytes(chunk[start:end]).lower()
+                for phrase in self.matcher.match_line(line):
+                    self._results.append(Finding(self.file, AI_PHRASE, lineno, phrase=phrase))
+        return self._results
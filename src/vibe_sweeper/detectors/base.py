@@ -0,0 +1,40 @@
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..findings import Finding
+from ..scanner import MappedText
+
+
+class LineDetector:
+    """A detector that consumes a file as a stream of line batches.
+
+    The scanner reads each file once and hands the same batches to every
+    detector, so a detector should only keep the bounded state it needs
+    between calls (never the whole file). Lines carry no line terminators
+    and follow ``str.splitlines()`` semantics.
+    """
+
+    @classmethod
+    def from_config(cls, path: Path, cfg: Dict[str, Any]) -> "LineDetector":
+        """Build the detector for one file from the active config."""
+        return cls(path)
+
+    def feed(self, first_line: int, lines: List[str]) -> None:
+        """Process ``lines``; ``first_line`` is the 1-based number of ``lines[0]``."""
+        raise NotImplementedError
+
+    def finish(self) -> List[Finding]:
+        """Called once after the last batch; returns the file's findings.
+
+        Plain dicts in the shape of ``Finding.as_dict()`` are accepted too.
+        """
+        raise NotImplementedError
+
+    def scan_bytes(self, text: MappedText) -> Optional[List[Finding]]:
+        """Optional fast path: return the whole file's findings from its raw bytes.
+
+        Only called on files where ``text.is_plain`` holds, and instead of
+        ``feed``/``finish``. Return None to have the file streamed as lines
+        instead; the default always does.
+        """
+        return None
@@ -1,38 +1,159 @@
 from pathlib import Path
-from typing import List, Dict
-
-COMMENT_PREFIXES = ("#", "//", "/*", "*")
-
-
-def detect_long_comment_blocks(path: Path, text: str, max_lines: int = 20) -> List[Dict]:
-    lines = text.splitlines()
-    blocks = []
-    current_block = []
-    for idx, line in enumerate(lines, start=1):
-        stripped = line.strip()
-        if stripped.startswith(COMMENT_PREFIXES):
-            current_block.append((idx, line))
-        else:
-            if current_block:
-                blocks.append(current_block)
-                current_block = []
-    if current_block:
-        blocks.append(current_block)
-
-    results: List[Dict] = []
-    for block in blocks:
-        if len(block) > max_lines:
-            start_line = block[0][0]
-            end_line = block[-1][0]
-            preview = "\n".join(l for _, l in block[:5])
-            results.append(
-                {
-                    "file": str(path),
-                    "start_line": start_line,
-                    "end_line": end_line,
-                    "lines": len(block),
-                    "preview": preview,
-                    "kind": "long_comment_block",
-                }
+from typing import List, Dict, Optional
+
+from ..findings import LONG_COMMENT_BLOCK, Finding
+from ..scanner import MappedText
+from .base import LineDetector
+from .lexer import CommentLexer, CommentSyntax, syntax_for
+
+PREVIEW_LINES = 5
+
+# A min_lines that no run reaches, for lexing only to count comment lines.
+_NO_RUNS = 1 << 62
+
+
+class CommentBlockLineDetector(LineDetector):
+    """Streaming form of detect_long_comment_blocks.
+
+    Comment lines are found by the lexer for the file's language (see
+    ``detectors/lexer.py``), so comment syntax inside strings and
+    docstrings is ignored and the interior lines of block comments count.
+    Short runs of comment lines that cannot grow into a long block are
+    dropped by the lexer in bulk, so the cost is per long block, not per line.
+    Only the start, end and first PREVIEW_LINES lines of the current block
+    are kept, so memory does not grow with the size of the block.
+    """
+
+    def __init__(self, path: Path, max_lines: int = 20, syntax: Optional[CommentSyntax] = None):
+        self.file = str(path)
+        self.max_lines = max_lines
+        self.syntax = syntax if syntax is not None else syntax_for(path)
+        self._lexer = CommentLexer(self.syntax)
+        self._results: List[Finding] = []
+        self._start = 0
+        self._end = 0
+        self._preview: List[str] = []
+
+    @classmethod
+    def from_config(cls, path: Path, cfg: Dict) -> "CommentBlockLineDetector":
+        return cls(path, max_lines=cfg.get("max_comment_block_lines", 20))
+
+    @property
+    def comment_lines(self) -> int:
+        """Comment lines seen so far, in blocks of any length."""
+        return self._lexer.comment_lines
+
+    def feed(self, first_line: int, lines: List[str]) -> None:
+        if not lines:
+            return
+        chunk = "\n".join(lines) + "\n"
+        start, end = self._start, self._end
+        line, mark = first_line, 0
+        for offset, _, count in self._lexer.runs(chunk, self.max_lines + 1):
+            line += chunk.count("\n", mark, offset)
+            mark = offset
+            if end and line <= end + 1:
+                end = line + count - 1
+                continue
+            if end and end - start + 1 > self.max_lines:
+                self._close_block(start, end - start + 1, self._preview_of(start, end, first_line, lines))
+            start, end = line, line + count - 1
+            self._preview = []
+        if end:
+            self._preview = self._preview_of(start, end, first_line, lines)
+        self._start, self._end = start, end
+
+    def _preview_of(self, start: int, end: int, first_line: int, lines: List[str]) -> List[str]:
+        """The preview of the block ``start``-``end``, topped up from this batch of ``lines``."""
+        preview = self._preview
+        if start >= first_line:
+            preview = []
+        missing = min(PREVIEW_LINES, end - start + 1) - len(preview)
+        if missing <= 0:
+            return preview
+        index = start + len(preview) - first_line
+        return preview + lines[index : index + missing]
+
+    def _close_block(self, start: int, count: int, preview: List[str]) -> None:
+        if count > self.max_lines:
+            self._results.append(
+                Finding(
+                    self.file,
+                    LONG_COMMENT_BLOCK,
+                    start,
+                    end_line=start + count - 1,
+                    lines=count,
+                    preview="\n".join(preview),
+                )
             )
-    return results
+
+    def scan_bytes(self, text: MappedText) -> Optional[List[Finding]]:
+        lexer = self._lexer = CommentLexer(self.syntax)
+        start = end = count = 0
+        for window_offset, chunk in text.iter_windows():
+            for first, last, lines in lexer.runs(chunk + b"\n", self.max_lines + 1):
+                first += window_offset
+                if count and first == end + 1:
+                    count += lines
+                else:
+                    if count:
+                        self._close_mapped(text, start, count)
+                    start, count = first, lines
+                end = window_offset + last
+        if count:
+            self._close_mapped(text, start, count)
+        return self._results
+
+    def _close_mapped(self, text: MappedText, start: int, count: int) -> None:
+        if count <= self.max_lines:
+            return
+        preview = []
+        offset = start
+        for _ in range(min(count, PREVIEW_LINES)):
+            preview.append(text.line_text(offset))
+            offset = text.line_bounds(offset)[1] + 1
+        self._close_block(text.line_number(start), count, preview)
+
+    def finish(self) -> List[Finding]:
+        if self._end:
+            self._close_block(self._start, self._end - self._start + 1, self._preview)
+            self._end = 0
+        return self._results
+
+
+class CommentLineCounter(LineDetector):
+    """Counts a file's comment lines without reporting anything.
+
+    The engine runs it for the file metrics when the long_comment_blocks
+    detector, which counts them as it goes, is disabled. Runs of any length
+    are dropped by the lexer in bulk, so only the counting is left.
+    """
+
+    def __init__(self, path: Path, syntax: Optional[CommentSyntax] = None):
+        self.syntax = syntax if syntax is not None else syntax_for(path)
+        self._lexer = CommentLexer(self.syntax)
+
+    @property
+    def comment_lines(self) -> int:
+        return self._lexer.comment_lines
+
+    def feed(self, first_line: int, lines: List[str]) -> None:
+        if lines:
+            for _ in self._lexer.runs("\n".join(lines) + "\n", _NO_RUNS):
+                pass
+
+    def finish(self) -> List[Finding]:
+        return []
+
+    def scan_bytes(self, text: MappedText) -> Optional[List[Finding]]:
+        lexer = self._lexer = CommentLexer(self.syntax)
+        for _, chunk in text.iter_windows():
+            for _ in lexer.runs(chunk + b"\n", _NO_RUNS):
+                pass
+        return []
+
+
+def detect_long_comment_blocks(path: Path, text: str, max_lines: int = 20) -> List[Finding]:
+    detector = CommentBlockLineDetector(path, max_lines=max_lines)
+    detector.feed(1, text.splitlines())
+    return detector.finish()
@@ -0,0 +1,385 @@
+"""Per-language comment and string tokens, used to find comment lines in one pass.
+
+Each language is described by the tokens that can hide or contain comment
+syntax: its comments, and the string literals in which ``#`` or ``//`` is
+not a comment. A string that is not closed on its line ends there, so only
+tokens that can span lines (block comments, triple-quoted and template
+strings) change what a line starting with a comment marker means. Lines are
+therefore classified in bulk, as a plain prefix check would be, and the
+lines around each multi-line opener (located with ``str.find``) are lexed
+token by token with one alternation of all the tokens. Tokens left open at
+the end of a chunk carry over to the next one.
+
+Classification yields runs of comment lines, not lines: one regex match
+per run, or, for stretches of at least NUMPY_MIN_CHARS between openers
+when NumPy is installed, a handful of array operations over the whole
+stretch. Both give the same runs.
+
+Not handled, as a deliberate trade for speed: JavaScript regex literals,
+nesting inside template strings, string lines continued with a backslash,
+and comments in ``<script>``/``<style>`` elements of HTML files.
+"""
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Pattern, Sequence, Tuple, Union
+
+from ..scanner import EXT_LANG_MAP
+
+COMMENT_PREFIXES = ("#", "//", "/*", "*")
+
+# A chunk of whole lines, each ending in "\n".
+Chunk = Union[str, bytes]
+
+# (offset of the first line, offset of the newline ending the last line,
+# number of lines) of consecutive comment lines in a chunk.
+CommentRun = Tuple[int, int, int]
+
+# Stretches of lines at least this long are classified with NumPy, when it
+# is installed; below that, the cost of the array calls outweighs the gain.
+NUMPY_MIN_CHARS = 1 << 15
+
+# The numpy module once imported, False if it is not installed.
+_numpy: Any = None
+
+# Whitespace other than "\n" for byte patterns, as matched by [^\S\n].
+_BYTE_BLANKS = (9, 11, 12, 13, 32)
+
+
+class Token(NamedTuple):
+    """One kind of token: a literal opener and regex fragments for the rest.
+
+    ``closer`` is empty for tokens that run to the end of the line. With
+    ``single_line``, a token whose closer is missing ends at the newline
+    (an unterminated string literal) unless the newline is escaped. An
+    ``at_line_start`` opener only counts after nothing but blanks.
+    """
+
+    opener: str
+    body: str
+    closer: str
+    comment: bool
+    single_line: bool = False
+    at_line_start: bool = False
+
+
+def _line_comment(opener: str, at_line_start: bool = False) -> Token:
+    return Token(opener, r"[^\n]*", "", True, at_line_start=at_line_start)
+
+
+def _block_comment(opener: str, closer: str) -> Token:
+    first = re.escape(closer[0])
+    rest = re.escape(closer[1:])
+    return Token(opener, rf"(?:[^{first}]+|{first}(?!{rest}))*", re.escape(closer), True)
+
+
+def _string(quote: str, multiline: bool = False) -> Token:
+    q = re.escape(quote)
+    stop = "" if multiline else r"\n"
+    return Token(quote, rf"(?:[^{q}\\{stop}]+|\\.)*", q, False, single_line=not multiline)
+
+
+def _triple_string(quote: str) -> Token:
+    q = re.escape(quote)
+    return Token(quote * 3, rf"(?:[^{q}\\]+|\\.|{q}(?!{q}{q}))*", q * 3, False)
+
+
+def _opener(token: Token) -> str:
+    opener = re.escape(token.opener)
+    return r"(?m:^)[^\S\n]*" + opener if token.at_line_start else opener
+
+
+def _tail(token: Token, capture: bool = False) -> str:
+    if not token.closer:
+        return ""
+    closer = f"({token.closer})" if capture else token.closer
+    if token.single_line:
+        return f"(?:{closer}|(?=\\n)|\\Z)"
+    return f"(?:{closer}|\\Z)"
+
+
+class _Compiled:
+    """A syntax's patterns for one string type (``str`` or ``bytes``)."""
+
+    def __init__(self, tokens: Sequence[Token], encode: bool):
+        def pattern(text: str) -> Pattern:
+            return re.compile(text.encode("ascii") if encode else text, re.DOTALL)
+
+        self.newline = b"\n" if encode else "\n"
+        # Every token, one alternative each: (token index, group of its
+        # closer) by group number of the alternative.
+        self.groups: Dict[int, Tuple[int, int]] = {}
+        alternatives = []
+        group = 1
+        for index, token in enumerate(tokens):
+            closer = group + 1 if token.closer else 0
+            self.groups[group] = (index, closer)
+            alternatives.append(f"({_opener(token)}{token.body}{_tail(token, capture=True)})")
+            group += 2 if token.closer else 1
+        self.master = pattern("|".join(alternatives))
+        # The rest of each token with a closer, after its opener; group 1 is
+        # the closer, missing when the token is left open at the end of a chunk.
+        self.rest: List[Optional[Pattern]] = [
+            pattern(f"{token.body}{_tail(token, capture=True)}") if token.closer else None for token in tokens
+        ]
+        # Consecutive lines whose first non-blank characters open a line
+        # comment: at the start of a chunk, and after a newline, which gives
+        # re a literal to scan for.
+        openers = [token.opener for token in tokens if token.comment and not token.closer]
+        comment_line = r"[^\S\n]*(?:" + "|".join(map(re.escape, openers)) + r")[^\n]*"
+        self.first_run = pattern(rf"{comment_line}(?:\n{comment_line})*") if openers else None
+        self.next_run = pattern(rf"\n{comment_line}(?:\n{comment_line})*") if openers else None
+        # The same openers as code units, for the NumPy classifier.
+        self.line_openers: Tuple[Tuple[int, ...], ...] = tuple(tuple(map(ord, opener)) for opener in openers)
+        # Openers of the tokens that can span lines, found with str.find.
+        self.multiline: Tuple[Chunk, ...] = tuple(
+            token.opener.encode("ascii") if encode else token.opener
+            for token in tokens
+            if token.closer and not token.single_line
+        )
+
+
+def _next_opener(chunk: Chunk, openers: Sequence[Chunk], found: List[int], pos: int) -> Tuple[int, int]:
+    """The span of the first of ``openers`` at or after ``pos``, or ``(-1, -1)``.
+
+    ``found`` holds the last position found for each opener (-2 before the
+    first search, -1 once there are no more), so each one is searched for
+    again only after ``pos`` has passed it.
+    """
+    start = stop = -1
+    for index, opener in enumerate(openers):
+        at = found[index]
+        if at == -2 or 0 <= at < pos:
+            at = found[index] = chunk.find(opener, pos)
+        if at >= 0 and (start < 0 or at < start):
+            start, stop = at, at + len(opener)
+    return start, stop
+
+
+def _load_numpy() -> Any:
+    """The numpy module, or None if it is not installed. Imported on first use."""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            _numpy = False
+        else:
+            _numpy = numpy
+    return _numpy or None
+
+
+def _code_units(np: Any, chunk: Chunk) -> Tuple[Any, Tuple[int, ...]]:
+    """``chunk`` as an array with one element per character (or byte), and its blanks."""
+    if isinstance(chunk, bytes):
+        return np.frombuffer(chunk, np.uint8), _BYTE_BLANKS
+    if chunk.isascii():
+        return np.frombuffer(chunk.encode("ascii"), np.uint8), _str_blanks()
+    return np.frombuffer(chunk.encode("utf-32-le"), np.uint32), _str_blanks()
+
+
+@lru_cache(maxsize=None)
+def _str_blanks() -> Tuple[int, ...]:
+    """Whitespace other than "\\n" for str patterns, as matched by [^\\S\\n]."""
+    # U+3000 is the highest whitespace code point.
+    return tuple(c for c in range(0x3001) if c != 10 and chr(c).isspace())
+
+
+def _regex_runs(
+    compiled: "_Compiled", chunk: Chunk, pos: int, stop: int, min_lines: int
+) -> Tuple[List[CommentRun], int]:
+    """CommentRuns of line comments in the lines from ``pos`` to ``stop``, one match per run.
+
+    Also return the number of comment lines, counting the runs left out.
+    """
+    newline = compiled.newline
+    runs: List[CommentRun] = []
+    total = 0
+    search = max(pos - 1, 0)
+    if pos == 0:
+        m = compiled.first_run.match(chunk, 0, stop)
+        if m is not None:
+            search = m.end()
+            total = chunk.count(newline, 0, search) + 1
+            runs.append((0, search, total))
+    for m in compiled.next_run.finditer(chunk, search, stop):
+        start, end = m.span()
+        count = chunk.count(newline, start, end)
+        total += count
+        if count >= min_lines or start + 1 == pos or end + 1 == stop:
+            runs.append((start + 1, end, count))
+    return runs, total
+
+
+def _array_runs(
+    np: Any, units: Any, blanks: Tuple[int, ...], compiled: "_Compiled", pos: int, stop: int, min_lines: int
+) -> Tuple[List[CommentRun], int]:
+    """The same as _regex_runs(), found with array operations on ``units``."""
+    lines = units[pos:stop]
+    ends = np.flatnonzero(lines == 10)
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    # Each line's first non-blank character (its newline at the latest),
+    # stepping over one column of indentation at a time.
+    if lines.itemsize == 1:
+        table = np.zeros(256, dtype=bool)
+        table[[blank for blank in blanks if blank < 256]] = True
+    first = starts.copy()
+    indented = np.arange(len(first))
+    while len(indented):
+        at = lines[first[indented]]
+        indented = indented[table[at] if lines.itemsize == 1 else np.isin(at, blanks)]
+        first[indented] += 1
+    # The last unit is a newline, which matches no opener.
+    last = len(lines) - 1
+    comment = np.zeros(len(starts), dtype=bool)
+    for opener in compiled.line_openers:
+        hit = lines[first] == opener[0]
+        for shift, unit in enumerate(opener[1:], 1):
+            hit &= lines[np.minimum(first + shift, last)] == unit
+        comment |= hit
+    # Line indexes where runs start and stop, in pairs.
+    bounds = np.flatnonzero(np.diff(comment, prepend=False, append=False)).reshape(-1, 2)
+    counts = bounds[:, 1] - bounds[:, 0]
+    total = int(counts.sum())
+    keep = (counts >= min_lines) | (bounds[:, 0] == 0) | (bounds[:, 1] == len(starts))
+    bounds, counts = bounds[keep], counts[keep]
+    run_starts = (starts[bounds[:, 0]] + pos).tolist()
+    run_ends = (ends[bounds[:, 1] - 1] + pos).tolist()
+    return list(zip(run_starts, run_ends, counts.tolist())), total
+
+
+class CommentSyntax:
+    """The comment and string tokens of one language, compiled for text and bytes."""
+
+    def __init__(self, tokens: Sequence[Token]):
+        self.tokens = tuple(tokens)
+        self.comment = tuple(token.comment for token in self.tokens)
+        self.text = _Compiled(self.tokens, encode=False)
+        self.binary = _Compiled(self.tokens, encode=True)
+
+
+class CommentLexer:
+    """Finds the comment lines of one file, fed as consecutive chunks of whole lines.
+
+    A line is a comment line when its first non-blank character is inside a
+    comment: a comment after code does not count, every line inside a block
+    comment does, and comment syntax inside string literals (docstrings
+    included) is ignored. ``comment_lines`` counts the comment lines of
+    the chunks lexed so far, including those of runs left out.
+    """
+
+    def __init__(self, syntax: CommentSyntax):
+        self.syntax = syntax
+        self.comment_lines = 0
+        # Index of the token left open at the end of the previous chunk.
+        self._open: Optional[int] = None
+
+    def runs(self, chunk: Chunk, min_lines: int = 1) -> Iterator[CommentRun]:
+        """Yield a CommentRun for each stretch of comment lines in ``chunk``.
+
+        ``chunk`` holds whole lines, each ending in ``"\\n"``. Runs are
+        yielded in order and may be adjacent to one another. Runs of fewer
+        than ``min_lines`` lines may be left out when nothing can extend
+        them: runs of line comments between two code lines of the chunk.
+        """
+        compiled = self.syntax.text if isinstance(chunk, str) else self.syntax.binary
+        newline = compiled.newline
+        end = len(chunk)
+        found = [-2] * len(compiled.multiline)
+        pos = 0
+        # Lexing token by token (from the line of a multi-line opener up to
+        # ``limit``) rather than only looking for lines that start a comment.
+        lexing = False
+        limit = 0
+        # Code units of the chunk for the NumPy classifier, made on first use.
+        units = blanks = None
+
+        if self._open is not None:
+            index = self._open
+            m = compiled.rest[index].match(chunk)
+            pos = m.end()
+            if pos == end and m.start(1) < 0:
+                if self.syntax.comment[index]:
+                    count = chunk.count(newline)
+                    self.comment_lines += count
+                    yield 0, end - 1, count
+                return
+            self._open = None
+            if self.syntax.comment[index] and pos:
+                last = chunk.find(newline, pos - 1)
+                count = chunk.count(newline, 0, last) + 1
+                self.comment_lines += count
+                yield 0, last, count
+            lexing, limit = True, pos
+
+        while pos < end:
+            if not lexing:
+                opener, limit = _next_opener(chunk, compiled.multiline, found, pos)
+                stop = (chunk.rfind(newline, pos, opener) + 1 or pos) if opener >= 0 else end
+                if compiled.next_run is not None and stop > pos:
+                    if stop - pos >= NUMPY_MIN_CHARS and _load_numpy() is not None:
+                        if units is None:
+                            units, blanks = _code_units(_numpy, chunk)
+                        batch, count = _array_runs(_numpy, units, blanks, compiled, pos, stop, min_lines)
+                    else:
+                        batch, count = _regex_runs(compiled, chunk, pos, stop, min_lines)
+                    self.comment_lines += count
+                    yield from batch
+                if opener < 0:
+                    return
+                pos, lexing = stop, True
+                continue
+
+            if pos >= limit:
+                # Back to looking for comment lines at the next line, unless
+                # another token that can span lines opens before it.
+                if pos == 0 or chunk[pos - 1 : pos] == newline:
+                    next_line = pos
+                else:
+                    next_line = chunk.find(newline, pos) + 1
+                opener, opener_end = _next_opener(chunk, compiled.multiline, found, pos)
+                if opener < 0 or opener >= next_line:
+                    pos, lexing = next_line, False
+                    continue
+                limit = opener_end
+
+            m = compiled.master.search(chunk, pos)
+            index, closer = compiled.groups[m.lastindex]
+            start, pos = m.span()
+            if closer and pos == end and m.start(closer) < 0:
+                self._open = index
+            if not self.syntax.comment[index]:
+                continue
+            first = chunk.rfind(newline, 0, start) + 1
+            if first != start and not chunk[first:start].isspace():
+                first = chunk.find(newline, start) + 1
+            last = chunk.find(newline, pos - 1) if pos else -1
+            if first <= last:
+                count = chunk.count(newline, first, last) + 1
+                self.comment_lines += count
+                yield first, last, count
+
+
+_JS = (_line_comment("//"), _block_comment("/*", "*/"), _string('"'), _string("'"), _string("`", multiline=True))
+
+SYNTAXES: Dict[str, CommentSyntax] = {
+    "python": CommentSyntax(
+        (_line_comment("#"), _triple_string('"'), _triple_string("'"), _string('"'), _string("'"))
+    ),
+    "javascript": CommentSyntax(_JS),
+    "typescript": CommentSyntax(_JS),
+    # JSON has no comments, but tsconfig.json and editor settings use JSONC.
+    "json": CommentSyntax(_JS),
+    "css": CommentSyntax((_block_comment("/*", "*/"), _string('"'), _string("'"))),
+    "html": CommentSyntax((_block_comment("<!--", "-->"),)),
+}
+
+# Languages without a lexer: any line starting with one of COMMENT_PREFIXES.
+PREFIX_SYNTAX = CommentSyntax(tuple(_line_comment(prefix, at_line_start=True) for prefix in COMMENT_PREFIXES))
+
+
+def syntax_for(path: Path) -> CommentSyntax:
+    """The comment syntax of ``path``'s language (by EXT_LANG_MAP), or PREFIX_SYNTAX."""
+    return SYNTAXES.get(EXT_LANG_MAP.get(path.suffix.lower(), ""), PREFIX_SYNTAX)
@@ -0,0 +1,116 @@
+import warnings
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from ..findings import Finding
+from .ai_phrases import AIPhraseLineDetector
+from .base import LineDetector
+from .comments import CommentBlockLineDetector
+
+ENTRY_POINT_GROUP = "vibe_sweeper.detectors"
+
+# Builds the detector instance for one file from the active config.
+DetectorFactory = Callable[[Path, Dict[str, Any]], LineDetector]
+
+_registry: Dict[str, DetectorFactory] = {}
+_entry_points_loaded = False
+
+
+class TextDetector(LineDetector):
+    """Adapts a whole-text detector function to the streaming protocol.
+
+    The function is called as ``func(path, text, config)`` once the file has
+    been read. This keeps detectors written against the original function
+    signature working, at the cost of holding that file's text in memory.
+    """
+
+    def __init__(self, func: Callable[[Path, str, Dict[str, Any]], List[Dict]], path: Path, cfg: Dict[str, Any]):
+        self.func = func
+        self.path = path
+        self.cfg = cfg
+        self._lines: List[str] = []
+
+    def feed(self, first_line: int, lines: List[str]) -> None:
+        self._lines.extend(lines)
+
+    def finish(self) -> List[Finding]:
+        text = "\n".join(self._lines)
+        self._lines = []
+        return [Finding.coerce(f) for f in self.func(self.path, text, self.cfg)] if text else []
+
+
+def _as_factory(obj: Any) -> DetectorFactory:
+    if isinstance(obj, type) and issubclass(obj, LineDetector):
+        return obj.from_config
+    if callable(obj):
+        return lambda path, cfg: TextDetector(obj, path, cfg)
+    raise TypeError(f"not a detector: {obj!r}")
+
+
+def register_detector(name: str, detector: Any = None):
+    """Register a detector under ``name``; also usable as a class/function decorator.
+
+    ``detector`` is either a LineDetector subclass (built per file with
+    ``from_config(path, cfg)``) or a function ``(path, text, config) ->
+    findings``. Registering an existing name replaces it.
+    """
+
+    def decorator(obj: Any) -> Any:
+        _registry[name] = _as_factory(obj)
+        return obj
+
+    if detector is None:
+        return decorator
+    return decorator(detector)
+
+
+def unregister_detector(name: str) -> None:
+    _registry.pop(name, None)
+
+
+def _iter_entry_points():
+    from importlib.metadata import entry_points
+
+    eps = entry_points()
+    if hasattr(eps, "select"):
+        return eps.select(group=ENTRY_POINT_GROUP)
+    return eps.get(ENTRY_POINT_GROUP, [])  # Python 3.9
+
+
+def _load_entry_points() -> None:
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    for ep in _iter_entry_points():
+        if ep.name in _registry:
+            continue
+        try:
+            register_detector(ep.name, ep.load())
+        except Exception as exc:  # a broken plugin must not break every scan
+            warnings.warn(f"vibe-sweeper: could not load detector plugin {ep.name!r}: {exc}")
+
+
+def available_detectors() -> Dict[str, DetectorFactory]:
+    """All registered detectors, including ``vibe_sweeper.detectors`` entry points."""
+    _load_entry_points()
+    return dict(_registry)
+
+
+def enabled_detectors(cfg: Dict[str, Any]) -> List[str]:
+    """Names of the detectors enabled by the ``detectors:`` config section.
+
+    Detectors not mentioned in the section are enabled.
+    """
+    toggles: Optional[Dict[str, Any]] = cfg.get("detectors") or {}
+    return [name for name in available_detectors() if toggles.get(name, True)]
+
+
+def build_detectors(path: Path, cfg: Dict[str, Any]) -> List[LineDetector]:
+    """Instantiate every enabled detector for one file."""
+    registry = available_detectors()
+    return [registry[name](path, cfg) for name in enabled_detectors(cfg)]
+
+
+register_detector("ai_phrases", AIPhraseLineDetector)
+register_detector("long_comment_blocks", CommentBlockLineDetector)
@@ -0,0 +1,418 @@
+import os
+import time
+from collections import deque
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .baseline import SUPPRESSION_MARKER
+from .cache import FileStamp, FindingsCache, content_hasher
+from .detectors import CommentBlockLineDetector, CommentLineCounter, LineDetector, build_detectors, enabled_detectors
+from .findings import Finding
+from .profiling import Profiler
+from .scanner import SNIFF_BYTES, MappedText, iter_line_batches, map_file, sniff_file
+
+if TYPE_CHECKING:
+    from .config import ConfigIndex
+
+# Files handed to a worker per task. Large enough to amortise pickling and
+# IPC, small enough to keep every worker busy until the end of the scan.
+CHUNK_SIZE = 128
+
+# Chunks queued per worker ahead of the one being consumed. Keeps the pool
+# busy while bounding how many results are held in memory.
+PREFETCH_PER_WORKER = 2
+
+# Encodings tried in order; latin-1 decodes any byte sequence.
+ENCODINGS = ("utf-8", "latin-1")
+
+_MARKER_BYTES = SUPPRESSION_MARKER.encode("ascii")
+
+_worker_cfg: Dict[str, Any] = {}
+_worker_configs: Optional["ConfigIndex"] = None
+_worker_stamp = False
+# Files kept per chunk profile in workers; 0 when profiling is off.
+_worker_profile = 0
+# Set by the parent when the scan is abandoned; chunks stop at the next file.
+_worker_cancel: Any = None
+
+
+class FileReport:
+    """Outcome of scanning one file: its findings, or why it was skipped.
+
+    ``lines`` and ``comment_lines`` count the file's lines and comment lines
+    (see CommentLexer); both are 0 for skipped files. ``marker_lines`` are
+    the numbers of the lines holding SUPPRESSION_MARKER, looked for only in
+    files with findings, so that they can be filtered without another read.
+    """
+
+    __slots__ = ("path", "findings", "skipped", "lines", "comment_lines", "marker_lines")
+
+    def __init__(
+        self,
+        path: Path,
+        findings: List[Finding],
+        skipped: Optional[str] = None,
+        lines: int = 0,
+        comment_lines: int = 0,
+        marker_lines: Tuple[int, ...] = (),
+    ):
+        self.path = path
+        self.findings = findings
+        self.skipped = skipped
+        self.lines = lines
+        self.comment_lines = comment_lines
+        self.marker_lines = marker_lines
+
+
+# A report plus the stamp to cache it under (None if the file could not be
+# read or no cache is in use).
+FileResult = Tuple[FileReport, Optional[FileStamp]]
+
+# What streaming a file produces: its findings, content digest (when
+# stamping), line count, comment line count and marker lines.
+_Scanned = Tuple[List[Finding], Optional[str], int, int, Tuple[int, ...]]
+
+
+def default_jobs() -> int:
+    """Number of worker processes used when ``--jobs`` is not given."""
+    return os.cpu_count() or 1
+
+
+class TimedDetector(LineDetector):
+    """Wraps a detector and adds up the time spent in it (used when profiling)."""
+
+    def __init__(self, name: str, detector: LineDetector):
+        self.name = name
+        self.detector = detector
+        self.wall = 0.0
+        self.cpu = 0.0
+
+    def _timed(self, method, *args):
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        try:
+            return method(*args)
+        finally:
+            self.wall += time.perf_counter() - wall0
+            self.cpu += time.process_time() - cpu0
+
+    def feed(self, first_line: int, lines: List[str]) -> None:
+        self._timed(self.detector.feed, first_line, lines)
+
+    def finish(self) -> List[Finding]:
+        return self._timed(self.detector.finish)
+
+    def scan_bytes(self, text: MappedText) -> Optional[List[Finding]]:
+        return self._timed(self.detector.scan_bytes, text)
+
+
+def _build_detectors(
+    path: Path, cfg: Dict[str, Any], timed: Optional[List[TimedDetector]]
+) -> Tuple[List[LineDetector], Any]:
+    """The file's detectors, and the one whose ``comment_lines`` to read once it is scanned.
+
+    The long_comment_blocks detector counts comment lines as it lexes; when
+    it is disabled, a CommentLineCounter is added to do the counting.
+    """
+    detectors = build_detectors(path, cfg)
+    counter = next((d for d in detectors if isinstance(d, CommentBlockLineDetector)), None)
+    if timed is not None:
+        detectors = [TimedDetector(name, detector) for name, detector in zip(enabled_detectors(cfg), detectors)]
+        timed.extend(detectors)
+    if counter is None:
+        counter = CommentLineCounter(path)
+        detectors.append(counter)
+    return detectors, counter
+
+
+def _scan_bytes(
+    path: Path, cfg: Dict[str, Any], stamp: bool, timed: Optional[List[TimedDetector]] = None
+) -> Optional[_Scanned]:
+    # Zero-copy path: detectors search the raw (mapped) bytes and decode only
+    # the lines they report. None means the file must be streamed as text.
+    detectors, counter = _build_detectors(path, cfg, timed)
+    with map_file(path) as buffer:
+        text = MappedText(buffer)
+        if not text.is_plain:
+            return None
+        findings: List[Finding] = []
+        for detector in detectors:
+            found = detector.scan_bytes(text)
+            if found is None:
+                return None
+            findings.extend(map(Finding.coerce, found))
+        digest = None
+        if stamp:
+            hasher = content_hasher()
+            hasher.update(buffer)
+            digest = hasher.hexdigest()
+        lines = buffer.count(b"\n") + (buffer[-1:] not in (b"", b"\n"))
+        markers: List[int] = []
+        at = buffer.find(_MARKER_BYTES) if findings else -1
+        while at >= 0:
+            markers.append(text.line_number(at))
+            at = buffer.find(_MARKER_BYTES, text.line_bounds(at)[1])
+    return findings, digest, lines, counter.comment_lines, tuple(markers)
+
+
+def _stream_file(
+    path: Path, cfg: Dict[str, Any], stamp: bool, timed: Optional[List[TimedDetector]] = None
+) -> _Scanned:
+    if cfg.get("mmap", True):
+        result = _scan_bytes(path, cfg, stamp, timed)
+        if result is not None:
+            return result
+    for encoding in ENCODINGS:
+        hasher = content_hasher() if stamp else None
+        detectors, counter = _build_detectors(path, cfg, timed)
+        first_line = 1
+        markers: List[int] = []
+        try:
+            for lines in iter_line_batches(path, encoding=encoding, hasher=hasher):
+                for detector in detectors:
+                    detector.feed(first_line, lines)
+                markers.extend(first_line + i for i, line in enumerate(lines) if SUPPRESSION_MARKER in line)
+                first_line += len(lines)
+        except UnicodeDecodeError:
+            continue
+        findings: List[Finding] = []
+        for detector in detectors:
+            findings.extend(map(Finding.coerce, detector.finish()))
+        digest = hasher.hexdigest() if hasher is not None else None
+        return findings, digest, first_line - 1, counter.comment_lines, tuple(markers) if findings else ()
+    raise AssertionError("latin-1 cannot fail to decode")
+
+
+def _scan_file(path: Path, cfg: Dict[str, Any], stamp: bool, profiler: Optional[Profiler] = None) -> FileResult:
+    if profiler is not None:
+        return _profile_file(path, cfg, stamp, profiler)
+    try:
+        st = os.stat(path)
+        skipped = sniff_file(path, cfg.get("max_file_bytes"), size=st.st_size)
+        if skipped is not None:
+            # Skipped files are never hashed; their cache entry is only
+            # reused while mtime and size are unchanged.
+            report, digest = FileReport(path, [], skipped), None
+        else:
+            findings, digest, lines, comment_lines, markers = _stream_file(path, cfg, stamp)
+            report = FileReport(path, findings, lines=lines, comment_lines=comment_lines, marker_lines=markers)
+    except OSError:
+        return FileReport(path, []), None
+    return report, ((st.st_mtime_ns, st.st_size, digest) if stamp else None)
+
+
+def _profile_file(path: Path, cfg: Dict[str, Any], stamp: bool, profiler: Profiler) -> FileResult:
+    # _scan_file with every step timed: "sniff", then each detector, and
+    # "read" for the rest (mapping or reading, decoding and hashing).
+    timed: List[TimedDetector] = []
+    start, wall0, cpu0 = time.time(), time.perf_counter(), time.process_time()
+    try:
+        st = os.stat(path)
+        skipped = sniff_file(path, cfg.get("max_file_bytes"), size=st.st_size)
+        sniff_wall, sniff_cpu = time.perf_counter() - wall0, time.process_time() - cpu0
+        if skipped is not None:
+            report, digest = FileReport(path, [], skipped), None
+        else:
+            findings, digest, lines, comment_lines, markers = _stream_file(path, cfg, stamp, timed)
+            report = FileReport(path, findings, lines=lines, comment_lines=comment_lines, marker_lines=markers)
+    except OSError:
+        return FileReport(path, []), None
+    wall, cpu = time.perf_counter() - wall0, time.process_time() - cpu0
+
+    profiler.add_stage("sniff", sniff_wall, sniff_cpu, 1, min(st.st_size, SNIFF_BYTES))
+    if skipped is None:
+        # A file retried on another path builds its detectors again; charge
+        # every attempt to the detector, but count the file once.
+        per_detector: Dict[str, List[float]] = {}
+        for detector in timed:
+            totals = per_detector.setdefault(detector.name, [0.0, 0.0])
+            totals[0] += detector.wall
+            totals[1] += detector.cpu
+        for name, (det_wall, det_cpu) in per_detector.items():
+            profiler.add_detector(name, det_wall, det_cpu, 1, st.st_size)
+        spent_wall = sniff_wall + sum(t[0] for t in per_detector.values())
+        spent_cpu = sniff_cpu + sum(t[1] for t in per_detector.values())
+        profiler.add_stage("read", wall - spent_wall, max(cpu - spent_cpu, 0.0), 1, st.st_size)
+    profiler.add_file(str(path), wall, cpu, st.st_size, start)
+    return report, ((st.st_mtime_ns, st.st_size, digest) if stamp else None)
+
+
+def analyze_file(path: Path, cfg: Dict[str, Any]) -> List[Finding]:
+    """Stream one file through every detector. Unreadable or skipped files yield nothing."""
+    return _scan_file(path, cfg, stamp=False)[0].findings
+
+
+def _iter_scans(
+    paths: Sequence[Path],
+    cfg: Dict[str, Any],
+    stamp: bool,
+    profiler: Optional[Profiler] = None,
+    configs: Optional["ConfigIndex"] = None,
+    cancel: Any = None,
+) -> Iterator[FileResult]:
+    """Scan ``paths`` one at a time, stopping early once ``cancel`` (an Event) is set."""
+    for path in paths:
+        if cancel is not None and cancel.is_set():
+            return
+        yield _scan_file(path, configs.config_for(path) if configs is not None else cfg, stamp, profiler)
+
+
+def _scan_chunk(
+    paths: Sequence[Path],
+    cfg: Dict[str, Any],
+    stamp: bool,
+    profiler: Optional[Profiler] = None,
+    configs: Optional["ConfigIndex"] = None,
+    cancel: Any = None,
+) -> List[FileResult]:
+    return list(_iter_scans(paths, cfg, stamp, profiler, configs, cancel))
+
+
+def _init_worker(
+    cfg: Dict[str, Any],
+    stamp: bool,
+    profile: int = 0,
+    configs: Optional["ConfigIndex"] = None,
+    cancel: Any = None,
+) -> None:
+    # The config (and the phrase matcher compiled from it) is sent once per
+    # worker instead of once per chunk.
+    global _worker_cfg, _worker_configs, _worker_stamp, _worker_profile, _worker_cancel
+    _worker_cfg = cfg
+    _worker_configs = configs
+    _worker_stamp = stamp
+    _worker_profile = profile
+    _worker_cancel = cancel
+
+
+def _worker_chunk(paths: Sequence[Path]) -> Tuple[List[FileResult], Optional[Profiler]]:
+    if not _worker_profile:
+        return _scan_chunk(paths, _worker_cfg, _worker_stamp, configs=_worker_configs, cancel=_worker_cancel), None
+    profiler = Profiler(slowest=_worker_profile)
+    with profiler.stage("chunk") as stage:
+        results = _scan_chunk(paths, _worker_cfg, _worker_stamp, profiler, _worker_configs, _worker_cancel)
+        stage.files = len(paths)
+    return results, profiler
+
+
+def _lookup(chunk: Sequence[Path], cache: Optional[FindingsCache]) -> Tuple[List[Optional[FileReport]], List[Path]]:
+    reports: List[Optional[FileReport]] = []
+    misses: List[Path] = []
+    for path in chunk:
+        hit = cache.lookup(path) if cache is not None else None
+        if hit is None:
+            misses.append(path)
+            reports.append(None)
+        else:
+            reports.append(FileReport(path, *hit))
+    return reports, misses
+
+
+def _chunk_results(future: Any, profiler: Optional[Profiler]) -> Sequence[FileResult]:
+    if future is None:
+        return ()
+    results, chunk_profile = future.result()
+    if chunk_profile is not None and profiler is not None:
+        profiler.merge(chunk_profile)
+    return results
+
+
+def _merge(
+    reports: List[Optional[FileReport]], results: Iterable[FileResult], cache: Optional[FindingsCache]
+) -> Iterator[FileReport]:
+    fresh = iter(results)
+    for report in reports:
+        if report is None:
+            report, stamp = next(fresh)
+            if cache is not None and stamp is not None:
+                cache.store(
+                    report.path,
+                    stamp,
+                    report.findings,
+                    skipped=report.skipped,
+                    lines=report.lines,
+                    comment_lines=report.comment_lines,
+                    marker_lines=report.marker_lines,
+                )
+        yield report
+
+
+def iter_file_reports(
+    files: Sequence[Path],
+    cfg: Dict[str, Any],
+    jobs: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+    cache: Optional[FindingsCache] = None,
+    profiler: Optional[Profiler] = None,
+    configs: Optional["ConfigIndex"] = None,
+) -> Iterator[FileReport]:
+    """Analyse ``files`` and yield one FileReport per file, in ``files`` order.
+
+    With ``jobs > 1`` the files are split into chunks that are analysed by a
+    process pool. Only a few chunks per worker are queued ahead of the
+    consumer, reports are yielded as soon as their chunk is done, and
+    closing the generator early cancels the chunks not yet started. When a
+    ``cache`` is given, only files without a valid cache entry are analysed
+    and the cache is updated (but not saved) with their results. A
+    ``profiler`` receives the timings of every analysed file, including
+    those scanned by workers. With ``configs``, each file is analysed with
+    its directory's config instead of ``cfg``; add the files to it first so
+    that workers receive a complete index.
+
+    Serial scans analyse a file only when its report is requested. In a
+    pool, closing the generator also stops the chunks workers are running
+    at their next file, so an abandoned scan ends within about a file's
+    worth of work.
+    """
+    if jobs is None:
+        jobs = default_jobs()
+    if configs is not None and configs.uniform:
+        configs = None  # no per-directory config: skip the lookups
+    stamp = cache is not None
+    chunks = (files[i : i + chunk_size] for i in range(0, len(files), chunk_size))
+
+    if jobs <= 1 or len(files) <= chunk_size:
+        for chunk in chunks:
+            reports, misses = _lookup(chunk, cache)
+            yield from _merge(reports, _iter_scans(misses, cfg, stamp, profiler, configs), cache)
+        return
+
+    # Imported here: multiprocessing is slow to import and small scans
+    # never need it.
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = min(jobs, -(-len(files) // chunk_size))
+    profile = max(profiler.slowest, chunk_size) if profiler is not None else 0
+    cancel = multiprocessing.Event()
+    pool = ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(cfg, stamp, profile, configs, cancel)
+    )
+    pending: Deque = deque()
+    try:
+        for chunk in chunks:
+            reports, misses = _lookup(chunk, cache)
+            pending.append((reports, pool.submit(_worker_chunk, misses) if misses else None))
+            while len(pending) > workers * PREFETCH_PER_WORKER:
+                reports, future = pending.popleft()
+                yield from _merge(reports, _chunk_results(future, profiler), cache)
+        while pending:
+            reports, future = pending.popleft()
+            yield from _merge(reports, _chunk_results(future, profiler), cache)
+    finally:
+        cancel.set()
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def collect_findings(
+    files: Sequence[Path],
+    cfg: Dict[str, Any],
+    jobs: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+    cache: Optional[FindingsCache] = None,
+    configs: Optional["ConfigIndex"] = None,
+) -> List[Finding]:
+    """Analyse ``files`` and return their findings in ``files`` order."""
+    findings: List[Finding] = []
+    for report in iter_file_reports(files, cfg, jobs=jobs, chunk_size=chunk_size, cache=cache, configs=configs):
+        findings.extend(report.findings)
+    return findings
@@ -0,0 +1,114 @@
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional
+
+AI_PHRASE = sys.intern("ai_phrase")
+LONG_COMMENT_BLOCK = sys.intern("long_comment_block")
+
+# Dict keys backed by a slot of their own; anything else a detector reports
+# goes to ``extra``.
+_SLOT_KEYS = frozenset(("file", "kind", "line", "start_line", "end_line", "phrase", "lines", "preview"))
+
+
+class Finding(Mapping):
+    """One issue found in a file.
+
+    Findings are compact slotted records: ``file`` and ``kind`` are interned,
+    so the thousands of findings of one file or kind share a single string.
+    A finding spans the single ``line`` or, when ``end_line`` is set, the
+    lines ``line`` to ``end_line``; line 0 means the file as a whole.
+
+    For existing consumers a finding also reads like the dict detectors used
+    to return: ``finding["line"]`` (or ``"start_line"``/``"end_line"`` for a
+    range), ``finding.get("phrase")``, ``dict(finding)`` and comparisons with
+    such dicts all work. ``as_dict`` builds that dict explicitly.
+    """
+
+    __slots__ = ("file", "kind", "line", "end_line", "phrase", "lines", "preview", "extra")
+
+    def __init__(
+        self,
+        file: str,
+        kind: str,
+        line: int,
+        end_line: Optional[int] = None,
+        phrase: Optional[str] = None,
+        lines: Optional[int] = None,
+        preview: Optional[str] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ):
+        self.file = sys.intern(file)
+        self.kind = sys.intern(kind)
+        self.line = line
+        self.end_line = end_line
+        self.phrase = phrase
+        self.lines = lines
+        self.preview = preview
+        self.extra = extra or None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Finding":
+        """Build a finding from the dict shape returned by ``as_dict``."""
+        if "start_line" in data:
+            line, end_line = data["start_line"], data.get("end_line")
+        else:
+            line, end_line = data.get("line", 0), None
+        extra = {k: v for k, v in data.items() if k not in _SLOT_KEYS}
+        return cls(
+            str(data.get("file", "?")),
+            str(data.get("kind", "issue")),
+            line,
+            end_line=end_line,
+            phrase=data.get("phrase"),
+            lines=data.get("lines"),
+            preview=data.get("preview"),
+            extra=extra,
+        )
+
+    @classmethod
+    def coerce(cls, obj: Any) -> "Finding":
+        """Return ``obj`` if it is a Finding, else build one from its dict shape."""
+        return obj if isinstance(obj, cls) else cls.from_dict(obj)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """The finding in the dict shape detectors used to return."""
+        data: Dict[str, Any] = {"file": self.file}
+        if self.end_line is None:
+            data["line"] = self.line
+        else:
+            data["start_line"] = self.line
+            data["end_line"] = self.end_line
+        if self.lines is not None:
+            data["lines"] = self.lines
+        if self.phrase is not None:
+            data["phrase"] = self.phrase
+        if self.preview is not None:
+            data["preview"] = self.preview
+        if self.extra:
+            data.update(self.extra)
+        data["kind"] = self.kind
+        return data
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "file":
+            return self.file
+        if key == "kind":
+            return self.kind
+        if key == ("line" if self.end_line is None else "start_line"):
+            return self.line
+        if key in ("end_line", "phrase", "lines", "preview"):
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        elif self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.as_dict())
+
+    def __len__(self) -> int:
+        return len(self.as_dict())
+
+    def __repr__(self) -> str:
+        return f"Finding({self.as_dict()!r})"
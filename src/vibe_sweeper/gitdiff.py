@@ -0,0 +1,138 @@
+import re
+import subprocess
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from .findings import Finding
+from .ignore import IgnoreTree
+from .scanner import DEFAULT_IGNORES, EXT_LANG_MAP
+
+_HUNK_RE = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+# Changed line numbers per absolute file path; None means "every line"
+# (e.g. a file that is new and untracked).
+ChangedLines = Dict[str, Optional[Set[int]]]
+
+
+class GitError(RuntimeError):
+    """Raised when git is missing or a git command fails."""
+
+
+def _git(cwd: Path, *args: str) -> bytes:
+    cmd = ["git", "-c", "core.quotepath=off", *args]
+    try:
+        proc = subprocess.run(cmd, cwd=str(cwd), capture_output=True, check=False)
+    except FileNotFoundError:
+        raise GitError("git executable not found") from None
+    if proc.returncode != 0:
+        message = proc.stderr.decode("utf-8", "replace").strip() or f"git {args[0]} failed"
+        raise GitError(message)
+    return proc.stdout
+
+
+def repo_toplevel(root: Path) -> Path:
+    out = _git(root, "rev-parse", "--show-toplevel")
+    return Path(out.decode("utf-8").strip()).resolve()
+
+
+def merge_base(root: Path, ref: str) -> str:
+    return _git(root, "merge-base", ref, "HEAD").decode("utf-8").strip()
+
+
+def _diff_args(root: Path, since: Optional[str], staged: bool) -> List[str]:
+    if staged:
+        return ["diff", "--cached"]
+    if since is None:
+        raise ValueError("either since or staged is required")
+    return ["diff", merge_base(root, since)]
+
+
+def _is_candidate(path: Path, root: Path, ignores: IgnoreTree) -> bool:
+    try:
+        rel = path.relative_to(root)
+    except ValueError:
+        return False
+    if any(part in DEFAULT_IGNORES for part in rel.parts[:-1]):
+        return False
+    if path.suffix.lower() not in EXT_LANG_MAP or ignores.ignores(rel.as_posix()):
+        return False
+    return path.is_file()
+
+
+def _split_z(out: bytes) -> Iterable[str]:
+    return (p.decode("utf-8", "surrogateescape") for p in out.split(b"\0") if p)
+
+
+def changed_files(root: Path, since: Optional[str] = None, staged: bool = False) -> List[Path]:
+    """List the scannable files changed against ``since`` or in the index.
+
+    ``since`` compares the working tree with the merge base of ``since`` and
+    HEAD and also includes untracked (non-ignored) files; ``staged`` lists
+    the files staged for commit. Paths outside ``root``, in ignored
+    directories, excluded by ``.gitignore``/``.vibeignore`` files (as in
+    ``walk_project``) or with unsupported extensions are dropped.
+    """
+    root = root.resolve()
+    top = repo_toplevel(root)
+    names = list(_split_z(_git(top, *_diff_args(top, since, staged), "--name-only", "-z", "--diff-filter=d")))
+    if not staged:
+        names.extend(_split_z(_git(top, "ls-files", "-z", "--others", "--exclude-standard")))
+
+    files: List[Path] = []
+    seen: Set[str] = set()
+    ignores = IgnoreTree(root)
+    for name in names:
+        if name in seen:
+            continue
+        seen.add(name)
+        path = top / name
+        if _is_candidate(path, root, ignores):
+            files.append(path)
+    return files
+
+
+def changed_lines(root: Path, since: Optional[str] = None, staged: bool = False) -> ChangedLines:
+    """Map each changed file to the line numbers added or modified in it."""
+    root = root.resolve()
+    top = repo_toplevel(root)
+    out = _git(top, *_diff_args(top, since, staged), "-U0", "--no-color", "--no-ext-diff", "--diff-filter=d")
+
+    result: ChangedLines = {}
+    current: Optional[Set[int]] = None
+    for raw in out.decode("utf-8", "surrogateescape").splitlines():
+        if raw.startswith("+++ "):
+            target = raw[4:]
+            if target.startswith('"'):
+                target = _unquote(target)
+            current = None
+            if target.startswith("b/"):
+                current = result.setdefault(str(top / target[2:]), set())
+        elif raw.startswith("@@") and current is not None:
+            m = _HUNK_RE.match(raw)
+            if m:
+                start = int(m.group(1))
+                count = int(m.group(2)) if m.group(2) is not None else 1
+                current.update(range(start, start + count))
+    if not staged:
+        for name in _split_z(_git(top, "ls-files", "-z", "--others", "--exclude-standard")):
+            result[str(top / name)] = None
+    return result
+
+
+def _unquote(quoted: str) -> str:
+    # git C-quotes paths with unusual characters: "b/tab\there.py"
+    raw = quoted[1:-1].encode("utf-8", "surrogateescape").decode("unicode_escape")
+    return raw.encode("latin-1").decode("utf-8", "surrogateescape")
+
+
+def filter_changed_lines(findings: Iterable[Finding], lines: ChangedLines) -> List[Finding]:
+    """Keep only findings that touch at least one changed line."""
+    kept: List[Finding] = []
+    for finding in map(Finding.coerce, findings):
+        if finding.file not in lines:
+            continue
+        changed = lines[finding.file]
+        last = finding.line if finding.end_line is None else finding.end_line
+        if changed is None or not finding.line or any(n in changed for n in range(finding.line, last + 1)):
+            kept.append(finding)
+    return kept
@@ -0,0 +1,205 @@
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Pattern, Sequence, Tuple
+
+IGNORE_FILE_NAMES = (".gitignore", ".vibeignore")
+
+
+def _translate(pattern: str) -> str:
+    """Translate one gitignore glob (without anchoring slashes) to a regex."""
+    out: List[str] = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern.startswith("**", i):
+                j = i + 2
+                at_start = i == 0 or pattern[i - 1] == "/"
+                if at_start and j == n:
+                    out.append(".*")
+                    i = j
+                    continue
+                if at_start and pattern[j] == "/":
+                    out.append("(?:.*/)?")
+                    i = j + 1
+                    continue
+                i = j
+            else:
+                i += 1
+            out.append("[^/]*")
+            continue
+        if c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = i + 1
+            if j < n and pattern[j] in "!^":
+                j += 1
+            if j < n and pattern[j] == "]":
+                j += 1
+            while j < n and pattern[j] != "]":
+                j += 1
+            if j >= n:
+                out.append("\\[")
+            else:
+                body = pattern[i + 1 : j]
+                if body[:1] in ("!", "^"):
+                    body = "^" + body[1:]
+                out.append("(?!/)[" + body.replace("\\", "\\\\") + "]")
+                i = j
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+class IgnoreRule:
+    __slots__ = ("regex", "negated", "dir_only")
+
+    def __init__(self, regex: Pattern, negated: bool, dir_only: bool):
+        self.regex = regex
+        self.negated = negated
+        self.dir_only = dir_only
+
+
+def parse_rule(line: str) -> Optional[IgnoreRule]:
+    """Compile one line of a gitignore file; None for blanks and comments."""
+    if line.endswith("\n"):
+        line = line[:-1]
+    if line.endswith("\r"):
+        line = line[:-1]
+    # Trailing spaces are ignored unless escaped with a backslash.
+    stripped = line.rstrip(" ")
+    if stripped.endswith("\\") and len(stripped) < len(line):
+        stripped += " "
+    line = stripped
+    if not line or line.startswith("#"):
+        return None
+    negated = line.startswith("!")
+    if negated:
+        line = line[1:]
+    elif line.startswith("\\") and line[1:2] in ("!", "#"):
+        line = line[1:]
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+    anchored = "/" in line
+    line = line.lstrip("/")
+    body = _translate(line)
+    if not anchored:
+        body = "(?:.*/)?" + body
+    return IgnoreRule(re.compile(body, re.DOTALL), negated, dir_only)
+
+
+class IgnoreFile:
+    """The compiled rules of one ignore file, relative to its directory.
+
+    When a file has no negated rules (the common case) its patterns are
+    folded into a single regex per kind, so testing a path costs one
+    ``fullmatch`` no matter how many patterns the file contains.
+    """
+
+    def __init__(self, rules: Sequence[IgnoreRule]):
+        self.rules = list(rules)
+        self._ordered = any(rule.negated for rule in self.rules)
+        self._any = self._combine(r for r in self.rules if not r.dir_only)
+        self._dirs = self._combine(r for r in self.rules if r.dir_only)
+
+    @staticmethod
+    def _combine(rules) -> Optional[Pattern]:
+        patterns = [rule.regex.pattern for rule in rules]
+        if not patterns:
+            return None
+        return re.compile("|".join(f"(?:{p})" for p in patterns), re.DOTALL)
+
+    @classmethod
+    def from_lines(cls, lines: Sequence[str]) -> "IgnoreFile":
+        return cls([rule for rule in map(parse_rule, lines) if rule is not None])
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["IgnoreFile"]:
+        try:
+            text = path.read_text(encoding="utf-8", errors="replace")
+        except OSError:
+            return None
+        ignore = cls.from_lines(text.splitlines())
+        return ignore if ignore.rules else None
+
+    def match(self, rel: str, is_dir: bool) -> Optional[bool]:
+        """True if ``rel`` is ignored, False if re-included by ``!``, None if no rule applies."""
+        if self._ordered:
+            for rule in reversed(self.rules):
+                if rule.dir_only and not is_dir:
+                    continue
+                if rule.regex.fullmatch(rel):
+                    return not rule.negated
+            return None
+        if self._any is not None and self._any.fullmatch(rel):
+            return True
+        if is_dir and self._dirs is not None and self._dirs.fullmatch(rel):
+            return True
+        return None
+
+
+# Ignore files in effect for a directory, innermost last: (prefix, rules),
+# where prefix is the directory of the ignore file relative to the walk root
+# ("" for the root itself, otherwise ending in "/").
+IgnoreStack = Tuple[Tuple[str, IgnoreFile], ...]
+
+
+def is_ignored(stack: IgnoreStack, rel: str, is_dir: bool) -> bool:
+    """Apply the ignore files in ``stack`` to a path relative to the walk root."""
+    for prefix, ignore in reversed(stack):
+        decision = ignore.match(rel[len(prefix) :], is_dir)
+        if decision is not None:
+            return decision
+    return False
+
+
+def root_stack(root: Path) -> IgnoreStack:
+    """The ignore stack in effect above every ignore file of ``root``: ``.git/info/exclude``."""
+    exclude = IgnoreFile.load(root / ".git" / "info" / "exclude")
+    return (("", exclude),) if exclude is not None else ()
+
+
+class IgnoreTree:
+    """Decides whether single paths under ``root`` are ignored, as the walker would.
+
+    A path is ignored when it, or one of the directories above it, matches
+    the ignore files in effect for its directory. Ignore files are loaded
+    per directory on first use, so checking a few paths (the files of a
+    git diff) reads only the ignore files on their way from the root.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        # Stack per directory relative to root ("" or ending in "/"); None
+        # when the directory itself is ignored.
+        self._stacks: Dict[str, Optional[IgnoreStack]] = {"": self._with_files("", root_stack(root))}
+
+    def _with_files(self, rel_dir: str, stack: IgnoreStack) -> IgnoreStack:
+        for file_name in IGNORE_FILE_NAMES:
+            ignore = IgnoreFile.load(self.root / rel_dir / file_name)
+            if ignore is not None:
+                stack = stack + ((rel_dir, ignore),)
+        return stack
+
+    def _stack(self, rel_dir: str) -> Optional[IgnoreStack]:
+        if rel_dir in self._stacks:
+            return self._stacks[rel_dir]
+        name = rel_dir[:-1]
+        parent = name.rpartition("/")[0]
+        stack = self._stack(parent + "/" if parent else "")
+        if stack is not None:
+            stack = None if stack and is_ignored(stack, name, True) else self._with_files(rel_dir, stack)
+        self._stacks[rel_dir] = stack
+        return stack
+
+    def ignores(self, rel: str) -> bool:
+        """True if the file at ``rel`` ("/"-separated, relative to root) is ignored."""
+        rel_dir = rel.rpartition("/")[0]
+        stack = self._stack(rel_dir + "/" if rel_dir else "")
+        return stack is None or bool(stack) and is_ignored(stack, rel, False)
@@ -0,0 +1,180 @@
+"""Opt-in timing of scan stages, detectors and individual files.
+
+Profiling is off unless a Profiler is passed to the engine, and the scan
+path only checks for it once per file; with no profiler nothing is timed.
+Worker processes fill a Profiler of their own per chunk, which the parent
+merges.
+"""
+import heapq
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+DEFAULT_SLOWEST = 10
+PROFILE_FORMATS = ("json", "chrome")
+
+# hook(event, name, stats): event is "stage" (name is the stage) or "file"
+# (name is the path). Hooks run in the main process only.
+ProfileHook = Callable[[str, str, Dict[str, float]], None]
+
+# (wall seconds, path, cpu seconds, bytes, start timestamp, pid)
+_FileRecord = Tuple[float, str, float, int, float, int]
+# (name, category, start timestamp, wall seconds, pid)
+_Span = Tuple[str, str, float, float, int]
+
+
+class StageStats:
+    """Accumulated wall time, CPU time, files and bytes of one stage."""
+
+    __slots__ = ("wall", "cpu", "files", "bytes", "calls")
+
+    def __init__(self):
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.files = 0
+        self.bytes = 0
+        self.calls = 0
+
+    def add(self, wall: float, cpu: float, files: int = 0, nbytes: int = 0) -> None:
+        self.wall += wall
+        self.cpu += cpu
+        self.files += files
+        self.bytes += nbytes
+        self.calls += 1
+
+    def merge(self, other: "StageStats") -> None:
+        self.wall += other.wall
+        self.cpu += other.cpu
+        self.files += other.files
+        self.bytes += other.bytes
+        self.calls += other.calls
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "wall": round(self.wall, 6),
+            "cpu": round(self.cpu, 6),
+            "files": self.files,
+            "bytes": self.bytes,
+            "calls": self.calls,
+        }
+
+
+class Profiler:
+    """Collects per-stage, per-detector and per-file timings of a scan.
+
+    Stage times of work done in worker processes (``sniff``, ``read`` and
+    the detectors) are summed over all workers, so they can exceed the
+    wall time of the ``scan`` stage. Only the ``slowest`` files are kept.
+    """
+
+    def __init__(self, slowest: int = DEFAULT_SLOWEST):
+        self.slowest = slowest
+        self.stages: Dict[str, StageStats] = {}
+        self.detectors: Dict[str, StageStats] = {}
+        self.spans: List[_Span] = []
+        self._files: List[_FileRecord] = []
+        self._hooks: List[ProfileHook] = []
+
+    def __getstate__(self):
+        # Hooks stay in the process that registered them.
+        state = dict(self.__dict__)
+        state["_hooks"] = []
+        return state
+
+    def add_hook(self, hook: ProfileHook) -> None:
+        self._hooks.append(hook)
+
+    def _stats(self, table: Dict[str, StageStats], name: str) -> StageStats:
+        stats = table.get(name)
+        if stats is None:
+            stats = table[name] = StageStats()
+        return stats
+
+    def add_stage(self, name: str, wall: float, cpu: float, files: int = 0, nbytes: int = 0) -> None:
+        self._stats(self.stages, name).add(wall, cpu, files, nbytes)
+
+    def add_detector(self, name: str, wall: float, cpu: float, files: int = 0, nbytes: int = 0) -> None:
+        self._stats(self.detectors, name).add(wall, cpu, files, nbytes)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageStats]:
+        """Time the body as one call of stage ``name``; set ``files``/``bytes`` on the yielded stats."""
+        counts = StageStats()
+        start, wall0, cpu0 = time.time(), time.perf_counter(), time.process_time()
+        try:
+            yield counts
+        finally:
+            wall, cpu = time.perf_counter() - wall0, time.process_time() - cpu0
+            self.add_stage(name, wall, cpu, counts.files, counts.bytes)
+            self.spans.append((name, "stage", start, wall, os.getpid()))
+            stats = {"wall": wall, "cpu": cpu, "files": counts.files, "bytes": counts.bytes}
+            for hook in self._hooks:
+                hook("stage", name, stats)
+
+    def add_file(self, path: str, wall: float, cpu: float, nbytes: int, start: float = 0.0) -> None:
+        self._add_record((wall, path, cpu, nbytes, start, os.getpid()))
+
+    def _add_record(self, record: _FileRecord) -> None:
+        if len(self._files) < self.slowest:
+            heapq.heappush(self._files, record)
+        elif self.slowest and record > self._files[0]:
+            heapq.heapreplace(self._files, record)
+        if self._hooks:
+            stats = {"wall": record[0], "cpu": record[2], "bytes": record[3]}
+            for hook in self._hooks:
+                hook("file", record[1], stats)
+
+    def merge(self, other: "Profiler") -> None:
+        """Fold in the timings of another profiler (e.g. one filled by a worker)."""
+        for name, stats in other.stages.items():
+            self._stats(self.stages, name).merge(stats)
+        for name, stats in other.detectors.items():
+            self._stats(self.detectors, name).merge(stats)
+        self.spans.extend(other.spans)
+        for record in other._files:
+            self._add_record(record)
+
+    def slowest_files(self) -> List[Dict[str, Any]]:
+        return [
+            {"file": path, "wall": round(wall, 6), "cpu": round(cpu, 6), "bytes": nbytes}
+            for wall, path, cpu, nbytes, _, _ in sorted(self._files, reverse=True)
+        ]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "stages": {name: stats.as_dict() for name, stats in self.stages.items()},
+            "detectors": {name: stats.as_dict() for name, stats in self.detectors.items()},
+            "slowest_files": self.slowest_files(),
+        }
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """The stage spans, worker chunks and slowest files in Chrome's trace event format."""
+        events = [
+            {"name": name, "cat": cat, "ph": "X", "ts": start * 1e6, "dur": wall * 1e6, "pid": pid, "tid": pid}
+            for name, cat, start, wall, pid in self.spans
+        ]
+        events.extend(
+            {
+                "name": path,
+                "cat": "file",
+                "ph": "X",
+                "ts": start * 1e6,
+                "dur": wall * 1e6,
+                "pid": pid,
+                "tid": pid,
+                "args": {"bytes": nbytes, "cpu": cpu},
+            }
+            for wall, path, cpu, nbytes, start, pid in self._files
+        )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, path: Path, fmt: str = "json") -> None:
+        """Write the profile to ``path`` as plain JSON or as a Chrome trace."""
+        if fmt not in PROFILE_FORMATS:
+            raise ValueError(f"unknown profile format: {fmt!r}")
+        data = self.as_dict() if fmt == "json" else self.chrome_trace()
+        Path(path).write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+
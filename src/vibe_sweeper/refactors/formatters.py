@@ -1,41 +1,171 @@
-import subprocess
+import asyncio
+import codecs
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
 
+# Seconds each formatter may run in total, across all of its batches.
+DEFAULT_TIMEOUT = 300.0
 
-def _run_cmd(cmd: List[str], cwd: Path) -> Dict[str, Any]:
+# Files passed per formatter invocation. The character limit keeps each
+# command line well under the smallest platform limit (32k on Windows).
+BATCH_FILES = 500
+BATCH_CHARS = 24_000
+
+# name -> (command without file arguments, languages it formats)
+FORMATTERS: Dict[str, Tuple[List[str], Tuple[str, ...]]] = {
+    "ruff": (["ruff", "check", "--fix"], ("python",)),
+    "biome": (["biome", "check", "--apply"], ("javascript", "typescript", "html", "css", "json")),
+}
+
+# Called with (formatter name, chunk of output) as the output arrives.
+OutputCallback = Callable[[str, str], None]
+
+# One timeout for every formatter, or per formatter name (others use the default).
+Timeouts = Union[float, Mapping[str, float]]
+
+
+def _argv_batches(args: Sequence[str], max_files: int, max_chars: int) -> Iterator[List[str]]:
+    batch: List[str] = []
+    size = 0
+    for arg in args:
+        if batch and (len(batch) >= max_files or size + len(arg) + 1 > max_chars):
+            yield batch
+            batch, size = [], 0
+        batch.append(arg)
+        size += len(arg) + 1
+    if batch:
+        yield batch
+
+
+async def _pump(stream: asyncio.StreamReader, sink: List[str], name: str, on_output: Optional[OutputCallback]) -> None:
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    while True:
+        data = await stream.read(65536)
+        text = decoder.decode(data, final=not data)
+        if text:
+            sink.append(text)
+            if on_output is not None:
+                on_output(name, text)
+        if not data:
+            return
+
+
+async def _run_cmd(
+    name: str, cmd: List[str], cwd: Path, deadline: float, on_output: Optional[OutputCallback]
+) -> Dict[str, Any]:
     try:
-        proc = subprocess.run(
-            cmd,
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
             cwd=str(cwd),
-            capture_output=True,
-            text=True,
-            check=False,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
         )
-        return {
-            "cmd": cmd,
-            "returncode": proc.returncode,
-            "stdout": proc.stdout,
-            "stderr": proc.stderr,
-        }
     except FileNotFoundError:
-        return {
-            "cmd": cmd,
-            "returncode": -1,
-            "stdout": "",
-            "stderr": "command not found",
-        }
+        return {"cmd": cmd, "returncode": -1, "stdout": "", "stderr": "command not found", "missing": True}
+
+    stdout: List[str] = []
+    stderr: List[str] = []
+    timed_out = False
+    loop = asyncio.get_running_loop()
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(_pump(proc.stdout, stdout, name, on_output), _pump(proc.stderr, stderr, name, on_output)),
+            timeout=max(deadline - loop.time(), 0),
+        )
+        await proc.wait()
+    except asyncio.TimeoutError:
+        timed_out = True
+        proc.kill()
+        await proc.wait()
+    return {
+        "cmd": cmd,
+        "returncode": -1 if timed_out else proc.returncode,
+        "stdout": "".join(stdout),
+        "stderr": "".join(stderr),
+        "timed_out": timed_out,
+    }
+
+
+async def _run_formatter(
+    name: str,
+    base_cmd: List[str],
+    paths: Sequence[str],
+    cwd: Path,
+    timeout: float,
+    batch_files: int,
+    on_output: Optional[OutputCallback],
+) -> Dict[str, Any]:
+    deadline = asyncio.get_running_loop().time() + timeout
+    merged: Dict[str, Any] = {"cmd": base_cmd, "returncode": 0, "stdout": "", "stderr": "", "batches": 0}
+    for batch in _argv_batches(paths, batch_files, BATCH_CHARS):
+        res = await _run_cmd(name, base_cmd + batch, cwd, deadline, on_output)
+        merged["batches"] += 1
+        merged["stdout"] += res["stdout"]
+        merged["stderr"] += res["stderr"]
+        if res["returncode"] != 0 and merged["returncode"] == 0:
+            merged["returncode"] = res["returncode"]
+        if res.get("timed_out"):
+            merged["timed_out"] = True
+            merged["stderr"] += f"timed out after {timeout:g}s\n"
+            break
+        if res.get("missing"):
+            break
+    return merged
+
+
+def _formatter_args(root: Path, languages: Dict[str, Any], handled: Tuple[str, ...]) -> List[str]:
+    args: List[str] = []
+    for lang in handled:
+        files = languages.get(lang)
+        if files is None:
+            continue
+        if not isinstance(files, (list, tuple, set)):
+            # Only the language is known: let the tool find its own files.
+            return ["."]
+        for path in files:
+            try:
+                args.append(str(Path(path).resolve().relative_to(root)))
+            except ValueError:
+                args.append(str(path))
+    return sorted(set(args))
 
 
-def run_formatters(root: Path, languages: Dict[str, Any]) -> Dict[str, Any]:
-    """Run external formatters where possible. Best-effort only."""
-    results: Dict[str, Any] = {}
+async def run_formatters_async(
+    root: Path,
+    languages: Dict[str, Any],
+    timeout: Timeouts = DEFAULT_TIMEOUT,
+    batch_files: int = BATCH_FILES,
+    on_output: Optional[OutputCallback] = None,
+) -> Dict[str, Any]:
+    """Coroutine form of run_formatters, for callers that already run an event loop."""
     root = root.resolve()
+    jobs = {}
+    for name, (base_cmd, handled) in FORMATTERS.items():
+        args = _formatter_args(root, languages, handled)
+        if args:
+            limit = timeout.get(name, DEFAULT_TIMEOUT) if isinstance(timeout, Mapping) else timeout
+            jobs[name] = _run_formatter(name, base_cmd, args, root, float(limit), batch_files, on_output)
+    results = await asyncio.gather(*jobs.values())
+    return dict(zip(jobs, results))
 
-    if "python" in languages:
-        results["ruff"] = _run_cmd(["ruff", "check", ".", "--fix"], cwd=root)
 
-    if any(lang in languages for lang in ("javascript", "typescript", "html", "css", "json")):
-        results["biome"] = _run_cmd(["biome", "check", ".", "--apply"], cwd=root)
+def run_formatters(
+    root: Path,
+    languages: Dict[str, Any],
+    timeout: Timeouts = DEFAULT_TIMEOUT,
+    batch_files: int = BATCH_FILES,
+    on_output: Optional[OutputCallback] = None,
+) -> Dict[str, Any]:
+    """Run external formatters where possible. Best-effort only.
 
-    return results
+    ``languages`` maps a language to the files to format (as returned by
+    ``detect_languages``); every applicable formatter runs concurrently on
+    just those files, split into batches of at most ``batch_files``
+    arguments. A language mapped to anything but a list of files makes the
+    formatter process the whole root instead. Each formatter is killed
+    once it has run for ``timeout`` seconds in total (a number, or a
+    mapping of formatter name to seconds). ``on_output`` receives the
+    formatters' output as it is produced.
+    """
+    return asyncio.run(run_formatters_async(root, languages, timeout, batch_files, on_output))
@@ -1,3 +1,21 @@
 from .summary import build_markdown_report
+from .writers import (
+    REPORT_FORMATS,
+    JsonLinesReportWriter,
+    JsonReportWriter,
+    MarkdownReportWriter,
+    ReportWriter,
+    SarifReportWriter,
+    create_writer,
+)
 
-__all__ = ["build_markdown_report"]
+__all__ = [
+    "REPORT_FORMATS",
+    "JsonLinesReportWriter",
+    "JsonReportWriter",
+    "MarkdownReportWriter",
+    "ReportWriter",
+    "SarifReportWriter",
+    "build_markdown_report",
+    "create_writer",
+]
@@ -1,32 +1,126 @@
 from pathlib import Path
-from typing import List, Dict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from ..analysis.metrics import basic_stats
+from ..findings import AI_PHRASE, LONG_COMMENT_BLOCK, Finding
 
 
-def build_markdown_report(root: Path, files, findings: List[Dict], formatter_results=None) -> str:
-    stats = basic_stats(files, findings)
-    root = root.resolve()
+def summary_lines(file_count: int, issue_count: int, skipped_count: int = 0) -> List[str]:
+    lines = ["## Summary", ""]
+    lines.append(f"- Files scanned: **{file_count}**")
+    lines.append(f"- Issues detected: **{issue_count}**")
+    if skipped_count:
+        lines.append(f"- Files skipped: **{skipped_count}**")
+    lines.append("")
+    return lines
 
-    lines = []
-    lines.append("# vibe-sweeper report")
+
+def formatter_lines(formatter_results: Optional[Dict[str, Any]]) -> List[str]:
+    if not formatter_results:
+        return []
+    lines = ["## Formatters", ""]
+    for name, res in formatter_results.items():
+        if not isinstance(res, dict):
+            continue
+        rc = res.get("returncode")
+        note = " (timed out)" if res.get("timed_out") else ""
+        lines.append(f"- **{name}**: return code `{rc}`{note}")
     lines.append("")
-    lines.append(f"Root: `{root}`")
+    return lines
+
+
+def skipped_lines(skipped: Optional[Sequence[Tuple[str, str]]]) -> List[str]:
+    if not skipped:
+        return []
+    lines = ["## Skipped files", ""]
+    for file, reason in skipped:
+        lines.append(f"- `{file}`: {reason}")
     lines.append("")
-    lines.append("## Summary")
+    return lines
+
+
+# Directories listed in the Markdown metrics, those with the most findings
+# first; the machine-readable formats list them all.
+METRICS_TOP_DIRECTORIES = 20
+
+
+def _metrics_row(name: str, counts: Dict[str, Any]) -> str:
+    return (
+        f"| {name} | {counts['files']} | {counts['lines']} | {counts['comment_density']:.1%} "
+        f"| {counts['findings']} | {counts['findings_per_kloc']:.2f} |"
+    )
+
+
+def metrics_lines(metrics: Optional[Dict[str, Any]]) -> List[str]:
+    if not metrics or not metrics["totals"]["files"]:
+        return []
+    totals = metrics["totals"]
+    lines = ["## Metrics", ""]
+    lines.append(f"- Lines: **{totals['lines']}** ({totals['comment_lines']} comment lines, "
+                 f"{totals['comment_density']:.1%})")
+    lines.append(f"- Findings per 1000 lines: **{totals['findings_per_kloc']:.2f}**")
+    if metrics["kinds"]:
+        lines.append("- By kind: " + ", ".join(f"`{kind}` {count}" for kind, count in metrics["kinds"].items()))
+    header = ["| files | lines | comment % | findings | per 1000 lines |", "| ---: | ---: | ---: | ---: | ---: |"]
     lines.append("")
-    lines.append(f"- Files scanned: **{stats['file_count']}**")
-    lines.append(f"- Issues detected: **{stats['issue_count']}**")
+    lines.append("| language " + header[0])
+    lines.append("| --- " + header[1])
+    lines.extend(_metrics_row(name, counts) for name, counts in metrics["languages"].items())
+    directories = sorted(metrics["directories"].items(), key=lambda item: (-item[1]["findings"], item[0]))
     lines.append("")
+    lines.append("| directory " + header[0])
+    lines.append("| --- " + header[1])
+    top = directories[:METRICS_TOP_DIRECTORIES]
+    lines.extend(_metrics_row(f"`{name}`", counts) for name, counts in top)
+    if len(directories) > len(top):
+        lines.append("")
+        lines.append(f"{len(directories) - len(top)} more directories are listed in the JSON formats.")
+    lines.append("")
+    return lines
+
 
-    if formatter_results:
-        lines.append("## Formatters")
+def profile_lines(profile: Optional[Dict[str, Any]]) -> List[str]:
+    if not profile:
+        return []
+    lines = ["## Profile", ""]
+    lines.append("| stage | wall s | cpu s | files | MB |")
+    lines.append("| --- | ---: | ---: | ---: | ---: |")
+    rows = list(profile.get("stages", {}).items())
+    rows += [(f"detector: {name}", stats) for name, stats in profile.get("detectors", {}).items()]
+    for name, stats in rows:
+        lines.append(
+            f"| {name} | {stats['wall']:.3f} | {stats['cpu']:.3f} | {stats['files']} | {stats['bytes'] / 1e6:.2f} |"
+        )
+    slowest = profile.get("slowest_files")
+    if slowest:
         lines.append("")
-        for name, res in formatter_results.items():
-            if not isinstance(res, dict):
-                continue
-            rc = res.get("returncode")
-            lines.append(f"- **{name}**: return code `{rc}`")
+        lines.append("Slowest files:")
         lines.append("")
+        for entry in slowest:
+            lines.append(f"- `{entry['file']}`: {entry['wall'] * 1000:.1f} ms ({entry['bytes'] / 1e3:.1f} kB)")
+    lines.append("")
+    return lines
+
+
+def finding_line(f: Finding) -> str:
+    if f.kind == AI_PHRASE:
+        return f"- `{f.file}`: line {f.line} – AI phrase: `{f.phrase}`"
+    if f.kind == LONG_COMMENT_BLOCK:
+        return f"- `{f.file}`: lines {f.line}-{f.end_line} – long comment block ({f.lines} lines)"
+    return f"- `{f.file}`: {f.kind}"
+
+
+def build_markdown_report(root: Path, files, findings: List[Finding], formatter_results=None, skipped=None) -> str:
+    stats = basic_stats(files, findings)
+    root = root.resolve()
+
+    lines = []
+    lines.append("# vibe-sweeper report")
+    lines.append("")
+    lines.append(f"Root: `{root}`")
+    lines.append("")
+    lines.extend(summary_lines(stats["file_count"], stats["issue_count"], len(skipped or ())))
+    lines.extend(formatter_lines(formatter_results))
+    lines.extend(skipped_lines(skipped))
 
     if not findings:
         lines.append("## Findings")
@@ -36,16 +130,6 @@ def build_markdown_report(root: Path, files, findings: List[Dict], formatter_res
 
     lines.append("## Findings")
     lines.append("")
-    for f in findings:
-        kind = f.get("kind", "issue")
-        file = f.get("file", "?")
-        if kind == "ai_phrase":
-            lines.append(f"- `{file}`: line {f['line']} – AI phrase: `{f['phrase']}`")
-        elif kind == "long_comment_block":
-            lines.append(
-                f"- `{file}`: lines {f['start_line']}-{f['end_line']} – long comment block ({f['lines']} lines)"
-            )
-        else:
-            lines.append(f"- `{file}`: {kind}")
+    lines.extend(finding_line(f) for f in map(Finding.coerce, findings))
 
     return "\n".join(lines)
@@ -0,0 +1,280 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+from .. import __version__
+from ..analysis.metrics import MetricsAggregator
+from ..findings import AI_PHRASE, LONG_COMMENT_BLOCK, Finding
+from .summary import finding_line, formatter_lines, metrics_lines, profile_lines, skipped_lines, summary_lines
+
+# Characters reserved at the top of a seekable Markdown report for the
+# summary, which is written over the placeholder once the counts are known.
+SUMMARY_RESERVE = 256
+
+
+class ReportWriter:
+    """Writes a report incrementally while the scan is still running.
+
+    Call ``begin()`` once, then ``add()`` for every finding, ``scanned()``
+    for every scanned file and ``skip()`` for every skipped file as they
+    are produced, and ``end()`` when the scan is done. Nothing but counts,
+    the ``metrics`` and the (short) list of skipped files is kept in
+    memory, so the report can be arbitrarily large.
+    """
+
+    def __init__(self, out: TextIO, root: Path):
+        self.out = out
+        self.root = root.resolve()
+        self.finding_count = 0
+        self.skipped: List[Tuple[str, str]] = []
+        self.metrics = MetricsAggregator(self.root)
+
+    def begin(self) -> None:
+        pass
+
+    def add(self, finding: Finding) -> None:
+        self.finding_count += 1
+        self.metrics.add_finding(finding)
+
+    def scanned(self, file: str, lines: int, comment_lines: int) -> None:
+        self.metrics.add_file(file, lines, comment_lines)
+
+    def skip(self, file: str, reason: str) -> None:
+        self.skipped.append((file, reason))
+
+    def end(
+        self,
+        file_count: int,
+        formatter_results: Optional[Dict[str, Any]] = None,
+        profile: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.out.flush()
+
+
+class MarkdownReportWriter(ReportWriter):
+    """Streams the Markdown report.
+
+    With ``patch_summary`` (for seekable files) the summary stays at the top:
+    a placeholder of SUMMARY_RESERVE characters is written first and replaced
+    at the end. Otherwise the summary is written as a trailer.
+    """
+
+    def __init__(self, out: TextIO, root: Path, patch_summary: bool = False):
+        super().__init__(out, root)
+        self.patch_summary = patch_summary
+        self._summary_at: Any = None
+
+    def _summary_block(self, file_count: int) -> str:
+        text = "\n".join(summary_lines(file_count, self.finding_count, len(self.skipped))) + "\n"
+        # The padding hides in an HTML comment, which Markdown does not render.
+        pad = SUMMARY_RESERVE - len(text) - len("<!---->\n\n")
+        if pad < 0:
+            raise ValueError("summary does not fit the reserved space")
+        return text + "<!--" + " " * pad + "-->\n\n"
+
+    def begin(self) -> None:
+        self.out.write(f"# vibe-sweeper report\n\nRoot: `{self.root}`\n\n")
+        if self.patch_summary:
+            self.out.flush()
+            self._summary_at = self.out.tell()
+            self.out.write(self._summary_block(0))
+        self.out.write("## Findings\n\n")
+
+    def add(self, finding: Finding) -> None:
+        super().add(finding)
+        self.out.write(finding_line(finding) + "\n")
+
+    def end(
+        self,
+        file_count: int,
+        formatter_results: Optional[Dict[str, Any]] = None,
+        profile: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        out = self.out
+        if not self.finding_count:
+            out.write("No issues detected. Looking clean. ✨\n")
+        out.write("\n")
+        tail = skipped_lines(self.skipped) + metrics_lines(self.metrics.as_dict())
+        tail += formatter_lines(formatter_results) + profile_lines(profile)
+        if self._summary_at is None:
+            tail += summary_lines(file_count, self.finding_count, len(self.skipped))
+        if tail:
+            out.write("\n".join(tail) + "\n")
+        if self._summary_at is not None:
+            end = out.tell()
+            out.seek(self._summary_at)
+            out.write(self._summary_block(file_count))
+            out.seek(end)
+        super().end(file_count, formatter_results, profile)
+
+
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+def _summary(file_count: int, writer: ReportWriter) -> Dict[str, Any]:
+    return {
+        "files_scanned": file_count,
+        "issues": writer.finding_count,
+        "files_skipped": len(writer.skipped),
+    }
+
+
+class JsonLinesReportWriter(ReportWriter):
+    """One JSON object per line, written as soon as it is known.
+
+    Findings use the ``Finding.as_dict()`` shape. Skipped files
+    (``"kind": "skipped_file"``) follow, and a ``"kind": "summary"`` record
+    is always the last line.
+    """
+
+    def add(self, finding: Finding) -> None:
+        super().add(finding)
+        self.out.write(_encode(finding.as_dict()) + "\n")
+
+    def skip(self, file: str, reason: str) -> None:
+        super().skip(file, reason)
+        self.out.write(_encode({"kind": "skipped_file", "file": file, "reason": reason}) + "\n")
+
+    def end(
+        self,
+        file_count: int,
+        formatter_results: Optional[Dict[str, Any]] = None,
+        profile: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        record: Dict[str, Any] = {"kind": "summary", **_summary(file_count, self), "metrics": self.metrics.as_dict()}
+        if formatter_results:
+            record["formatters"] = formatter_results
+        if profile:
+            record["profile"] = profile
+        self.out.write(_encode(record) + "\n")
+        super().end(file_count, formatter_results, profile)
+
+
+class JsonReportWriter(ReportWriter):
+    """A single JSON document whose ``findings`` array is streamed."""
+
+    def begin(self) -> None:
+        self.out.write('{"root":' + _encode(str(self.root)) + ',"findings":[')
+
+    def add(self, finding: Finding) -> None:
+        self.out.write(("," if self.finding_count else "\n") + _encode(finding.as_dict()) + "\n")
+        super().add(finding)
+
+    def end(
+        self,
+        file_count: int,
+        formatter_results: Optional[Dict[str, Any]] = None,
+        profile: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        skipped = [{"file": file, "reason": reason} for file, reason in self.skipped]
+        self.out.write('],"skipped":' + _encode(skipped))
+        self.out.write(',"formatters":' + _encode(formatter_results or {}))
+        self.out.write(',"metrics":' + _encode(self.metrics.as_dict()))
+        if profile:
+            self.out.write(',"profile":' + _encode(profile))
+        self.out.write(',"summary":' + _encode(_summary(file_count, self)) + "}\n")
+        super().end(file_count, formatter_results, profile)
+
+
+SARIF_VERSION = "2.1.0"
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+INFORMATION_URI = "https://github.com/beerberidie/RinseKit"
+
+# Rule metadata for the built-in finding kinds. Findings of other kinds
+# (from plugins) still reference their kind as ruleId.
+SARIF_RULES = {
+    AI_PHRASE: "Phrase typical of AI-generated text",
+    LONG_COMMENT_BLOCK: "Overly long comment block",
+}
+
+
+class SarifReportWriter(ReportWriter):
+    """A SARIF 2.1.0 log with one run, for code-scanning tools.
+
+    File paths are made relative to the scan root (``%SRCROOT%``). Skipped
+    files become tool execution notifications, and the summary counts go in
+    the run's ``properties``.
+    """
+
+    def _location(self, file: str, line: int = 0, end_line: Optional[int] = None) -> Dict[str, Any]:
+        path = Path(file)
+        try:
+            artifact = {"uri": path.resolve().relative_to(self.root).as_posix(), "uriBaseId": "%SRCROOT%"}
+        except ValueError:
+            artifact = {"uri": path.resolve().as_uri()}
+        location: Dict[str, Any] = {"artifactLocation": artifact}
+        if line > 0:
+            location["region"] = {"startLine": line, "endLine": end_line or line}
+        return {"physicalLocation": location}
+
+    def begin(self) -> None:
+        driver = {
+            "name": "vibe-sweeper",
+            "version": __version__,
+            "informationUri": INFORMATION_URI,
+            "rules": [
+                {"id": kind, "shortDescription": {"text": text}, "defaultConfiguration": {"level": "warning"}}
+                for kind, text in SARIF_RULES.items()
+            ],
+        }
+        self.out.write(
+            '{"$schema":' + _encode(SARIF_SCHEMA) + ',"version":' + _encode(SARIF_VERSION) + ',"runs":[{'
+            '"tool":' + _encode({"driver": driver})
+            + ',"originalUriBaseIds":' + _encode({"%SRCROOT%": {"uri": self.root.as_uri() + "/"}})
+            + ',"results":['
+        )
+
+    def _message(self, finding: Finding) -> str:
+        if finding.kind == AI_PHRASE:
+            return f"AI phrase: '{finding.phrase}'"
+        if finding.kind == LONG_COMMENT_BLOCK:
+            return f"Long comment block ({finding.lines} lines)"
+        return finding.kind
+
+    def add(self, finding: Finding) -> None:
+        result = {
+            "ruleId": finding.kind,
+            "level": "warning",
+            "message": {"text": self._message(finding)},
+            "locations": [self._location(finding.file, finding.line, finding.end_line)],
+        }
+        self.out.write(("," if self.finding_count else "\n") + _encode(result) + "\n")
+        super().add(finding)
+
+    def end(
+        self,
+        file_count: int,
+        formatter_results: Optional[Dict[str, Any]] = None,
+        profile: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        notifications = [
+            {"level": "note", "message": {"text": f"Skipped: {reason}"}, "locations": [self._location(file)]}
+            for file, reason in self.skipped
+        ]
+        invocation = {"executionSuccessful": True, "toolExecutionNotifications": notifications}
+        properties: Dict[str, Any] = _summary(file_count, self)
+        properties["metrics"] = self.metrics.as_dict()
+        if profile:
+            properties["profile"] = profile
+        self.out.write(
+            '],"invocations":' + _encode([invocation])
+            + ',"properties":' + _encode(properties)
+            + "}]}\n"
+        )
+        super().end(file_count, formatter_results, profile)
+
+
+REPORT_FORMATS = ("markdown", "json", "jsonl", "sarif")
+
+
+def create_writer(fmt: str, out: TextIO, root: Path, seekable: bool = False) -> ReportWriter:
+    """Build the writer for one of REPORT_FORMATS."""
+    if fmt == "markdown":
+        return MarkdownReportWriter(out, root, patch_summary=seekable)
+    if fmt == "jsonl":
+        return JsonLinesReportWriter(out, root)
+    if fmt == "json":
+        return JsonReportWriter(out, root)
+    if fmt == "sarif":
+        return SarifReportWriter(out, root)
+    raise ValueError(f"unknown report format: {fmt!r}")
@@ -1,8 +1,27 @@
+import io
+import math
+import mmap
 import os
+import re
+from collections import Counter
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
-DEFAULT_IGNORES = {".git", ".hg", ".svn", ".idea", ".vscode", "__pycache__", "node_modules", "dist", "build"}
+from .ignore import IGNORE_FILE_NAMES, IgnoreFile, IgnoreStack, is_ignored, root_stack
+
+DEFAULT_IGNORES = {
+    ".git",
+    ".hg",
+    ".svn",
+    ".idea",
+    ".vscode",
+    "__pycache__",
+    "node_modules",
+    "dist",
+    "build",
+    ".vibe-sweeper-cache",
+}
 
 EXT_LANG_MAP = {
     ".py": "python",
@@ -16,15 +35,110 @@ EXT_LANG_MAP = {
 }
 
 
-def walk_project(root: Path) -> List[Path]:
-    files: List[Path] = []
+# Characters of text handed to the detectors per batch; bounds the memory used
+# per file regardless of its size (apart from the longest single line).
+BATCH_CHARS = 1 << 16
+
+# Bytes read from the start of a file to decide whether it is worth scanning.
+SNIFF_BYTES = 8192
+
+# A sample is considered minified (or generated data) when it has a line at
+# least this long and is both almost free of whitespace and dense. Either
+# test alone also matches ordinary source with one long literal line.
+MINIFIED_LINE_LENGTH = 1000
+MINIFIED_MAX_WHITESPACE = 0.08
+MINIFIED_MIN_ENTROPY = 4.5
+
+# Files smaller than this are read into a bytes object instead of being
+# memory-mapped; for them the mapping costs more than the copy it saves.
+MMAP_MIN_BYTES = 1 << 16
+
+# Bytes of a mapped file examined at a time by byte-level scans. Bounds the
+# temporary copies they make, whatever the size of the file.
+WINDOW_BYTES = 1 << 18
+
+# ASCII control characters other than "\n" and "\t" that str.splitlines()
+# or str.strip() treat as line breaks or whitespace.
+_CONTROL_BYTES = (b"\r", b"\x0b", b"\x0c", b"\x1c", b"\x1d", b"\x1e", b"\x1f")
+
+# Non-ASCII bytes with the same problem (NEL and NBSP, including as UTF-8
+# continuation bytes, and the Unicode spaces and separators), plus the two
+# characters that lowercase to ASCII (U+0130 and the Kelvin sign).
+_NON_ASCII_SEMANTICS = re.compile(
+    rb"[\x85\xa0]|\xe1\x9a\x80|\xe2\x80[\x80-\x8a\xa8\xa9\xaf]|\xe2\x81\x9f|\xe3\x80\x80|\xc4\xb0|\xe2\x84\xaa"
+)
+
+# A file's bytes: a read-only mmap, or bytes for small and empty files.
+Buffer = Union[bytes, mmap.mmap]
+
+
+def walk_project(root: Path, use_ignore_files: bool = True, follow_symlinks: bool = False) -> List[Path]:
+    """List the files under ``root`` whose extension is in EXT_LANG_MAP.
+
+    Directories named in DEFAULT_IGNORES, and paths excluded by
+    ``.gitignore``/``.vibeignore`` files (when ``use_ignore_files``), are
+    pruned before they are descended into. Symlinked directories are only
+    followed with ``follow_symlinks``, and then each directory is visited
+    at most once so symlink loops terminate. Files are listed in the same
+    order as a top-down ``os.walk``.
+    """
     root = root.resolve()
-    for dirpath, dirnames, filenames in os.walk(root):
-        dirnames[:] = [d for d in dirnames if d not in DEFAULT_IGNORES]
-        for name in filenames:
-            path = Path(dirpath) / name
-            if path.suffix.lower() in EXT_LANG_MAP:
-                files.append(path)
+    files: List[Path] = []
+    base_stack: IgnoreStack = root_stack(root) if use_ignore_files else ()
+    visited = set()
+    if follow_symlinks:
+        st = os.stat(root)
+        visited.add((st.st_dev, st.st_ino))
+
+    # (absolute dir, dir relative to root with trailing "/", ignore stack)
+    pending = [(str(root), "", base_stack)]
+    while pending:
+        dirpath, rel_dir, stack = pending.pop()
+        try:
+            with os.scandir(dirpath) as it:
+                entries = list(it)
+        except OSError:
+            continue
+
+        if use_ignore_files:
+            # In IGNORE_FILE_NAMES order, like IgnoreTree: .vibeignore wins.
+            present = {entry.name for entry in entries if entry.name in IGNORE_FILE_NAMES}
+            for name in IGNORE_FILE_NAMES:
+                if name in present:
+                    ignore = IgnoreFile.load(Path(dirpath) / name)
+                    if ignore is not None:
+                        stack = stack + ((rel_dir, ignore),)
+
+        subdirs = []
+        for entry in entries:
+            name = entry.name
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir:
+                if name in DEFAULT_IGNORES:
+                    continue
+                if stack and is_ignored(stack, rel_dir + name, True):
+                    continue
+                if not follow_symlinks:
+                    if entry.is_symlink():
+                        continue
+                else:
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    key = (st.st_dev, st.st_ino)
+                    if key in visited:
+                        continue
+                    visited.add(key)
+                subdirs.append((entry.path, rel_dir + name + "/", stack))
+            elif os.path.splitext(name)[1].lower() in EXT_LANG_MAP:
+                if stack and is_ignored(stack, rel_dir + name, False):
+                    continue
+                files.append(Path(entry.path))
+        pending.extend(reversed(subdirs))
     return files
 
 
@@ -36,6 +150,47 @@ def detect_languages(files: List[Path]) -> Dict[str, List[Path]]:
     return by_lang
 
 
+def decode_bytes(data: bytes) -> str:
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return data.decode("latin-1")
+
+
+def _entropy(data: bytes) -> float:
+    """Shannon entropy of ``data`` in bits per byte."""
+    total = len(data)
+    return -sum(n / total * math.log2(n / total) for n in Counter(data).values())
+
+
+def _looks_minified(head: bytes) -> bool:
+    if max(map(len, head.split(b"\n"))) < MINIFIED_LINE_LENGTH:
+        return False
+    spaces = head.count(b" ") + head.count(b"\t") + head.count(b"\n") + head.count(b"\r")
+    return spaces / len(head) < MINIFIED_MAX_WHITESPACE and _entropy(head) >= MINIFIED_MIN_ENTROPY
+
+
+def sniff_file(path: Path, max_file_bytes: Optional[int] = None, size: Optional[int] = None) -> Optional[str]:
+    """Return why ``path`` should not be scanned, or None if it looks like source.
+
+    Files over ``max_file_bytes`` (when set and non-zero), files whose first
+    SNIFF_BYTES contain a NUL byte and minified or generated one-line files
+    are skipped. ``size`` saves a stat when the caller already has one.
+    """
+    if max_file_bytes:
+        if size is None:
+            size = os.stat(path).st_size
+        if size > max_file_bytes:
+            return f"too large ({size} bytes, limit {max_file_bytes})"
+    with open(path, "rb") as fh:
+        head = fh.read(SNIFF_BYTES)
+    if b"\0" in head:
+        return "binary"
+    if _looks_minified(head):
+        return "minified"
+    return None
+
+
 def read_file_text(path: Path) -> str:
     try:
         return path.read_text(encoding="utf-8")
@@ -44,3 +199,134 @@ def read_file_text(path: Path) -> str:
             return path.read_text(encoding="latin-1")
         except Exception:
             return ""
+
+
+@contextmanager
+def map_file(path: Path, min_mmap_bytes: int = MMAP_MIN_BYTES) -> Iterator[Buffer]:
+    """Yield the bytes of ``path`` without decoding them.
+
+    Files of at least ``min_mmap_bytes`` are memory-mapped read-only, so the
+    content is never copied into the Python heap; the mapping is closed on
+    exit and must not be used afterwards.
+    """
+    with open(path, "rb") as fh:
+        size = os.fstat(fh.fileno()).st_size
+        if size < max(min_mmap_bytes, 1):
+            yield fh.read()
+            return
+        buffer = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield buffer
+        finally:
+            buffer.close()
+
+
+class MappedText:
+    """Line-oriented access to a file's undecoded bytes.
+
+    Byte-level detectors search ``buffer`` directly and only turn the lines
+    they report on into text. Line numbers follow ``str.splitlines()`` as
+    long as ``is_plain`` holds. They are counted from the previous lookup,
+    so ascending lookups cost one pass over the file in total.
+    """
+
+    __slots__ = ("buffer", "_mark", "_mark_line")
+
+    def __init__(self, buffer: Buffer):
+        self.buffer = buffer
+        self._mark = 0
+        self._mark_line = 1
+
+    @property
+    def is_plain(self) -> bool:
+        """True if ASCII byte semantics give the same lines and case folding as decoded text."""
+        buffer = self.buffer
+        for start in range(0, len(buffer), WINDOW_BYTES):
+            # Overlap by two bytes so no multi-byte sequence is cut in half.
+            window = buffer[start : start + WINDOW_BYTES + 2]
+            if any(byte in window for byte in _CONTROL_BYTES):
+                return False
+            if not window.isascii() and _NON_ASCII_SEMANTICS.search(window):
+                return False
+        return True
+
+    def iter_windows(self, size: int = WINDOW_BYTES) -> Iterator[Tuple[int, bytes]]:
+        """Yield ``(offset, chunk)`` copies of the buffer, cut after a newline.
+
+        Each chunk holds whole lines: roughly ``size`` bytes, extended to the
+        next line end (which is not included).
+        """
+        buffer = self.buffer
+        total = len(buffer)
+        start = 0
+        while start < total:
+            end = buffer.find(b"\n", min(start + size, total - 1))
+            if end == -1:
+                end = total
+            yield start, buffer[start:end]
+            start = end + 1
+
+    def line_number(self, offset: int) -> int:
+        """1-based number of the line containing byte ``offset``."""
+        if offset < self._mark:
+            self._mark, self._mark_line = 0, 1
+        self._mark_line += self.buffer[self._mark : offset].count(b"\n")
+        self._mark = offset
+        return self._mark_line
+
+    def line_bounds(self, offset: int) -> Tuple[int, int]:
+        """Start and end (excluding the newline) of the line containing ``offset``."""
+        start = self.buffer.rfind(b"\n", 0, offset) + 1
+        end = self.buffer.find(b"\n", offset)
+        return start, len(self.buffer) if end == -1 else end
+
+    def line_text(self, offset: int) -> str:
+        """Decoded text of the line containing ``offset``."""
+        start, end = self.line_bounds(offset)
+        return decode_bytes(self.buffer[start:end])
+
+
+class _HashingReader(io.RawIOBase):
+    """Raw reader that feeds every byte it reads into ``hasher``."""
+
+    def __init__(self, raw, hasher):
+        self._raw = raw
+        self._hasher = hasher
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        n = self._raw.readinto(buffer)
+        if n:
+            self._hasher.update(memoryview(buffer)[:n])
+        return n
+
+    def close(self) -> None:
+        self._raw.close()
+        super().close()
+
+
+def iter_line_batches(
+    path: Path,
+    encoding: str = "utf-8",
+    batch_chars: int = BATCH_CHARS,
+    hasher: Optional[Any] = None,
+) -> Iterator[List[str]]:
+    """Read ``path`` once, yielding its lines in batches of about ``batch_chars``.
+
+    Lines are split exactly like ``str.splitlines()`` on the whole decoded
+    file would split them. If ``hasher`` is given, the raw bytes are fed to
+    it as they are read. Decoding errors surface as UnicodeDecodeError.
+    """
+    raw = open(path, "rb", buffering=0)
+    if hasher is not None:
+        raw = _HashingReader(raw, hasher)
+    # newline="" keeps "\r\n" pairs together without translating them, so
+    # every batch ends on a line boundary that splitlines() agrees with.
+    with io.TextIOWrapper(io.BufferedReader(raw), encoding=encoding, newline="") as fh:
+        while True:
+            chunk = fh.readlines(batch_chars)
+            if not chunk:
+                return
+            yield "".join(chunk).splitlines()
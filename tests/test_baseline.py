@@ -0,0 +1,93 @@
+"""Tests for baselines and inline suppressions."""
+import pytest
+
+from vibe_sweeper.baseline import Baseline, BaselineError, FindingFilter
+from vibe_sweeper.config import load_default_config
+from vibe_sweeper.engine import analyze_file, iter_file_reports
+
+
+def _findings(path):
+    return analyze_file(path, load_default_config())
+
+
+def _record(root, path):
+    recorded = set()
+    FindingFilter(root, collect=recorded).filter(path, _findings(path))
+    return Baseline(recorded)
+
+
+def test_baseline_round_trip(tmp_path):
+    """Test that fingerprints survive a save and load."""
+    baseline = Baseline(range(1, 1000))
+    baseline.save(tmp_path / "base")
+
+    loaded = Baseline.load(tmp_path / "base")
+
+    assert len(loaded) == 999
+    assert all(n in loaded for n in range(1, 1000))
+    assert 1000 not in loaded and 2**64 - 1 not in loaded
+
+
+def test_baseline_rejects_other_files(tmp_path):
+    """Test that a missing or foreign file raises BaselineError."""
+    with pytest.raises(BaselineError, match="cannot read"):
+        Baseline.load(tmp_path / "missing")
+    (tmp_path / "other").write_text("not a baseline\n")
+    with pytest.raises(BaselineError, match="not a vibe-sweeper baseline"):
+        Baseline.load(tmp_path / "other")
+
+
+def test_baseline_survives_moved_lines(tmp_path):
+    """Test that known findings match after code moves, and new copies do not."""
+    path = tmp_path / "a.py"
+    path.write_text("x = 1\n# As an AI language model, hi\n")
+    baseline = _record(tmp_path, path)
+
+    path.write_text("import os\n\nx = 1\n  #  As an AI language model,   hi\ny = 2\n# As an AI language model, hi\n")
+    finding_filter = FindingFilter(tmp_path, baseline=baseline)
+    (new,) = finding_filter.filter(path, _findings(path))
+
+    assert new["line"] == 6
+    assert finding_filter.baselined == 1
+
+
+def test_baseline_is_per_file(tmp_path):
+    """Test that the same finding in another file is new."""
+    (tmp_path / "a.py").write_text("# As an AI language model\n")
+    (tmp_path / "b.py").write_text("# As an AI language model\n")
+    baseline = _record(tmp_path, tmp_path / "a.py")
+
+    assert FindingFilter(tmp_path, baseline=baseline).filter(tmp_path / "b.py", _findings(tmp_path / "b.py"))
+
+
+def test_inline_suppressions(tmp_path):
+    """Test that vibe: ignore hides findings on its line or inside its block."""
+    path = tmp_path / "a.py"
+    path.write_text(
+        "x = 1  # As an AI language model  # vibe: ignore\n"
+        "y = 2  # As an AI language model\n"
+        + "# long block\n" * 10
+        + "# vibe: ignore\n"
+        + "# long block\n" * 20
+    )
+    finding_filter = FindingFilter(tmp_path)
+
+    (kept,) = finding_filter.filter(path, _findings(path))
+
+    assert kept["line"] == 2
+    assert finding_filter.suppressed == 2
+
+
+def test_inline_suppressions_from_scan(tmp_path, monkeypatch):
+    """Test that marker lines recorded by the scan suppress without reading the file again."""
+    path = tmp_path / "a.py"
+    path.write_text("x = 1  # As an AI language model  # vibe: ignore\ny = 2  # As an AI language model\n")
+    (report,) = iter_file_reports([path], load_default_config(), jobs=1)
+    assert report.marker_lines == (1,)
+    monkeypatch.setattr("vibe_sweeper.baseline._read", lambda path: pytest.fail("file read again"))
+    finding_filter = FindingFilter(tmp_path)
+
+    (kept,) = finding_filter.filter(path, report.findings, report.marker_lines)
+
+    assert kept["line"] == 2
+    assert finding_filter.suppressed == 1
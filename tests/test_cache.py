@@ -0,0 +1,184 @@
+"""Tests for the incremental findings cache."""
+import os
+from pathlib import Path
+import pytest
+
+from vibe_sweeper.cache import CACHE_DIR_NAME, FindingsCache, clear_cache
+from vibe_sweeper.config import ConfigIndex, load_config, load_default_config
+from vibe_sweeper.engine import collect_findings
+
+
+AI_LINE = "# As an AI language model\n"
+
+
+def _age(path: Path, seconds: int = 60):
+    """Move a file's mtime into the past so it is outside the racy window."""
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns - seconds * 1_000_000_000))
+
+
+def test_cache_round_trip(tmp_path):
+    """Test that findings and line counts survive a save and load."""
+    cfg = load_default_config()
+    path = tmp_path / "a.py"
+    path.write_text(AI_LINE)
+    _age(path)
+
+    cache = FindingsCache.load(tmp_path, cfg)
+    first = collect_findings([path], cfg, jobs=1, cache=cache)
+    cache.save()
+
+    reloaded = FindingsCache.load(tmp_path, cfg)
+    assert reloaded.lookup(path) == (first, None, 1, 1, ())
+    assert reloaded.hits == 1
+    assert (tmp_path / CACHE_DIR_NAME / ".gitignore").exists()
+
+
+def test_cache_reuses_findings_without_rescanning(tmp_path, monkeypatch):
+    """Test that unchanged files are not analysed again."""
+    cfg = load_default_config()
+    path = tmp_path / "a.py"
+    path.write_text(AI_LINE)
+    _age(path)
+    cache = FindingsCache.load(tmp_path, cfg)
+    expected = collect_findings([path], cfg, jobs=1, cache=cache)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("file should not be rescanned")
+
+    monkeypatch.setattr("vibe_sweeper.engine.build_detectors", fail)
+
+    assert collect_findings([path], cfg, jobs=1, cache=cache) == expected
+
+
+def test_cache_detects_modified_file(tmp_path):
+    """Test that a changed file is rescanned."""
+    cfg = load_default_config()
+    path = tmp_path / "a.py"
+    path.write_text(AI_LINE)
+    cache = FindingsCache.load(tmp_path, cfg)
+    assert len(collect_findings([path], cfg, jobs=1, cache=cache)) == 1
+
+    path.write_text("x = 1\n")
+
+    assert collect_findings([path], cfg, jobs=1, cache=cache) == []
+
+
+def test_cache_same_size_edit_within_same_mtime(tmp_path):
+    """Test that same-size edits that keep the mtime are still caught."""
+    cfg = load_default_config()
+    path = tmp_path / "a.py"
+    path.write_text("# as an ai language model\n")
+    cache = FindingsCache.load(tmp_path, cfg)
+    collect_findings([path], cfg, jobs=1, cache=cache)
+    st = path.stat()
+
+    path.write_text("# as an ox language model\n")
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+    assert collect_findings([path], cfg, jobs=1, cache=cache) == []
+
+
+def test_cache_touched_file_reuses_entry_by_content(tmp_path):
+    """Test that a new mtime with identical content is still a cache hit."""
+    cfg = load_default_config()
+    path = tmp_path / "a.py"
+    path.write_text(AI_LINE)
+    _age(path, 120)
+    cache = FindingsCache.load(tmp_path, cfg)
+    collect_findings([path], cfg, jobs=1, cache=cache)
+
+    _age(path, -60)
+
+    assert cache.lookup(path) is not None
+
+
+def test_cache_invalidated_by_config_change(tmp_path):
+    """Test that a different config discards cached findings."""
+    cfg = load_default_config()
+    path = tmp_path / "a.py"
+    path.write_text(AI_LINE)
+    _age(path)
+    cache = FindingsCache.load(tmp_path, cfg)
+    collect_findings([path], cfg, jobs=1, cache=cache)
+    cache.save()
+
+    other = dict(cfg, ai_phrases=["something else"])
+    reloaded = FindingsCache.load(tmp_path, other)
+
+    assert len(reloaded) == 0
+    assert reloaded.lookup(path) is None
+
+
+def test_cache_checks_directory_configs_per_file(tmp_path):
+    """Test that a nested vibe.yaml only invalidates the entries of its files, whatever was scanned."""
+    root = tmp_path.resolve()
+    (root / "vendor").mkdir()
+    top, nested = root / "a.py", root / "vendor" / "lib.py"
+    for path in (top, nested):
+        path.write_text(AI_LINE)
+        _age(path)
+    (root / "vendor" / "vibe.yaml").write_text("max_comment_block_lines: 3\n")
+    cfg = load_config(None)
+    configs = ConfigIndex(root, cfg)
+    configs.add_files([top, nested])
+    cache = FindingsCache.load(root, cfg, configs=configs)
+    collect_findings([top, nested], cfg, jobs=1, cache=cache, configs=configs)
+    cache.save()
+
+    # A run that only scans the top-level file, like check --since.
+    partial = ConfigIndex(root, cfg)
+    partial.add_files([top])
+    reloaded = FindingsCache.load(root, cfg, configs=partial)
+    assert len(reloaded) == 2
+    assert reloaded.lookup(top) is not None
+    assert reloaded.lookup(nested) is not None
+
+    (root / "vendor" / "vibe.yaml").write_text("max_comment_block_lines: 4\n")
+    changed = FindingsCache.load(root, cfg, configs=ConfigIndex(root, cfg))
+    assert changed.lookup(top) is not None
+    assert changed.lookup(nested) is None
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    """Test that the cache stays within max_entries."""
+    cfg = load_default_config()
+    files = []
+    for name in ("a.py", "b.py", "c.py"):
+        path = tmp_path / name
+        path.write_text("x = 1\n")
+        _age(path)
+        files.append(path)
+    cache = FindingsCache(tmp_path, cfg, max_entries=2)
+    collect_findings(files[:2], cfg, jobs=1, cache=cache)
+    cache.lookup(files[0])
+
+    collect_findings(files[2:], cfg, jobs=1, cache=cache)
+
+    assert len(cache) == 2
+    assert cache.lookup(files[0]) is not None
+    assert cache.lookup(files[1]) is None
+
+
+def test_clear_cache(tmp_path):
+    """Test removing the cache directory."""
+    cfg = load_default_config()
+    cache = FindingsCache(tmp_path, cfg)
+    cache.store(tmp_path / "a.py", (0, 0, ""), [])
+    cache.save()
+
+    assert clear_cache(tmp_path) is True
+    assert not (tmp_path / CACHE_DIR_NAME).exists()
+    assert clear_cache(tmp_path) is False
+
+
+def test_cache_remembers_skipped_files(tmp_path):
+    """Test that a skipped file is cached with its reason."""
+    cfg = load_default_config()
+    path = tmp_path / "blob.js"
+    path.write_bytes(b"\0" * 64)
+    _age(path)
+    cache = FindingsCache.load(tmp_path, cfg)
+    collect_findings([path], cfg, jobs=1, cache=cache)
+
+    assert cache.lookup(path) == ([], "binary", 0, 0, ())
@@ -1,4 +1,8 @@
 """Tests for CLI commands."""
+import json
+import os
+import shutil
+import subprocess
 from pathlib import Path
 import pytest
 from typer.testing import CliRunner
@@ -119,6 +123,16 @@ def test_run_command_with_apply(tmp_path):
     assert "## Formatters" in result.stdout
 
 
+def test_run_command_apply_findings_only_skips_clean_files(tmp_path):
+    """Test that --findings-only gives formatters nothing to do on a clean project."""
+    (tmp_path / "test.py").write_text("def hello():\n    pass\n")
+
+    result = runner.invoke(app, ["run", str(tmp_path), "--apply", "--findings-only", "--no-cache"])
+
+    assert result.exit_code == 0
+    assert "## Formatters" not in result.stdout
+
+
 def test_scan_command_with_custom_config(tmp_path):
     """Test scan command with custom config file."""
     test_file = tmp_path / "test.py"
@@ -133,3 +147,317 @@ def test_scan_command_with_custom_config(tmp_path):
     assert "Issues detected: **1**" in result.stdout
     assert "custom phrase" in result.stdout
 
+
+def test_scan_command_set_overrides_config(tmp_path):
+    """Test that --set takes precedence over vibe.yaml."""
+    (tmp_path / "test.py").write_text("# As an AI language model\n")
+    (tmp_path / "vibe.yaml").write_text("detectors:\n  ai_phrases: false\n")
+
+    quiet = runner.invoke(app, ["scan", str(tmp_path), "--no-cache"])
+    loud = runner.invoke(app, ["scan", str(tmp_path), "--no-cache", "--set", "detectors.ai_phrases=true"])
+
+    assert "Issues detected: **0**" in quiet.stdout
+    assert "Issues detected: **1**" in loud.stdout
+
+
+def test_check_command_applies_nested_config(tmp_path):
+    """Test that a vibe.yaml in a subdirectory only affects that directory."""
+    (tmp_path / "vendor").mkdir()
+    (tmp_path / "vendor" / "lib.py").write_text("# As an AI language model\n")
+    (tmp_path / "vendor" / "vibe.yaml").write_text("detectors:\n  ai_phrases: false\n")
+
+    assert runner.invoke(app, ["check", str(tmp_path)]).exit_code == 0
+    (tmp_path / "app.py").write_text("# As an AI language model\n")
+    assert runner.invoke(app, ["check", str(tmp_path)]).exit_code == 1
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlinks not supported")
+def test_check_command_applies_nested_config_through_symlinked_root(tmp_path):
+    """Test that nested vibe.yaml files apply when the root is reached through a symlink."""
+    project = tmp_path / "project"
+    (project / "vendor").mkdir(parents=True)
+    (project / "vendor" / "lib.py").write_text("# As an AI language model\n")
+    (project / "vendor" / "vibe.yaml").write_text("detectors:\n  ai_phrases: false\n")
+    link = tmp_path / "link"
+    try:
+        os.symlink(project, link, target_is_directory=True)
+    except OSError:
+        pytest.skip("cannot create symlinks")
+
+    assert runner.invoke(app, ["check", str(link), "--no-cache"]).exit_code == 0
+
+
+def test_check_command_rejects_invalid_config(tmp_path):
+    """Test that an invalid config value exits with status 2."""
+    (tmp_path / "vibe.yaml").write_text("max_comment_block_lines: many\n")
+
+    result = runner.invoke(app, ["check", str(tmp_path)])
+
+    assert result.exit_code == 2
+    assert "max_comment_block_lines" in result.output
+
+
+def test_scan_command_with_jobs(tmp_path):
+    """Test scan command with an explicit worker count."""
+    for i in range(3):
+        (tmp_path / f"ai_{i}.py").write_text("# As an AI language model\n")
+
+    result = runner.invoke(app, ["scan", str(tmp_path), "--jobs", "2"])
+
+    assert result.exit_code == 0
+    assert "Files scanned: **3**" in result.stdout
+    assert "Issues detected: **3**" in result.stdout
+
+
+def test_scan_command_rejects_zero_jobs(tmp_path):
+    """Test that --jobs must be at least 1."""
+    result = runner.invoke(app, ["scan", str(tmp_path), "--jobs", "0"])
+
+    assert result.exit_code != 0
+
+
+def test_scan_command_writes_cache(tmp_path):
+    """Test that scans populate the cache and still report the same results."""
+    (tmp_path / "ai.py").write_text("# As an AI language model\n")
+
+    first = runner.invoke(app, ["scan", str(tmp_path)])
+    second = runner.invoke(app, ["scan", str(tmp_path)])
+
+    assert (tmp_path / ".vibe-sweeper-cache").is_dir()
+    assert first.stdout == second.stdout
+    assert "Files scanned: **1**" in second.stdout
+
+
+def test_scan_command_no_cache(tmp_path):
+    """Test that --no-cache leaves no cache behind."""
+    (tmp_path / "clean.py").write_text("x = 1\n")
+
+    result = runner.invoke(app, ["scan", str(tmp_path), "--no-cache"])
+
+    assert result.exit_code == 0
+    assert not (tmp_path / ".vibe-sweeper-cache").exists()
+
+
+def test_cache_clear_command(tmp_path):
+    """Test the cache clear command."""
+    (tmp_path / "clean.py").write_text("x = 1\n")
+    runner.invoke(app, ["scan", str(tmp_path)])
+
+    result = runner.invoke(app, ["cache", "clear", str(tmp_path)])
+
+    assert result.exit_code == 0
+    assert "Removed" in result.stdout
+    assert not (tmp_path / ".vibe-sweeper-cache").exists()
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+def test_check_command_staged_changed_lines(tmp_path):
+    """Test check --staged --changed-lines only sees new findings."""
+    git = ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com"]
+    subprocess.run(git + ["init", "-q"], cwd=tmp_path, check=True)
+    legacy = tmp_path / "legacy.py"
+    legacy.write_text("# As an AI language model\nx = 1\n")
+    subprocess.run(git + ["add", "."], cwd=tmp_path, check=True)
+    subprocess.run(git + ["commit", "-q", "-m", "initial"], cwd=tmp_path, check=True)
+    legacy.write_text("# As an AI language model\nx = 2\n")
+    subprocess.run(git + ["add", "."], cwd=tmp_path, check=True)
+
+    changed = runner.invoke(app, ["check", str(tmp_path), "--staged", "--no-cache"])
+    only_lines = runner.invoke(app, ["check", str(tmp_path), "--staged", "--changed-lines", "--no-cache"])
+
+    assert changed.exit_code == 1
+    assert "Files scanned: **1**" in changed.stdout
+    assert only_lines.exit_code == 0
+    assert "Issues detected: **0**" in only_lines.stdout
+
+
+def test_scan_command_rejects_since_and_staged(tmp_path):
+    """Test that --since and --staged are mutually exclusive."""
+    result = runner.invoke(app, ["scan", str(tmp_path), "--since", "main", "--staged"])
+
+    assert result.exit_code == 2
+
+
+def test_check_command_jsonl_format(tmp_path):
+    """Test check --format jsonl streams machine-readable findings."""
+    (tmp_path / "ai_code.py").write_text("# As an AI language model, I can help\n")
+
+    result = runner.invoke(app, ["check", str(tmp_path), "--format", "jsonl", "--no-cache"])
+
+    assert result.exit_code == 1
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert records[0]["phrase"] == "as an ai language model"
+    assert records[-1]["kind"] == "summary"
+
+
+def test_check_command_with_baseline(tmp_path):
+    """Test that check --baseline only fails on findings added after the baseline."""
+    (tmp_path / "old.py").write_text("# As an AI language model, I can help\n")
+
+    result = runner.invoke(app, ["baseline", str(tmp_path)])
+    assert result.exit_code == 0
+    assert (tmp_path / ".vibe-baseline").exists()
+    args = ["check", str(tmp_path), "--baseline", str(tmp_path / ".vibe-baseline"), "-f", "jsonl"]
+    assert runner.invoke(app, args).exit_code == 0
+
+    (tmp_path / "old.py").write_text("import os\n# As an AI language model, I can help\n")
+    (tmp_path / "new.py").write_text("# In this code snippet\nx = 1  # in this code snippet  # vibe: ignore\n")
+    result = runner.invoke(app, args)
+    assert result.exit_code == 1
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [(r["file"], r["line"]) for r in records[:-1]] == [(str(tmp_path / "new.py"), 1)]
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlinks not supported")
+def test_check_command_baseline_through_symlinked_root(tmp_path):
+    """Test that a baseline written through a symlinked root matches a check of the real path."""
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "old.py").write_text("# As an AI language model, I can help\n")
+    link = tmp_path / "link"
+    try:
+        os.symlink(project, link, target_is_directory=True)
+    except OSError:
+        pytest.skip("cannot create symlinks")
+
+    assert runner.invoke(app, ["baseline", str(link)]).exit_code == 0
+    result = runner.invoke(app, ["check", str(project), "--baseline", str(project / ".vibe-baseline")])
+
+    assert result.exit_code == 0
+
+
+def test_check_command_rejects_invalid_baseline(tmp_path):
+    """Test that an unreadable baseline exits with status 2."""
+    (tmp_path / "base").write_text("nope\n")
+
+    result = runner.invoke(app, ["check", str(tmp_path), "--baseline", str(tmp_path / "base")])
+
+    assert result.exit_code == 2
+    assert "not a vibe-sweeper baseline" in result.output
+
+
+def test_check_command_reports_metrics(tmp_path):
+    """Test that reports include per-language and per-directory metrics."""
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "a.py").write_text("# As an AI language model\nx = 1\n")
+    (tmp_path / "b.js").write_text("// note\nlet y = 2;\nlet z = 3;\nlet w = 4;\n")
+
+    result = runner.invoke(app, ["check", str(tmp_path), "-f", "json"])
+    metrics = json.loads(result.stdout)["metrics"]
+    assert metrics["totals"]["lines"] == 6
+    assert metrics["totals"]["comment_lines"] == 2
+    assert metrics["languages"]["python"]["findings_per_kloc"] == 500.0
+    assert metrics["directories"]["pkg"]["files"] == 1
+
+    result = runner.invoke(app, ["check", str(tmp_path)])
+    assert "## Metrics" in result.stdout
+    assert "| python | 1 | 2 | 50.0% | 1 | 500.00 |" in result.stdout
+
+
+def test_check_command_fail_fast(tmp_path):
+    """Test that --fail-fast stops at the first finding and prints a summary."""
+    for i in range(20):
+        (tmp_path / f"mod_{i:02d}.py").write_text(f"# As an AI language model, {i}\n")
+
+    result = runner.invoke(app, ["check", str(tmp_path), "--fail-fast", "--jobs", "1", "--no-cache"])
+
+    assert result.exit_code == 1
+    assert "Issues detected" not in result.stdout
+    assert result.stdout.count("AI phrase") == 1
+    assert "Stopped after 1 issue(s) in 1 of 20 files." in result.stdout
+
+
+def test_check_command_max_findings(tmp_path):
+    """Test that --max-findings reports every finding when there are fewer."""
+    (tmp_path / "a.py").write_text("# As an AI language model\n# In this code snippet\n")
+    (tmp_path / "b.py").write_text("x = 1\n")
+
+    result = runner.invoke(app, ["check", str(tmp_path), "--max-findings", "2", "--no-cache"])
+    assert result.exit_code == 1
+    assert "Stopped after 2 issue(s) in 1 of 2 files." in result.stdout
+
+    result = runner.invoke(app, ["check", str(tmp_path), "--max-findings", "5", "--no-cache"])
+    assert result.exit_code == 1
+    assert "Found 2 issue(s) in 2 files." in result.stdout
+
+    result = runner.invoke(app, ["check", str(tmp_path), "--max-findings", "5", "-f", "json"])
+    assert result.exit_code == 2
+
+
+def test_scan_command_sarif_output_file(tmp_path):
+    """Test scan --format sarif --output writes a SARIF log."""
+    (tmp_path / "ai_code.py").write_text("# As an AI language model, I can help\n")
+    output_file = tmp_path / "report.sarif"
+
+    result = runner.invoke(app, ["scan", str(tmp_path), "-f", "sarif", "-o", str(output_file), "--no-cache"])
+
+    assert result.exit_code == 0
+    log = json.loads(output_file.read_text(encoding="utf-8"))
+    assert log["runs"][0]["results"][0]["ruleId"] == "ai_phrase"
+
+
+def test_scan_command_rejects_unknown_format(tmp_path):
+    """Test that an unsupported --format is a usage error."""
+    result = runner.invoke(app, ["scan", str(tmp_path), "--format", "xml"])
+
+    assert result.exit_code == 2
+
+
+def test_scan_command_profile_in_report(tmp_path):
+    """Test that --profile adds the stage timings to the report."""
+    (tmp_path / "ai_code.py").write_text("# As an AI language model, I can help\n")
+
+    result = runner.invoke(app, ["scan", str(tmp_path), "--profile", "--no-cache"])
+
+    assert result.exit_code == 0
+    assert "## Profile" in result.stdout
+    assert "detector: ai_phrases" in result.stdout
+
+
+def test_check_command_profile_output_file(tmp_path):
+    """Test that --profile-output writes a Chrome trace and keeps it out of the report."""
+    (tmp_path / "clean.py").write_text("x = 1\n")
+    trace = tmp_path / "trace.json"
+
+    result = runner.invoke(
+        app,
+        ["check", str(tmp_path), "-f", "json", "--profile-output", str(trace), "--profile-format", "chrome"],
+    )
+
+    assert result.exit_code == 0
+    assert "traceEvents" in json.loads(trace.read_text(encoding="utf-8"))
+
+
+def test_query_command_without_daemon(tmp_path):
+    """Test that query exits with 2 when no daemon is running."""
+    result = runner.invoke(app, ["query", str(tmp_path)])
+
+    assert result.exit_code == 2
+
+
+def test_query_command_applies_inline_suppressions(tmp_path):
+    """Test that findings suppressed with vibe: ignore are not served by the daemon."""
+    import threading
+
+    from vibe_sweeper.config import load_default_config
+    from vibe_sweeper.daemon import Daemon, PollingWatcher, ScanIndex, request
+
+    (tmp_path / "a.py").write_text("x = 1  # As an AI language model  # vibe: ignore\n")
+    (tmp_path / "b.py").write_text("y = 2  # As an AI language model\n")
+    index = ScanIndex(tmp_path, load_default_config(), jobs=1)
+    index.refresh()
+    sock = tmp_path / "d.sock"
+    daemon = Daemon(index, sock, PollingWatcher(interval=0.05))
+    daemon.start()
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    try:
+        suppressed = runner.invoke(app, ["query", str(tmp_path), "--socket", str(sock), "--file", str(tmp_path / "a.py")])
+        kept = runner.invoke(app, ["query", str(tmp_path), "--socket", str(sock)])
+    finally:
+        request(sock, {"cmd": "shutdown"})
+        thread.join(timeout=5)
+
+    assert suppressed.exit_code == 0
+    assert kept.exit_code == 1
+    assert "b.py" in kept.output and "a.py" not in kept.output
@@ -3,7 +3,16 @@ from pathlib import Path
 import pytest
 import yaml
 
-from vibe_sweeper.config import load_default_config, load_config_from_path
+from vibe_sweeper.config import (
+    CompiledConfig,
+    ConfigError,
+    ConfigIndex,
+    deep_merge,
+    load_config,
+    load_config_from_path,
+    load_default_config,
+    parse_override,
+)
 
 
 def test_load_default_config():
@@ -86,3 +95,196 @@ def test_load_config_from_path_empty_file(tmp_path):
     assert "ai_phrases" in config
     assert "max_comment_block_lines" in config
 
+
+
+def test_load_default_config_uses_precompiled_copy(tmp_path, monkeypatch):
+    """Test that the parsed defaults are cached and match the YAML."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    from vibe_sweeper.config import DEFAULT_RULES
+
+    first = load_default_config()
+    cached = list((tmp_path / "vibe-sweeper").glob("default_rules-*.marshal"))
+    second = load_default_config()
+
+    assert len(cached) == 1
+    assert first == second == yaml.safe_load(DEFAULT_RULES.read_text(encoding="utf-8"))
+    second["ai_phrases"].append("x")
+    assert "x" not in load_default_config()["ai_phrases"]
+
+
+def test_load_default_config_ignores_corrupt_precompiled_copy(tmp_path, monkeypatch):
+    """Test that a damaged cache file falls back to parsing the YAML."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    load_default_config()
+    (cached,) = (tmp_path / "vibe-sweeper").glob("default_rules-*.marshal")
+    cached.write_bytes(b"\x00garbage")
+
+    assert "ai_phrases" in load_default_config()
+
+
+def test_deep_merge_merges_nested_sections():
+    """Test that nested mappings merge key by key and lists are replaced."""
+    base = {"detectors": {"a": True, "b": True}, "ai_phrases": ["x"], "n": 1}
+    merged = deep_merge(base, {"detectors": {"b": False}, "ai_phrases": ["y"]})
+
+    assert merged == {"detectors": {"a": True, "b": False}, "ai_phrases": ["y"], "n": 1}
+    assert base["detectors"] == {"a": True, "b": True}
+
+
+def test_load_config_from_path_deep_merges(tmp_path):
+    """Test that a partial detectors section keeps the other defaults."""
+    config_file = tmp_path / "vibe.yaml"
+    config_file.write_text("detectors:\n  long_comment_blocks: false\n")
+
+    config = load_config_from_path(config_file)
+
+    assert config["detectors"] == {"ai_phrases": True, "long_comment_blocks": False}
+
+
+def test_parse_override():
+    """Test parsing of --set flags into config layers."""
+    assert parse_override("max_comment_block_lines=30") == {"max_comment_block_lines": 30}
+    assert parse_override("detectors.ai_phrases=false") == {"detectors": {"ai_phrases": False}}
+    assert parse_override("plugin.mode=strict") == {"plugin": {"mode": "strict"}}
+    with pytest.raises(ConfigError):
+        parse_override("max_comment_block_lines")
+
+
+def test_load_config_layers_and_freezes(tmp_path):
+    """Test defaults < vibe.yaml < overrides, and that the result is read-only."""
+    config_file = tmp_path / "vibe.yaml"
+    config_file.write_text("max_comment_block_lines: 15\nformatter_timeouts:\n  ruff: 10\n")
+
+    config = load_config(config_file, [{"max_comment_block_lines": 30}])
+
+    assert isinstance(config, CompiledConfig)
+    assert config["max_comment_block_lines"] == 30
+    assert dict(config["formatter_timeouts"]) == {"ruff": 10, "biome": 300}
+    assert config.phrase_matcher.phrases == tuple(load_default_config()["ai_phrases"])
+    with pytest.raises(TypeError):
+        config["mmap"] = False
+    with pytest.raises(TypeError):
+        config["detectors"]["ai_phrases"] = False
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "max_comment_block_lines: many\n",
+        "ai_phrases: just one\n",
+        "ai_phrases:\n  - regex: '(unclosed'\n",
+        "detectors:\n  ai_phrases: maybe\n",
+        "- not a mapping\n",
+    ],
+)
+def test_load_config_rejects_invalid_values(tmp_path, text):
+    """Test that invalid values are reported with their file and key."""
+    config_file = tmp_path / "vibe.yaml"
+    config_file.write_text(text)
+
+    with pytest.raises(ConfigError, match="vibe.yaml"):
+        load_config(config_file)
+
+
+def test_load_config_compiles_phrase_rules(tmp_path, monkeypatch):
+    """Test that regex and fuzzy rules in vibe.yaml reach the cached matcher."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    config_file = tmp_path / "vibe.yaml"
+    config_file.write_text("ai_phrases:\n  - regex: 'this (function|method) does'\n  - fuzzy: \"let's dive in\"\n")
+
+    for config in (load_config(config_file), load_config(config_file)):
+        matches = list(config.phrase_matcher.iter_matches("# This method does x\n# Let's... dive in!\n"))
+        assert matches == [(1, "this (function|method) does"), (2, "let's dive in")]
+
+
+def test_load_config_warm_start_skips_parsing(tmp_path, monkeypatch):
+    """Test that a cached compiled config is reused until a layer changes."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    config_file = tmp_path / "vibe.yaml"
+    config_file.write_text("ai_phrases:\n  - 'custom phrase'\n")
+    first = load_config(config_file)
+
+    import vibe_sweeper.config as config_module
+
+    def fail(text):
+        raise AssertionError("YAML parsed on a warm start")
+
+    monkeypatch.setattr(config_module, "_parse_yaml", fail)
+    second = load_config(config_file)
+    assert second.digest == first.digest
+    assert second.phrase_matcher.phrases == ("custom phrase",)
+
+    config_file.write_text("ai_phrases:\n  - 'other phrase'\n")
+    with pytest.raises(AssertionError, match="warm start"):
+        load_config(config_file)
+
+
+def test_load_config_ignores_corrupt_compiled_copy(tmp_path, monkeypatch):
+    """Test that a damaged compiled config is rebuilt."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    load_config(None)
+    (cached,) = (tmp_path / "vibe-sweeper").glob("config-*.pickle")
+    cached.write_bytes(b"\x00garbage")
+
+    assert load_config(None)["max_comment_block_lines"] == 20
+
+
+def _index(root, text="", settings=()):
+    (root / "vibe.yaml").write_text(text)
+    index = ConfigIndex(root, load_config(root / "vibe.yaml", list(settings)), list(settings))
+    return index
+
+
+def test_config_index_nested_vibe_yaml(tmp_path):
+    """Test that a nested vibe.yaml applies to its directory and below."""
+    (tmp_path / "docs" / "api").mkdir(parents=True)
+    (tmp_path / "docs" / "vibe.yaml").write_text("max_comment_block_lines: 100\n")
+    index = _index(tmp_path, "max_comment_block_lines: 10\n")
+
+    assert index.config_for(tmp_path / "main.py")["max_comment_block_lines"] == 10
+    assert index.config_for(tmp_path / "docs" / "index.py")["max_comment_block_lines"] == 100
+    assert index.config_for(tmp_path / "docs" / "api" / "a.py")["max_comment_block_lines"] == 100
+    assert index.config_for(tmp_path / "src" / "a.py") is index.config
+    assert not index.uniform
+
+
+def test_config_index_path_sections(tmp_path):
+    """Test that overrides sections match directories, .gitignore style."""
+    index = _index(
+        tmp_path,
+        "overrides:\n"
+        "  - paths: ['vendor/', '/docs']\n"
+        "    detectors: {ai_phrases: false}\n"
+        "  - paths: ['**/generated']\n"
+        "    ai_phrases: ['generated phrase']\n",
+    )
+
+    vendored = index.config_for(tmp_path / "lib" / "vendor" / "x" / "a.py")
+    assert vendored["detectors"]["ai_phrases"] is False
+    assert vendored["detectors"]["long_comment_blocks"] is True
+    assert index.config_for(tmp_path / "docs" / "a.py")["detectors"]["ai_phrases"] is False
+    assert index.config_for(tmp_path / "lib" / "docs" / "a.py") is index.config
+    generated = index.config_for(tmp_path / "a" / "b" / "generated" / "c.py")
+    assert generated.phrase_matcher.phrases == ("generated phrase",)
+
+
+def test_config_index_settings_win(tmp_path):
+    """Test that --set layers override per-directory config."""
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "vibe.yaml").write_text("max_comment_block_lines: 100\nmmap: false\n")
+    index = _index(tmp_path, settings=[{"max_comment_block_lines": 5}])
+
+    docs = index.config_for(tmp_path / "docs" / "a.py")
+    assert docs["max_comment_block_lines"] == 5
+    assert docs["mmap"] is False
+
+
+def test_config_index_rejects_invalid_sections(tmp_path):
+    """Test that malformed overrides sections are reported."""
+    with pytest.raises(ConfigError, match="paths"):
+        _index(tmp_path, "overrides:\n  - max_comment_block_lines: 3\n")
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "vibe.yaml").write_text("max_comment_block_lines: -1\n")
+    index = _index(tmp_path)
+    with pytest.raises(ConfigError, match="docs"):
+        index.config_for(tmp_path / "docs" / "a.py")
@@ -0,0 +1,165 @@
+"""Tests for the scan daemon."""
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from vibe_sweeper.config import load_default_config
+from vibe_sweeper.daemon import (
+    Daemon,
+    DaemonError,
+    InotifyWatcher,
+    PollingWatcher,
+    ScanIndex,
+    findings_of,
+    request,
+)
+
+AI_LINE = "# As an AI language model\n"
+
+
+def _index(root: Path) -> ScanIndex:
+    index = ScanIndex(root, load_default_config(), jobs=1)
+    index.refresh()
+    return index
+
+
+def _bump_mtime(path: Path) -> None:
+    # Make the change visible even where mtime granularity is coarse.
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_index_refresh_tracks_new_changed_and_removed_files(tmp_path):
+    """Test that refresh rescans only what changed on disk."""
+    (tmp_path / "a.py").write_text("x = 1\n")
+    (tmp_path / "b.py").write_text(AI_LINE)
+    index = _index(tmp_path)
+    assert len(index) == 2
+    assert index.issue_count() == 1
+
+    (tmp_path / "a.py").write_text(AI_LINE + "x = 1\n")
+    (tmp_path / "b.py").unlink()
+    (tmp_path / "c.py").write_text("y = 2\n")
+    changed = index.refresh()
+
+    assert sorted(p.name for p in changed) == ["a.py", "b.py", "c.py"]
+    assert [r.path.name for r in index.reports()] == ["a.py", "c.py"]
+    assert index.issue_count() == 1
+    assert index.refresh() == []
+
+
+def test_index_update_rescans_only_changed_indexed_files(tmp_path):
+    """Test that update() ignores unchanged and unknown paths."""
+    a = tmp_path / "a.py"
+    a.write_text("x = 1\n")
+    (tmp_path / "b.py").write_text("y = 1\n")
+    index = _index(tmp_path)
+    generation = index.generation
+
+    a.write_text(AI_LINE)
+    _bump_mtime(a)
+
+    assert index.update([a.resolve(), (tmp_path / "b.py").resolve(), tmp_path / "new.py"]) == [a.resolve()]
+    assert index.generation == generation + 1
+    assert index.issue_count() == 1
+
+
+def test_index_reports_by_file_or_directory(tmp_path):
+    """Test prefix lookups for a file, a directory and a relative path."""
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "a.py").write_text(AI_LINE)
+    (tmp_path / "pkg2.py").write_text(AI_LINE)
+    index = _index(tmp_path)
+
+    assert [r.path.name for r in index.reports(tmp_path / "pkg" / "a.py")] == ["a.py"]
+    assert [r.path.name for r in index.reports(Path("pkg"))] == ["a.py"]
+    assert len(index.reports()) == 2
+
+
+def _serve(daemon: Daemon) -> threading.Thread:
+    daemon.start()
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    return thread
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.02)
+
+
+def test_daemon_answers_queries_and_picks_up_changes(tmp_path):
+    """Test the socket protocol end to end with the polling watcher."""
+    target = tmp_path / "a.py"
+    target.write_text("x = 1\n")
+    sock = tmp_path / "d.sock"
+    updates = []
+    daemon = Daemon(_index(tmp_path), sock, PollingWatcher(interval=0.05), on_update=updates.extend)
+    thread = _serve(daemon)
+
+    status = request(sock, {"cmd": "status"})
+    assert status["ok"] and status["files"] == 1 and status["issues"] == 0
+
+    target.write_text(AI_LINE)
+    _bump_mtime(target)
+    _wait_for(lambda: request(sock, {"cmd": "status"})["issues"] == 1)
+
+    response = request(sock, {"cmd": "findings", "path": str(target)})
+    assert [f.phrase for f in findings_of(response)] == ["as an ai language model"]
+    assert updates == [target.resolve()]
+    assert request(sock, {"cmd": "bogus"})["ok"] is False
+
+    assert request(sock, {"cmd": "shutdown"}) == {"ok": True}
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+    assert not sock.exists()
+
+
+def test_daemon_refuses_second_instance(tmp_path):
+    """Test that a live socket is not taken over, and a stale one is."""
+    sock = tmp_path / "d.sock"
+    first = Daemon(_index(tmp_path), sock, PollingWatcher())
+    thread = _serve(first)
+
+    with pytest.raises(DaemonError):
+        Daemon(_index(tmp_path), sock, PollingWatcher()).start()
+
+    request(sock, {"cmd": "shutdown"})
+    thread.join(timeout=5)
+    sock.touch()  # stale file left behind
+    second = Daemon(_index(tmp_path), sock, PollingWatcher())
+    second.start()
+    second.stop()
+    second.serve_forever()
+
+
+def test_request_without_daemon_raises(tmp_path):
+    """Test that clients get a DaemonError when nothing is listening."""
+    with pytest.raises(DaemonError):
+        request(tmp_path / "missing.sock", {"cmd": "status"})
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")
+def test_inotify_watcher_reports_modified_and_new_files(tmp_path):
+    """Test that edits are reported per file and new files ask for a walk."""
+    (tmp_path / "sub").mkdir()
+    existing = tmp_path / "sub" / "a.py"
+    existing.write_text("x = 1\n")
+    watcher = InotifyWatcher(tmp_path)
+    try:
+        existing.write_text("x = 2\n")
+        time.sleep(0.05)
+        assert watcher.read_changes() == {existing.resolve()}
+
+        (tmp_path / "sub" / "b.py").write_text("y = 1\n")
+        time.sleep(0.05)
+        assert watcher.read_changes() is None
+    finally:
+        watcher.close()
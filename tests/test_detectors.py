@@ -1,8 +1,27 @@
 """Tests for detector modules."""
+import random
 from pathlib import Path
 import pytest
 
-from vibe_sweeper.detectors import detect_ai_phrases, detect_long_comment_blocks
+from vibe_sweeper.detectors import (
+    AIPhraseLineDetector,
+    CommentBlockLineDetector,
+    LineDetector,
+    PhraseMatcher,
+    available_detectors,
+    build_detectors,
+    compile_phrases,
+    detect_ai_phrases,
+    detect_long_comment_blocks,
+    enabled_detectors,
+    register_detector,
+    unregister_detector,
+)
+from vibe_sweeper.detectors import registry
+from vibe_sweeper.detectors.ai_phrases import _regex_literals, phrase_rule
+from vibe_sweeper.detectors import lexer as lexer_module
+from vibe_sweeper.detectors.lexer import PREFIX_SYNTAX, CommentLexer, syntax_for
+from vibe_sweeper.scanner import MappedText
 
 
 class TestAIPhraseDetector:
@@ -79,6 +98,126 @@ def hello():
         assert "kind" in result
         assert result["kind"] == "ai_phrase"
 
+    def test_detect_ai_phrases_overlapping_phrases(self):
+        """Test that overlapping and nested phrases are all reported."""
+        text = "As an AI language model"
+        path = Path("test.py")
+        phrases = ["an ai language", "as an ai", "ai"]
+
+        results = detect_ai_phrases(path, text, phrases=phrases)
+
+        assert [r["phrase"] for r in results] == phrases
+
+    def test_detect_ai_phrases_reports_phrase_once_per_line(self):
+        """Test that repeated phrases on one line give a single finding."""
+        text = "custom phrase, custom phrase\nno match\ncustom phrase"
+        path = Path("test.py")
+
+        results = detect_ai_phrases(path, text, phrases=["custom phrase"])
+
+        assert [r["line"] for r in results] == [1, 3]
+
+    def test_detect_ai_phrases_line_numbers_follow_splitlines(self):
+        """Test line numbering with CRLF and form-feed line breaks."""
+        text = "first\r\nsecond\f\r\nAs an AI language model\n"
+        path = Path("test.py")
+
+        results = detect_ai_phrases(path, text)
+
+        expected = text.lower().splitlines().index("as an ai language model") + 1
+        assert [r["line"] for r in results] == [expected]
+
+    def test_detect_ai_phrases_accepts_compiled_matcher(self):
+        """Test that a prebuilt PhraseMatcher can be passed instead of a list."""
+        matcher = PhraseMatcher(["custom phrase"])
+        path = Path("test.py")
+
+        results = detect_ai_phrases(path, "A custom phrase here", phrases=matcher)
+
+        assert len(results) == 1
+        assert results[0]["phrase"] == "custom phrase"
+
+    def test_compile_phrases_is_cached(self):
+        """Test that compiling the same phrase list reuses the matcher."""
+        phrases = ["alpha beta", "gamma"]
+
+        assert compile_phrases(phrases) is compile_phrases(list(phrases))
+        assert compile_phrases(None).phrases == compile_phrases(None).phrases
+
+    def test_detect_ai_phrases_matches_naive_scan(self):
+        """Test the compiled matcher against a straightforward nested loop."""
+        phrases = ["ab", "b c", "abc", "c", "ab"]
+        text = "ABC\nb c ab\n\nxyz\rab c"
+        path = Path("test.py")
+
+        expected = [
+            (idx, phrase)
+            for idx, line in enumerate(text.lower().splitlines(), start=1)
+            for phrase in phrases
+            if phrase in line
+        ]
+        results = detect_ai_phrases(path, text, phrases=phrases)
+
+        assert [(r["line"], r["phrase"]) for r in results] == expected
+
+    def test_regex_and_fuzzy_rules(self):
+        """Test regex and fuzzy rules next to plain phrases."""
+        rules = [
+            "as an ai language model",
+            {"regex": "this (function|method) is responsible for"},
+            {"fuzzy": "I'm sorry, but"},
+            {"regex": r"^\s*todo\b"},
+        ]
+        text = "# This METHOD is responsible for x\n# i'm  sorry -- but\nfoo todo\n  TODO: y\nAs an AI language model\n"
+
+        results = detect_ai_phrases(Path("test.py"), text, phrases=rules)
+
+        assert [(r["line"], r["phrase"]) for r in results] == [
+            (1, "this (function|method) is responsible for"),
+            (2, "I'm sorry, but"),
+            (4, r"^\s*todo\b"),
+            (5, "as an ai language model"),
+        ]
+
+    @pytest.mark.parametrize(
+        "pattern, literals",
+        [
+            ("this (function|method) is responsible for", {" is responsible for"}),
+            ("(?:utilize|leverage)s? this", {"utilize", "leverage"}),
+            (r"a(bc)+d", {"bc"}),
+            (r"\d+", None),
+        ],
+    )
+    def test_regex_rule_literals(self, pattern, literals):
+        """Test the literals used to prefilter lines for a regex rule."""
+        assert _regex_literals(pattern) == (frozenset(literals) if literals else None)
+
+    def test_regex_rule_without_literal(self):
+        """Test that a regex without a required literal is still found on every line."""
+        text = "a 555\nfoo\n\n1\r\nbar 12\n"
+        rules = ["foo", {"regex": r"\d\d+"}]
+        matcher = compile_phrases(rules)
+
+        results = detect_ai_phrases(Path("test.py"), text, phrases=matcher)
+
+        assert not matcher.bytes_searchable
+        assert [(r["line"], r["phrase"]) for r in results] == [(1, r"\d\d+"), (2, "foo"), (5, r"\d\d+")]
+
+    @pytest.mark.parametrize("entry", [{"regex": "("}, {"fuzzy": "--"}, {"glob": "x"}, {"regex": "a", "fuzzy": "b"}, 3])
+    def test_invalid_phrase_rules(self, entry):
+        """Test that malformed rules are rejected."""
+        with pytest.raises(ValueError):
+            phrase_rule(entry)
+
+    def test_byte_path_matches_text_path_with_rules(self):
+        """Test that rules give the same findings from bytes, non-ASCII lines included."""
+        rules = ["ai model", {"regex": r"caf\w+ leverag(e|ing)"}, {"fuzzy": "delve into"}]
+        text = "café leveraging x\ncafe leverage\n# DELVE   into it\nan AI model\n" * 50
+        path = Path("test.py")
+        detector = AIPhraseLineDetector(path, rules)
+
+        assert detector.scan_bytes(MappedText(text.encode("utf-8"))) == detect_ai_phrases(path, text, rules)
+
 
 class TestLongCommentBlockDetector:
     """Tests for long comment block detection."""
@@ -170,3 +309,267 @@ def foo():
         # Should not include line 6 or beyond
         assert "# comment line 6" not in preview
 
+    def test_python_docstrings_and_strings_are_not_comments(self):
+        """Test that comment syntax inside docstrings and strings is ignored."""
+        text = 'def f(*args):\n    """Usage:\n' + "    * item\n    # heading\n" * 15 + '    """\n'
+        text += 'URL = "http://x"  # trailing\n' * 25
+
+        assert detect_long_comment_blocks(Path("a.py"), text, max_lines=5) == []
+
+    def test_block_comment_interior_lines_count(self):
+        """Test that every line of a /* */ comment counts, with or without a leading *."""
+        text = "x = 1;\n/*\n" + "  plain line\n" * 10 + "*/\ny = 2;\n"
+
+        (result,) = detect_long_comment_blocks(Path("a.ts"), text, max_lines=5)
+
+        assert (result["start_line"], result["end_line"]) == (2, 13)
+        assert result["preview"].splitlines()[0] == "/*"
+
+    def test_html_comments(self):
+        """Test that HTML comments are found and apostrophes in text are harmless."""
+        text = "<p>Don't</p>\n<!--\n" + "note\n" * 10 + "--> <p>x</p>\n"
+
+        (result,) = detect_long_comment_blocks(Path("a.html"), text, max_lines=5)
+
+        assert (result["start_line"], result["end_line"]) == (2, 13)
+
+    def test_comment_marker_inside_strings(self):
+        """Test that // inside JavaScript strings does not start a comment."""
+        text = 'const a = "//";\n' * 30 + "`\n// inside a template\n`;\n" * 10
+
+        assert detect_long_comment_blocks(Path("a.js"), text, max_lines=5) == []
+
+    def test_quotes_in_strings_and_comments_do_not_open_strings(self):
+        """Test that triple quotes inside a string or a comment do not start a docstring."""
+        text = "q = \"'''\"  # and '''\n# see \"\"\" below\n" + "# note\n" * 10
+
+        (result,) = detect_long_comment_blocks(Path("a.py"), text, max_lines=5)
+
+        assert (result["start_line"], result["end_line"]) == (2, 12)
+
+    def test_unknown_language_uses_prefixes(self):
+        """Test that files without a lexer fall back to comment prefixes."""
+        text = "* note\n" * 25
+
+        assert len(detect_long_comment_blocks(Path("notes.txt"), text, max_lines=20)) == 1
+
+    def test_comment_lexer_runs(self):
+        """Test the runs reported for leading, trailing and block comments."""
+        lexer = CommentLexer(syntax_for(Path("a.js")))
+        chunk = "a(); // x\n// y\n  /* z\n w */ b();\n"
+
+        assert list(lexer.runs(chunk)) == [(10, 14, 1), (15, 32, 2)]
+
+    def test_comment_lexer_min_lines(self):
+        """Test that min_lines drops only short runs that nothing can extend, but counts them."""
+        lexer = CommentLexer(syntax_for(Path("a.js")))
+        chunk = "// a\nb();\n// c\nd();\n// e\n// f\n// g\nh();\n// i\n"
+
+        assert list(lexer.runs(chunk, 3)) == [(0, 4, 1), (20, 34, 3), (40, 44, 1)]
+        assert lexer.comment_lines == 6
+
+    @pytest.mark.parametrize("suffix", [".py", ".js", ".css", ".html", ".txt"])
+    def test_numpy_and_regex_classifiers_agree(self, monkeypatch, suffix):
+        """Test that bulk classification with NumPy finds the same runs as the regex."""
+        pytest.importorskip("numpy")
+        syntax = syntax_for(Path("a" + suffix))
+        parts = ["# c", "  // c", "\t* c", "x = 1", "", "/* a", "b */", '"""', "'#'", "\u3000# c", "\x1c# c", "\u00e9 # c"]
+        rnd = random.Random(suffix)
+        chunks = ["\n".join(rnd.choice(parts) for _ in range(400)) + "\n" for _ in range(3)]
+
+        def runs(numpy_min_chars, chunks, min_lines):
+            monkeypatch.setattr(lexer_module, "NUMPY_MIN_CHARS", numpy_min_chars)
+            lexer = CommentLexer(syntax)
+            return [list(lexer.runs(chunk, min_lines)) for chunk in chunks], lexer.comment_lines
+
+        for chunked in (chunks, [chunk.encode("utf-8") for chunk in chunks]):
+            found, total = runs(0, chunked, 1)
+            assert total == sum(count for chunk_runs in found for _, _, count in chunk_runs)
+            for min_lines in (1, 3):
+                assert runs(0, chunked, min_lines) == runs(1 << 30, chunked, min_lines)
+                assert runs(0, chunked, min_lines)[1] == total
+
+    def test_regex_classifier_without_numpy(self, monkeypatch):
+        """Test the pure-Python fallback when NumPy is not installed."""
+        monkeypatch.setattr(lexer_module, "_numpy", False)
+        monkeypatch.setattr(lexer_module, "NUMPY_MIN_CHARS", 0)
+        text = "x = 1\n" + "# note\n" * 25 + "y = 2\n# short\n"
+
+        (result,) = CommentBlockLineDetector(Path("a.py")).scan_bytes(MappedText(text.encode("ascii")))
+
+        assert (result["start_line"], result["end_line"]) == (2, 26)
+        assert list(CommentLexer(PREFIX_SYNTAX).runs(text, 2)) == [(6, 180, 25), (187, 194, 1)]
+
+    def test_unterminated_block_comment_at_end_of_file(self):
+        """Test that the byte and text paths agree on a comment left open at EOF."""
+        text = "x = 1;\n/*\n" + "note\n" * 5
+        path = Path("a.js")
+
+        mapped = CommentBlockLineDetector(path, max_lines=3).scan_bytes(MappedText(text.encode("ascii")))
+
+        assert mapped == detect_long_comment_blocks(path, text, max_lines=3)
+        assert (mapped[0]["start_line"], mapped[0]["end_line"]) == (2, 7)
+
+    def test_byte_path_carries_state_across_windows(self):
+        """Test that a block comment crossing a byte window boundary is one block."""
+        text = "x = 1;\n/*\n" + "filler line of a long comment\n" * 12000 + "*/\n"
+        path = Path("big.js")
+
+        mapped = CommentBlockLineDetector(path).scan_bytes(MappedText(text.encode("ascii")))
+
+        assert mapped == detect_long_comment_blocks(path, text)
+        assert (mapped[0]["start_line"], mapped[0]["end_line"]) == (2, 12003)
+
+
+def _feed_in_batches(detector, lines, size):
+    for start in range(0, len(lines), size):
+        detector.feed(start + 1, lines[start : start + size])
+    return detector.finish()
+
+
+class TestLineDetectors:
+    """Tests for the streaming (line batch) detector protocol."""
+
+    def test_ai_phrase_line_detector_matches_whole_text(self):
+        """Test that batch boundaries do not change AI phrase findings."""
+        lines = ["x = 1", "# As an AI language model", "y = 2"] * 10
+        path = Path("test.py")
+        expected = detect_ai_phrases(path, "\n".join(lines))
+
+        for size in (1, 4, 100):
+            results = _feed_in_batches(AIPhraseLineDetector(path), lines, size)
+            assert results == expected
+
+    def test_comment_block_line_detector_spans_batches(self):
+        """Test that a comment block split across batches is reported once."""
+        lines = ["code()"] + ["# comment {}".format(i) for i in range(30)] + ["code()"]
+        path = Path("test.py")
+        expected = detect_long_comment_blocks(path, "\n".join(lines), max_lines=20)
+
+        for size in (1, 3, 17, 100):
+            results = _feed_in_batches(CommentBlockLineDetector(path, max_lines=20), lines, size)
+            assert results == expected
+        assert expected[0]["start_line"] == 2
+        assert expected[0]["end_line"] == 31
+
+    def test_comment_block_line_detector_block_at_end_of_file(self):
+        """Test that a block running to the end of the file is flushed by finish()."""
+        detector = CommentBlockLineDetector(Path("test.py"), max_lines=2)
+        detector.feed(1, ["x = 1", "# a", "# b"])
+        detector.feed(4, ["# c"])
+
+        results = detector.finish()
+
+        assert len(results) == 1
+        assert (results[0]["start_line"], results[0]["end_line"]) == (2, 4)
+
+    @pytest.mark.parametrize(
+        "name, lines",
+        [
+            ("a.py", ["x = '''", "# a", "'''"] * 5 + ["# c"] * 8 + ["s = 'a\\", "# b'"] + ["# d"] * 7),
+            ("a.js", ["/* a", " b", " c */ x();"] * 4 + ["// d"] * 6 + ["`", "// t", "`"]),
+        ],
+    )
+    def test_comment_block_line_detector_carries_tokens_across_batches(self, name, lines):
+        """Test that strings and comments left open at a batch boundary carry over."""
+        path = Path(name)
+        expected = detect_long_comment_blocks(path, "\n".join(lines), max_lines=3)
+
+        assert expected
+        for size in (1, 2, 5):
+            assert _feed_in_batches(CommentBlockLineDetector(path, max_lines=3), lines, size) == expected
+
+
+class TodoDetector(LineDetector):
+    """Example streaming plugin used by the registry tests."""
+
+    def __init__(self, path):
+        self.file = str(path)
+        self.results = []
+
+    def feed(self, first_line, lines):
+        for idx, line in enumerate(lines, start=first_line):
+            if "TODO" in line:
+                self.results.append({"file": self.file, "line": idx, "kind": "todo"})
+
+    def finish(self):
+        return self.results
+
+
+class TestDetectorRegistry:
+    """Tests for the detector registry and plugin loading."""
+
+    @pytest.fixture(autouse=True)
+    def restore_registry(self, monkeypatch):
+        monkeypatch.setattr(registry, "_registry", dict(registry._registry))
+        monkeypatch.setattr(registry, "_entry_points_loaded", True)
+
+    def test_builtin_detectors_registered(self):
+        """Test that the built-in detectors are available by name."""
+        names = available_detectors()
+
+        assert "ai_phrases" in names
+        assert "long_comment_blocks" in names
+
+    def test_detectors_can_be_disabled_in_config(self):
+        """Test per-detector toggles from the detectors config section."""
+        cfg = {"detectors": {"ai_phrases": False}}
+
+        assert "ai_phrases" not in enabled_detectors(cfg)
+        assert "long_comment_blocks" in enabled_detectors(cfg)
+        assert all(not isinstance(d, AIPhraseLineDetector) for d in build_detectors(Path("a.py"), cfg))
+
+    def test_register_line_detector_class(self):
+        """Test registering a LineDetector subclass with the decorator form."""
+        register_detector("todo")(TodoDetector)
+
+        detectors = build_detectors(Path("a.py"), {})
+        todo = [d for d in detectors if isinstance(d, TodoDetector)][0]
+        todo.feed(1, ["x = 1", "# TODO: fix"])
+
+        assert todo.finish() == [{"file": "a.py", "line": 2, "kind": "todo"}]
+
+    def test_register_text_function(self):
+        """Test that (path, text, config) functions keep working as detectors."""
+        calls = []
+
+        def detect_shouting(path, text, config):
+            calls.append(text)
+            return [{"file": str(path), "line": 1, "kind": "shouting"}] if text.isupper() else []
+
+        register_detector("shouting", detect_shouting)
+        detectors = [d for d in build_detectors(Path("a.py"), {}) if isinstance(d, registry.TextDetector)]
+        detectors[0].feed(1, ["HELLO"])
+        detectors[0].feed(2, ["WORLD"])
+
+        assert detectors[0].finish() == [{"file": "a.py", "line": 1, "kind": "shouting"}]
+        assert calls == ["HELLO\nWORLD"]
+
+    def test_unregister_detector(self):
+        """Test removing a detector."""
+        unregister_detector("long_comment_blocks")
+
+        assert "long_comment_blocks" not in available_detectors()
+
+    def test_entry_point_plugins_are_loaded(self, monkeypatch):
+        """Test loading detectors from the vibe_sweeper.detectors entry point group."""
+
+        class FakeEntryPoint:
+            def __init__(self, name, obj):
+                self.name = name
+                self.obj = obj
+
+            def load(self):
+                if isinstance(self.obj, Exception):
+                    raise self.obj
+                return self.obj
+
+        plugins = [FakeEntryPoint("todo", TodoDetector), FakeEntryPoint("broken", ImportError("boom"))]
+        monkeypatch.setattr(registry, "_iter_entry_points", lambda: plugins)
+        monkeypatch.setattr(registry, "_entry_points_loaded", False)
+
+        with pytest.warns(UserWarning, match="broken"):
+            names = available_detectors()
+
+        assert "todo" in names
+        assert "broken" not in names
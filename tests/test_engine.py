@@ -0,0 +1,221 @@
+"""Tests for the file analysis engine."""
+import tracemalloc
+from pathlib import Path
+import pytest
+
+from vibe_sweeper.config import ConfigIndex, load_config, load_default_config
+from vibe_sweeper.engine import analyze_file, collect_findings, default_jobs, iter_file_reports
+
+
+def _make_files(root: Path, count: int):
+    files = []
+    for i in range(count):
+        path = root / f"mod_{i:03d}.py"
+        body = "# comment\n" * (i % 4) * 8
+        if i % 3 == 0:
+            body += f"# As an AI language model, file {i}\n"
+        path.write_text(body + "x = 1\n")
+        files.append(path)
+    return files
+
+
+def test_analyze_file_runs_all_detectors(tmp_path):
+    """Test that analyze_file returns findings from every detector."""
+    path = tmp_path / "test.py"
+    path.write_text("# As an AI language model\n" + "# comment\n" * 25)
+    cfg = load_default_config()
+
+    findings = analyze_file(path, cfg)
+
+    kinds = {f["kind"] for f in findings}
+    assert kinds == {"ai_phrase", "long_comment_block"}
+
+
+def test_analyze_file_empty_file(tmp_path):
+    """Test that empty files produce no findings."""
+    path = tmp_path / "empty.py"
+    path.write_text("")
+
+    assert analyze_file(path, load_default_config()) == []
+
+
+def test_collect_findings_parallel_matches_serial(tmp_path):
+    """Test that the process pool returns the same findings in the same order."""
+    files = _make_files(tmp_path, 40)
+    cfg = load_default_config()
+
+    serial = collect_findings(files, cfg, jobs=1)
+    parallel = collect_findings(files, cfg, jobs=3, chunk_size=4)
+
+    assert serial
+    assert parallel == serial
+
+
+def test_collect_findings_preserves_file_order(tmp_path):
+    """Test that findings are ordered by the input file order."""
+    files = _make_files(tmp_path, 30)
+    cfg = load_default_config()
+
+    findings = collect_findings(list(reversed(files)), cfg, jobs=2, chunk_size=3)
+
+    order = [f["file"] for f in findings]
+    expected = [str(p) for p in reversed(files) if str(p) in order]
+    assert list(dict.fromkeys(order)) == expected
+
+
+def test_collect_findings_uses_directory_configs(tmp_path):
+    """Test that files are analysed with their directory's config, pooled or not."""
+    for name in ("src", "vendor"):
+        (tmp_path / name).mkdir()
+        for i in range(6):
+            (tmp_path / name / f"m{i}.py").write_text("# As an AI language model\n")
+    (tmp_path / "vendor" / "vibe.yaml").write_text("detectors:\n  ai_phrases: false\n")
+    files = sorted(tmp_path.glob("*/*.py"))
+    configs = ConfigIndex(tmp_path, load_config(None))
+    configs.add_files(files)
+
+    serial = collect_findings(files, configs.config, jobs=1, configs=configs)
+    parallel = collect_findings(files, configs.config, jobs=2, chunk_size=2, configs=configs)
+
+    assert {Path(f["file"]).parent.name for f in serial} == {"src"}
+    assert len(serial) == 6
+    assert parallel == serial
+
+
+def test_default_jobs_is_positive():
+    """Test that the default worker count is at least one."""
+    assert default_jobs() >= 1
+
+
+def test_analyze_file_latin1_fallback(tmp_path):
+    """Test that non-UTF-8 files are decoded as latin-1 and still scanned."""
+    path = tmp_path / "legacy.py"
+    path.write_bytes(b"# caf\xe9\n# As an AI language model\n")
+
+    findings = analyze_file(path, load_default_config())
+
+    assert [(f["line"], f["phrase"]) for f in findings] == [(2, "as an ai language model")]
+
+
+def test_analyze_file_memory_independent_of_size(tmp_path):
+    """Test that scanning a large file does not hold it in memory."""
+    path = tmp_path / "bundle.js"
+    line = "var value = compute(alpha, beta, gamma); // trailing note\n"
+    path.write_text(line * 200_000)
+    cfg = load_default_config()
+    analyze_file(path, cfg)
+
+    tracemalloc.start()
+    try:
+        findings = analyze_file(path, cfg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert findings == []
+    assert path.stat().st_size > 10_000_000
+    assert peak < 2_000_000
+
+
+def test_analyze_file_respects_disabled_detectors(tmp_path):
+    """Test that detectors disabled in the config do not run."""
+    path = tmp_path / "test.py"
+    path.write_text("# As an AI language model\n" + "# comment\n" * 25)
+    cfg = dict(load_default_config(), detectors={"long_comment_blocks": False})
+
+    findings = analyze_file(path, cfg)
+
+    assert {f["kind"] for f in findings} == {"ai_phrase"}
+
+
+def test_iter_file_reports_records_skipped_files(tmp_path):
+    """Test that binary files are reported as skipped instead of scanned."""
+    source = tmp_path / "a.py"
+    source.write_text("# As an AI language model\n")
+    blob = tmp_path / "b.js"
+    blob.write_bytes(b"as an ai language model\0")
+
+    reports = list(iter_file_reports([source, blob], load_default_config(), jobs=1))
+
+    assert [r.path for r in reports] == [source, blob]
+    assert reports[0].skipped is None and len(reports[0].findings) == 1
+    assert reports[1].skipped == "binary" and reports[1].findings == []
+
+
+def test_iter_file_reports_counts_lines(tmp_path):
+    """Test that reports count lines and comment lines, with or without the comment detector."""
+    path = tmp_path / "a.py"
+    path.write_text('x = 1  # trailing\n"""\n# in a docstring\n"""\n# one\n\n  # two\ny = 2')
+    cfg = load_default_config()
+
+    for detectors in ({}, {"long_comment_blocks": False}):
+        (report,) = iter_file_reports([path], dict(cfg, detectors=detectors), jobs=1)
+        assert (report.lines, report.comment_lines) == (8, 2)
+
+
+def test_iter_file_reports_parallel_can_stop_early(tmp_path):
+    """Test that closing the report stream early returns promptly."""
+    files = _make_files(tmp_path, 40)
+    reports = iter_file_reports(files, load_default_config(), jobs=2, chunk_size=2)
+
+    first = next(reports)
+    reports.close()
+
+    assert first.path == files[0]
+
+
+def test_iter_file_reports_serial_scans_lazily(tmp_path, monkeypatch):
+    """Test that a serial scan only analyses the files whose reports were read."""
+    import vibe_sweeper.engine as engine
+
+    files = _make_files(tmp_path, 10)
+    scanned = []
+    scan_file = engine._scan_file
+    monkeypatch.setattr(engine, "_scan_file", lambda path, *args: scanned.append(path) or scan_file(path, *args))
+
+    reports = iter_file_reports(files, load_default_config(), jobs=1)
+    next(reports)
+    next(reports)
+    reports.close()
+
+    assert scanned == files[:2]
+
+
+def test_scan_chunk_stops_when_cancelled(tmp_path):
+    """Test that a worker chunk returns what it has once the scan is cancelled."""
+    import threading
+
+    from vibe_sweeper.engine import _scan_chunk
+
+    files = _make_files(tmp_path, 4)
+    cancel = threading.Event()
+    assert len(_scan_chunk(files, load_default_config(), False, cancel=cancel)) == 4
+    cancel.set()
+    assert _scan_chunk(files, load_default_config(), False, cancel=cancel) == []
+
+
+@pytest.mark.parametrize(
+    "name, content",
+    [
+        ("a.py", "# As an AI language model\n" + "# note\n" * 25 + "x = 1"),
+        ("a.py", "x = 1\r\n# In this code snippet\r\n"),
+        ("a.js", "caf\u00e9 = 1\n" + "// \u00e9t\u00e9\n" * 30),
+        ("a.py", "\u00a0# I'm sorry, but\n" * 30),
+        ("a.css", "a {}\n/* start\n" + "   note\n" * 30 + "*/ b {}\n"),
+        ("a.py", 'x = """\n' + "# not a comment\n" * 30 + '"""\n' + "# real\n" * 25),
+    ],
+)
+def test_byte_path_matches_text_path(tmp_path, name, content):
+    """Test that the mmap byte path and the text path report the same findings."""
+    path = tmp_path / name
+    path.write_text(content, encoding="utf-8")
+    cfg = load_default_config()
+
+    mapped = analyze_file(path, dict(cfg, mmap=True))
+
+    assert mapped == analyze_file(path, dict(cfg, mmap=False))
+    assert mapped
+    (mapped_report,) = iter_file_reports([path], dict(cfg, mmap=True), jobs=1)
+    (text_report,) = iter_file_reports([path], dict(cfg, mmap=False), jobs=1)
+    assert mapped_report.lines == text_report.lines == len(content.splitlines())
+    assert mapped_report.comment_lines == text_report.comment_lines > 0
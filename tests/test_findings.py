@@ -0,0 +1,69 @@
+"""Tests for the Finding model."""
+import pickle
+import pytest
+
+from vibe_sweeper.findings import AI_PHRASE, LONG_COMMENT_BLOCK, Finding
+
+
+def test_finding_dict_view_for_single_line():
+    """Test that a single-line finding reads like the old finding dict."""
+    finding = Finding("a.py", AI_PHRASE, 3, phrase="as an ai language model")
+
+    assert finding == {"file": "a.py", "line": 3, "phrase": "as an ai language model", "kind": "ai_phrase"}
+    assert finding["line"] == 3
+    assert finding.get("start_line") is None
+    assert "preview" not in finding
+
+
+def test_finding_dict_view_for_line_range():
+    """Test that a block finding exposes start_line/end_line, not line."""
+    finding = Finding("a.py", LONG_COMMENT_BLOCK, 4, end_line=30, lines=27, preview="# x")
+
+    assert dict(finding) == {
+        "file": "a.py",
+        "start_line": 4,
+        "end_line": 30,
+        "lines": 27,
+        "preview": "# x",
+        "kind": "long_comment_block",
+    }
+    assert "line" not in finding
+    with pytest.raises(KeyError):
+        finding["line"]
+
+
+def test_finding_round_trips_through_dict():
+    """Test that from_dict(as_dict()) is lossless, extra keys included."""
+    data = {"file": "a.py", "line": 7, "kind": "todo", "severity": "low"}
+
+    finding = Finding.from_dict(data)
+
+    assert finding.extra == {"severity": "low"}
+    assert finding["severity"] == "low"
+    assert finding.as_dict() == data
+    assert Finding.from_dict(finding.as_dict()) == finding
+
+
+def test_finding_interns_file_and_kind():
+    """Test that equal file paths and kinds share one string object."""
+    first = Finding("".join(["src/", "a.py"]), "".join(["ai_", "phrase"]), 1)
+    second = Finding("".join(["src/", "a.py"]), "ai_phrase", 2)
+
+    assert first.file is second.file
+    assert first.kind is AI_PHRASE
+
+
+def test_finding_is_compact_and_picklable():
+    """Test that findings have no per-instance dict and survive pickling."""
+    finding = Finding("a.py", AI_PHRASE, 3, phrase="p")
+
+    assert not hasattr(finding, "__dict__")
+    assert pickle.loads(pickle.dumps(finding)) == finding
+
+
+def test_finding_coerce():
+    """Test that coerce passes findings through and converts dicts."""
+    finding = Finding("a.py", AI_PHRASE, 3)
+
+    assert Finding.coerce(finding) is finding
+    assert isinstance(Finding.coerce({"file": "a.py", "line": 1, "kind": "x"}), Finding)
@@ -0,0 +1,133 @@
+"""Tests for running external formatters."""
+import os
+import stat
+import sys
+from pathlib import Path
+import pytest
+
+from vibe_sweeper.refactors import run_formatters
+from vibe_sweeper.refactors.formatters import _argv_batches
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="stub formatters are shell scripts")
+
+
+def _stub(bin_dir: Path, name: str, body: str):
+    path = bin_dir / name
+    path.write_text("#!/bin/sh\n" + body)
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+
+
+@pytest.fixture
+def bin_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "bin"
+    directory.mkdir()
+    monkeypatch.setenv("PATH", f"{directory}{os.pathsep}{os.environ['PATH']}")
+    return directory
+
+
+def _files(root: Path, names):
+    paths = []
+    for name in names:
+        path = root / name
+        path.write_text("x = 1\n")
+        paths.append(path)
+    return paths
+
+
+def test_formatters_receive_only_the_given_files(tmp_path, bin_dir):
+    """Test that each formatter is called with its own files as arguments."""
+    log = tmp_path / "calls.log"
+    for name in ("ruff", "biome"):
+        _stub(bin_dir, name, f'echo "{name} $*" >> "{log}"\n')
+    py, js = _files(tmp_path, ["a.py", "b.js"])
+
+    results = run_formatters(tmp_path, {"python": [py], "javascript": [js]})
+
+    assert results["ruff"]["returncode"] == 0
+    assert results["biome"]["returncode"] == 0
+    assert sorted(log.read_text().splitlines()) == ["biome check --apply b.js", "ruff check --fix a.py"]
+
+
+def test_formatters_run_concurrently(tmp_path, bin_dir):
+    """Test that ruff and biome run at the same time.
+
+    Each stub waits for the other one to start, which only succeeds when
+    both run concurrently.
+    """
+    for name, other in (("ruff", "biome"), ("biome", "ruff")):
+        _stub(
+            bin_dir,
+            name,
+            f'touch "{tmp_path}/{name}.started"\n'
+            f"for i in $(seq 50); do\n"
+            f'  [ -e "{tmp_path}/{other}.started" ] && exit 0\n'
+            f"  sleep 0.1\n"
+            f"done\n"
+            f"exit 3\n",
+        )
+    py, js = _files(tmp_path, ["a.py", "b.js"])
+
+    results = run_formatters(tmp_path, {"python": [py], "javascript": [js]})
+
+    assert results["ruff"]["returncode"] == 0
+    assert results["biome"]["returncode"] == 0
+
+
+def test_formatters_batch_arguments(tmp_path, bin_dir):
+    """Test that long file lists are split across invocations."""
+    log = tmp_path / "calls.log"
+    _stub(bin_dir, "ruff", f'echo "$*" >> "{log}"\n')
+    files = _files(tmp_path, [f"m{i}.py" for i in range(5)])
+
+    results = run_formatters(tmp_path, {"python": files}, batch_files=2)
+
+    assert results["ruff"]["batches"] == 3
+    calls = log.read_text().splitlines()
+    assert [len(call.split()) - 2 for call in calls] == [2, 2, 1]
+
+
+def test_formatters_capture_output_and_stream_it(tmp_path, bin_dir):
+    """Test that stdout and stderr are captured and passed to the callback."""
+    _stub(bin_dir, "ruff", "echo fixed\necho warning >&2\nexit 1\n")
+    chunks = []
+
+    results = run_formatters(
+        tmp_path, {"python": _files(tmp_path, ["a.py"])}, on_output=lambda name, text: chunks.append((name, text))
+    )
+
+    assert results["ruff"]["returncode"] == 1
+    assert results["ruff"]["stdout"] == "fixed\n"
+    assert results["ruff"]["stderr"] == "warning\n"
+    assert sorted(chunks) == [("ruff", "fixed\n"), ("ruff", "warning\n")]
+
+
+def test_formatters_timeout(tmp_path, bin_dir):
+    """Test that a formatter exceeding its timeout is killed."""
+    _stub(bin_dir, "ruff", "exec sleep 30\n")
+    _stub(bin_dir, "biome", "exit 0\n")
+    files = {"python": _files(tmp_path, ["a.py"]), "css": _files(tmp_path, ["a.css"])}
+
+    results = run_formatters(tmp_path, files, timeout={"ruff": 0.5})
+
+    assert results["ruff"]["returncode"] == -1
+    assert results["ruff"]["timed_out"] is True
+    assert "timed out" in results["ruff"]["stderr"]
+    assert results["biome"]["returncode"] == 0
+
+
+def test_formatters_missing_executable(tmp_path, monkeypatch):
+    """Test that a formatter that is not installed is reported, not raised."""
+    monkeypatch.setenv("PATH", str(tmp_path / "empty"))
+
+    results = run_formatters(tmp_path, {"python": _files(tmp_path, ["a.py"])})
+
+    assert results["ruff"]["returncode"] == -1
+    assert results["ruff"]["stderr"] == "command not found"
+    assert "biome" not in results
+
+
+def test_argv_batches_respects_character_limit():
+    """Test that batches stay under the command line length limit."""
+    batches = list(_argv_batches(["a" * 10] * 5, max_files=100, max_chars=25))
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
@@ -0,0 +1,126 @@
+"""Tests for git-aware changed-file discovery."""
+import shutil
+import subprocess
+from pathlib import Path
+import pytest
+
+from vibe_sweeper.gitdiff import (
+    GitError,
+    changed_files,
+    changed_lines,
+    filter_changed_lines,
+)
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+
+def _git(repo: Path, *args: str):
+    subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        cwd=repo,
+        check=True,
+        capture_output=True,
+    )
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """A git repository with one committed Python file on branch main."""
+    _git(tmp_path, "init", "-q", "-b", "main")
+    (tmp_path / "base.py").write_text("x = 1\n")
+    (tmp_path / "notes.txt").write_text("ignored extension\n")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "initial")
+    return tmp_path
+
+
+def test_changed_files_since_ref(repo):
+    """Test that committed, modified and untracked files are all found."""
+    _git(repo, "checkout", "-q", "-b", "feature")
+    (repo / "committed.py").write_text("y = 2\n")
+    _git(repo, "add", "committed.py")
+    _git(repo, "commit", "-q", "-m", "feature work")
+    (repo / "base.py").write_text("x = 2\n")
+    (repo / "untracked.js").write_text("let z = 3;\n")
+    (repo / "notes.txt").write_text("changed but unsupported\n")
+
+    files = changed_files(repo, since="main")
+
+    assert sorted(f.name for f in files) == ["base.py", "committed.py", "untracked.js"]
+    assert all(f.is_absolute() for f in files)
+
+
+def test_changed_files_staged_only(repo):
+    """Test that --staged lists only files in the index."""
+    (repo / "staged.py").write_text("a = 1\n")
+    (repo / "unstaged.py").write_text("b = 1\n")
+    _git(repo, "add", "staged.py")
+
+    files = changed_files(repo, staged=True)
+
+    assert [f.name for f in files] == ["staged.py"]
+
+
+def test_changed_files_skips_deleted_and_ignored_dirs(repo):
+    """Test that deletions and files under DEFAULT_IGNORES are dropped."""
+    (repo / "node_modules").mkdir()
+    (repo / "node_modules" / "dep.js").write_text("module.exports = 1;\n")
+    _git(repo, "add", "-f", "node_modules/dep.js")
+    _git(repo, "rm", "-q", "base.py")
+
+    assert changed_files(repo, staged=True) == []
+
+
+def test_changed_files_applies_ignore_files(repo):
+    """Test that staged files excluded by .vibeignore are dropped, as in a full walk."""
+    from vibe_sweeper.scanner import walk_project
+
+    (repo / ".vibeignore").write_text("vendor/\n*.gen.py\n!keep.gen.py\n")
+    (repo / "src" / "vendor" / "lib").mkdir(parents=True)
+    (repo / "src" / "vendor" / "lib" / "a.py").write_text("x = 1\n")
+    (repo / "src" / "b.gen.py").write_text("x = 1\n")
+    (repo / "src" / "keep.gen.py").write_text("x = 1\n")
+    (repo / "src" / "c.py").write_text("x = 1\n")
+    _git(repo, "add", "-f", "src")
+
+    staged = changed_files(repo, staged=True)
+
+    assert sorted(f.name for f in staged) == ["c.py", "keep.gen.py"]
+    assert sorted(staged) == sorted(f for f in walk_project(repo) if f.parent.name == "src")
+
+
+def test_changed_lines_reports_hunks(repo):
+    """Test that added and modified line numbers are collected."""
+    (repo / "base.py").write_text("x = 1\ny = 2\nz = 3\n")
+    _git(repo, "commit", "-q", "-am", "three lines")
+    (repo / "base.py").write_text("x = 10\ny = 2\nz = 3\nw = 4\n")
+
+    lines = changed_lines(repo, since="HEAD")
+
+    assert lines[str((repo / "base.py").resolve())] == {1, 4}
+
+
+def test_filter_changed_lines():
+    """Test filtering findings down to changed lines."""
+    findings = [
+        {"file": "a.py", "line": 2, "phrase": "p", "kind": "ai_phrase"},
+        {"file": "a.py", "line": 5, "phrase": "p", "kind": "ai_phrase"},
+        {"file": "a.py", "start_line": 8, "end_line": 30, "lines": 23, "kind": "long_comment_block"},
+        {"file": "b.py", "line": 1, "phrase": "p", "kind": "ai_phrase"},
+        {"file": "c.py", "line": 9, "phrase": "p", "kind": "ai_phrase"},
+    ]
+    lines = {"a.py": {2, 12}, "b.py": None}
+
+    kept = filter_changed_lines(findings, lines)
+
+    assert kept == [findings[0], findings[2], findings[3]]
+
+
+def test_changed_files_outside_git_repo(tmp_path):
+    """Test that a non-repository raises GitError."""
+    outside = tmp_path / "plain"
+    outside.mkdir()
+    (outside / ".git").write_text("not a repository")
+
+    with pytest.raises(GitError):
+        changed_files(outside, staged=True)
@@ -0,0 +1,66 @@
+"""Tests for gitignore-style pattern matching."""
+import pytest
+
+from vibe_sweeper.ignore import IgnoreFile, is_ignored, parse_rule
+
+
+def _ignored(lines, rel, is_dir=False):
+    return IgnoreFile.from_lines(lines).match(rel, is_dir) is True
+
+
+@pytest.mark.parametrize(
+    "pattern, rel, is_dir, expected",
+    [
+        ("*.log", "debug.log", False, True),
+        ("*.log", "logs/debug.log", False, True),
+        ("*.log", "debug.log.py", False, False),
+        ("coverage/", "coverage", True, True),
+        ("coverage/", "coverage", False, False),
+        ("/build.py", "build.py", False, True),
+        ("/build.py", "src/build.py", False, False),
+        ("docs/*.md", "docs/a.md", False, True),
+        ("docs/*.md", "docs/sub/a.md", False, False),
+        ("**/generated", "a/b/generated", True, True),
+        ("**/generated", "generated", True, True),
+        ("vendor/**", "vendor/x/y.js", False, True),
+        ("a/**/b.py", "a/b.py", False, True),
+        ("a/**/b.py", "a/x/y/b.py", False, True),
+        ("file?.py", "file1.py", False, True),
+        ("file?.py", "file10.py", False, False),
+        ("[ab].py", "a.py", False, True),
+        ("[!ab].py", "a.py", False, False),
+        ("[!ab].py", "c.py", False, True),
+        ("\\#hash.py", "#hash.py", False, True),
+    ],
+)
+def test_patterns(pattern, rel, is_dir, expected):
+    """Test individual gitignore pattern forms."""
+    assert _ignored([pattern], rel, is_dir) is expected
+
+
+def test_comments_and_blank_lines_are_skipped():
+    """Test that comments and blank lines produce no rules."""
+    assert parse_rule("# comment") is None
+    assert parse_rule("   ") is None
+    assert IgnoreFile.from_lines(["", "# x"]).rules == []
+
+
+def test_negation_last_rule_wins():
+    """Test that a later ! rule re-includes a path."""
+    ignore = IgnoreFile.from_lines(["*.py", "!keep.py"])
+
+    assert ignore.match("drop.py", False) is True
+    assert ignore.match("keep.py", False) is False
+    assert ignore.match("other.js", False) is None
+
+
+def test_deeper_ignore_file_takes_precedence():
+    """Test that nested ignore files override their parents."""
+    stack = (
+        ("", IgnoreFile.from_lines(["*.js"])),
+        ("web/", IgnoreFile.from_lines(["!app.js"])),
+    )
+
+    assert is_ignored(stack, "lib.js", False) is True
+    assert is_ignored(stack, "web/app.js", False) is False
+    assert is_ignored(stack, "web/other.js", False) is True
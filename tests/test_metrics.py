@@ -0,0 +1,49 @@
+"""Tests for the streaming project metrics."""
+from vibe_sweeper.analysis import MetricsAggregator, basic_stats
+from vibe_sweeper.findings import AI_PHRASE, LONG_COMMENT_BLOCK, Finding
+
+
+def test_basic_stats():
+    """Test the file and issue counts of materialised lists."""
+    assert basic_stats(["a.py", "b.py"], [Finding("a.py", AI_PHRASE, 1)]) == {"file_count": 2, "issue_count": 1}
+
+
+def test_metrics_aggregator_groups(tmp_path):
+    """Test the per-language, per-directory and per-kind breakdowns."""
+    metrics = MetricsAggregator(tmp_path)
+    main, helper, ui = str(tmp_path / "main.py"), str(tmp_path / "pkg" / "helper.py"), str(tmp_path / "pkg" / "ui.js")
+    metrics.add_file(main, 1000, 100)
+    metrics.add_finding(Finding(main, AI_PHRASE, 3, phrase="p"))
+    metrics.add_file(helper, 500, 250)
+    metrics.add_file(ui, 500, 0)
+    metrics.add_finding(Finding(ui, LONG_COMMENT_BLOCK, 1, end_line=30, lines=30))
+    metrics.add_finding(Finding(main, AI_PHRASE, 9, phrase="p"))
+
+    data = metrics.as_dict()
+
+    assert data["totals"] == {
+        "files": 3,
+        "lines": 2000,
+        "comment_lines": 350,
+        "findings": 3,
+        "comment_density": 0.175,
+        "findings_per_kloc": 1.5,
+    }
+    assert {name: counts["files"] for name, counts in data["languages"].items()} == {"javascript": 1, "python": 2}
+    assert data["languages"]["python"]["findings_per_kloc"] == 1.33
+    assert list(data["directories"]) == [".", "pkg"]
+    assert data["directories"]["pkg"]["comment_density"] == 0.25
+    assert data["directories"]["pkg"]["findings"] == 1
+    assert data["kinds"] == {AI_PHRASE: 2, LONG_COMMENT_BLOCK: 1}
+    assert metrics.as_dict() == data
+
+
+def test_metrics_aggregator_empty(tmp_path):
+    """Test that ratios of empty groups are zero rather than errors."""
+    metrics = MetricsAggregator(tmp_path)
+    metrics.add_file(str(tmp_path / "notes.txt"), 0, 0)
+
+    data = metrics.as_dict()
+
+    assert data["totals"]["comment_density"] == data["totals"]["findings_per_kloc"] == 0.0
+    assert list(data["languages"]) == ["other"]
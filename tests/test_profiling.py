@@ -0,0 +1,87 @@
+"""Tests for scan profiling."""
+import json
+from pathlib import Path
+
+from vibe_sweeper.config import load_default_config
+from vibe_sweeper.engine import collect_findings, iter_file_reports
+from vibe_sweeper.profiling import Profiler
+
+
+def _make_files(root: Path, count: int):
+    files = []
+    for i in range(count):
+        path = root / f"mod_{i:03d}.py"
+        path.write_text("# As an AI language model\n" * (i % 5) + "x = 1\n" * (i + 1))
+        files.append(path)
+    return files
+
+
+def test_profiler_records_stages_detectors_and_files(tmp_path):
+    """Test that a profiled scan times every file and detector."""
+    files = _make_files(tmp_path, 12)
+    profiler = Profiler(slowest=3)
+
+    list(iter_file_reports(files, load_default_config(), jobs=1, profiler=profiler))
+
+    profile = profiler.as_dict()
+    assert profile["stages"]["sniff"]["files"] == 12
+    assert profile["stages"]["read"]["bytes"] == sum(p.stat().st_size for p in files)
+    assert set(profile["detectors"]) == {"ai_phrases", "long_comment_blocks"}
+    assert profile["detectors"]["ai_phrases"]["files"] == 12
+    slowest = profile["slowest_files"]
+    assert len(slowest) == 3
+    assert [s["wall"] for s in slowest] == sorted((s["wall"] for s in slowest), reverse=True)
+
+
+def test_profiling_does_not_change_findings(tmp_path):
+    """Test that findings are the same with and without a profiler."""
+    files = _make_files(tmp_path, 20)
+    cfg = load_default_config()
+
+    profiled = [f for r in iter_file_reports(files, cfg, jobs=1, profiler=Profiler()) for f in r.findings]
+
+    assert profiled == collect_findings(files, cfg, jobs=1)
+
+
+def test_profiler_merges_worker_timings(tmp_path):
+    """Test that timings from pool workers reach the parent profiler."""
+    files = _make_files(tmp_path, 30)
+    profiler = Profiler()
+
+    list(iter_file_reports(files, load_default_config(), jobs=2, chunk_size=8, profiler=profiler))
+
+    assert profiler.stages["sniff"].files == 30
+    assert profiler.stages["chunk"].files == 30
+    assert profiler.detectors["long_comment_blocks"].files == 30
+
+
+def test_profiler_hooks_receive_stages_and_files(tmp_path):
+    """Test that hooks see each completed stage and each profiled file."""
+    files = _make_files(tmp_path, 4)
+    profiler = Profiler()
+    events = []
+    profiler.add_hook(lambda event, name, stats: events.append((event, name)))
+
+    with profiler.stage("scan") as stage:
+        list(iter_file_reports(files, load_default_config(), jobs=1, profiler=profiler))
+        stage.files = len(files)
+
+    assert [name for event, name in events if event == "file"] == [str(p) for p in files]
+    assert events[-1] == ("stage", "scan")
+    assert profiler.stages["scan"].files == 4
+
+
+def test_profiler_writes_json_and_chrome_trace(tmp_path):
+    """Test both profile output formats."""
+    profiler = Profiler()
+    with profiler.stage("walk"):
+        pass
+    profiler.add_file("a.py", 0.5, 0.4, 100, start=1.0)
+
+    profiler.write(tmp_path / "profile.json")
+    profiler.write(tmp_path / "trace.json", "chrome")
+
+    assert json.loads((tmp_path / "profile.json").read_text())["slowest_files"][0]["file"] == "a.py"
+    events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+    assert {e["name"] for e in events} == {"walk", "a.py"}
+    assert all(e["ph"] == "X" for e in events)
@@ -2,7 +2,18 @@
 from pathlib import Path
 import pytest
 
-from vibe_sweeper.report import build_markdown_report
+import io
+import json
+
+from vibe_sweeper.findings import AI_PHRASE, LONG_COMMENT_BLOCK, Finding
+from vibe_sweeper.report import (
+    JsonLinesReportWriter,
+    JsonReportWriter,
+    MarkdownReportWriter,
+    SarifReportWriter,
+    build_markdown_report,
+    create_writer,
+)
 
 
 def test_build_markdown_report_no_findings(tmp_path):
@@ -123,3 +134,133 @@ def test_build_markdown_report_mixed_findings(tmp_path):
     assert "AI phrase" in report
     assert "long comment block" in report
 
+
+
+def test_build_markdown_report_lists_skipped_files(tmp_path):
+    """Test that skipped files and their reasons are reported."""
+    files = [Path("a.py"), Path("b.min.js")]
+
+    report = build_markdown_report(tmp_path, files, [], skipped=[("b.min.js", "minified")])
+
+    assert "Files skipped: **1**" in report
+    assert "## Skipped files" in report
+    assert "- `b.min.js`: minified" in report
+
+
+def _stream_report(writer, findings, skipped=()):
+    writer.begin()
+    for finding in findings:
+        writer.add(finding)
+    for file, reason in skipped:
+        writer.skip(file, reason)
+    writer.end(3)
+
+
+def test_markdown_writer_streams_with_summary_trailer(tmp_path):
+    """Test that a non-seekable report gets its summary at the end."""
+    out = io.StringIO()
+    findings = [Finding("a.py", AI_PHRASE, n, phrase="in this code snippet") for n in (1, 2)]
+
+    _stream_report(MarkdownReportWriter(out, tmp_path), findings, skipped=[("b.js", "binary")])
+
+    report = out.getvalue()
+    assert report.index("## Findings") < report.index("## Summary")
+    assert "- `a.py`: line 2 – AI phrase: `in this code snippet`" in report
+    assert "Files scanned: **3**" in report
+    assert "Issues detected: **2**" in report
+    assert "- `b.js`: binary" in report
+
+
+def test_markdown_writer_patches_summary_in_place(tmp_path):
+    """Test that a seekable report gets the final counts at the top."""
+    path = tmp_path / "report.md"
+    with open(path, "w", encoding="utf-8") as out:
+        writer = MarkdownReportWriter(out, tmp_path, patch_summary=True)
+        _stream_report(writer, [Finding("a.py", AI_PHRASE, 1, phrase="p")] * 1000)
+
+    report = path.read_text(encoding="utf-8")
+    assert report.index("## Summary") < report.index("## Findings")
+    assert report.count("## Summary") == 1
+    assert "Issues detected: **1000**" in report
+    assert report.endswith("\n")
+
+
+def test_markdown_writer_without_findings(tmp_path):
+    """Test the streamed report of a clean project."""
+    out = io.StringIO()
+
+    _stream_report(MarkdownReportWriter(out, tmp_path), [])
+
+    assert "No issues detected. Looking clean. ✨" in out.getvalue()
+    assert "Issues detected: **0**" in out.getvalue()
+
+
+def test_jsonl_writer_one_record_per_line(tmp_path):
+    """Test that JSON Lines output has a finding per line and a summary last."""
+    out = io.StringIO()
+    findings = [Finding("a.py", AI_PHRASE, 1, phrase="p"), Finding("a.py", LONG_COMMENT_BLOCK, 3, end_line=9, lines=7)]
+
+    _stream_report(JsonLinesReportWriter(out, tmp_path), findings, skipped=[("b.js", "binary")])
+
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [Finding.from_dict(r) for r in records[:2]] == findings
+    assert records[2] == {"kind": "skipped_file", "file": "b.js", "reason": "binary"}
+    metrics = records[3].pop("metrics")
+    assert records[3] == {"kind": "summary", "files_scanned": 3, "issues": 2, "files_skipped": 1}
+    assert metrics["kinds"] == {AI_PHRASE: 1, LONG_COMMENT_BLOCK: 1}
+
+
+def test_json_writer_produces_one_document(tmp_path):
+    """Test that the streamed JSON report parses as a single document."""
+    out = io.StringIO()
+    findings = [Finding("a.py", AI_PHRASE, n, phrase="p") for n in (1, 2, 3)]
+
+    _stream_report(JsonReportWriter(out, tmp_path), findings, skipped=[("b.js", "binary")])
+
+    report = json.loads(out.getvalue())
+    assert report["root"] == str(tmp_path.resolve())
+    assert [Finding.from_dict(f) for f in report["findings"]] == findings
+    assert report["skipped"] == [{"file": "b.js", "reason": "binary"}]
+    assert report["summary"] == {"files_scanned": 3, "issues": 3, "files_skipped": 1}
+
+
+def test_json_writer_without_findings(tmp_path):
+    """Test that an empty findings array is still valid JSON."""
+    out = io.StringIO()
+
+    _stream_report(JsonReportWriter(out, tmp_path), [])
+
+    assert json.loads(out.getvalue())["findings"] == []
+
+
+def test_sarif_writer_produces_sarif_2_1_0(tmp_path):
+    """Test the SARIF log structure, rules and relative locations."""
+    out = io.StringIO()
+    source = str(tmp_path / "src" / "a.py")
+    findings = [
+        Finding(source, AI_PHRASE, 4, phrase="as an ai language model"),
+        Finding(source, LONG_COMMENT_BLOCK, 10, end_line=40, lines=31),
+    ]
+
+    _stream_report(SarifReportWriter(out, tmp_path), findings, skipped=[(str(tmp_path / "x.min.js"), "minified")])
+
+    log = json.loads(out.getvalue())
+    assert log["version"] == "2.1.0"
+    (run,) = log["runs"]
+    assert {rule["id"] for rule in run["tool"]["driver"]["rules"]} == {AI_PHRASE, LONG_COMMENT_BLOCK}
+    first, second = run["results"]
+    assert first["ruleId"] == AI_PHRASE
+    location = first["locations"][0]["physicalLocation"]
+    assert location["artifactLocation"] == {"uri": "src/a.py", "uriBaseId": "%SRCROOT%"}
+    assert location["region"] == {"startLine": 4, "endLine": 4}
+    assert second["locations"][0]["physicalLocation"]["region"] == {"startLine": 10, "endLine": 40}
+    assert run["originalUriBaseIds"]["%SRCROOT%"]["uri"].endswith("/")
+    notes = run["invocations"][0]["toolExecutionNotifications"]
+    assert notes[0]["message"]["text"] == "Skipped: minified"
+
+
+def test_create_writer_rejects_unknown_format(tmp_path):
+    """Test that create_writer only knows the supported formats."""
+    assert isinstance(create_writer("sarif", io.StringIO(), tmp_path), SarifReportWriter)
+    with pytest.raises(ValueError):
+        create_writer("xml", io.StringIO(), tmp_path)
@@ -1,4 +1,5 @@
 """Tests for scanner module."""
+import os
 import tempfile
 from pathlib import Path
 import pytest
@@ -7,6 +8,10 @@ from vibe_sweeper.scanner import (
     walk_project,
     detect_languages,
     read_file_text,
+    iter_line_batches,
+    sniff_file,
+    map_file,
+    MappedText,
     EXT_LANG_MAP,
 )
 
@@ -41,6 +46,94 @@ def test_walk_project_ignores_common_dirs(tmp_path):
     assert files[0].name == "test.py"
 
 
+def test_walk_project_respects_gitignore(tmp_path):
+    """Test that .gitignore and .vibeignore rules exclude files and directories."""
+    (tmp_path / ".gitignore").write_text("coverage/\n*.min.js\n/generated.py\n")
+    (tmp_path / ".vibeignore").write_text("legacy/\n")
+    for rel in ["app.py", "bundle.min.js", "generated.py", "pkg/generated.py",
+                "coverage/report.js", "legacy/old.py", "src/main.js"]:
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("x")
+
+    files = walk_project(tmp_path)
+
+    rels = sorted(f.relative_to(tmp_path.resolve()).as_posix() for f in files)
+    assert rels == ["app.py", "pkg/generated.py", "src/main.js"]
+
+
+def test_walk_project_nested_gitignore_and_negation(tmp_path):
+    """Test nested ignore files and ! re-inclusion."""
+    (tmp_path / ".gitignore").write_text("*.json\n")
+    (tmp_path / "conf").mkdir()
+    (tmp_path / "conf" / ".gitignore").write_text("!settings.json\n")
+    (tmp_path / "data.json").write_text("{}")
+    (tmp_path / "conf" / "settings.json").write_text("{}")
+    (tmp_path / "conf" / "other.json").write_text("{}")
+
+    files = walk_project(tmp_path)
+
+    assert [f.name for f in files] == ["settings.json"]
+
+
+def test_walk_project_can_skip_ignore_files(tmp_path):
+    """Test that ignore files can be disabled."""
+    (tmp_path / ".gitignore").write_text("*.py\n")
+    (tmp_path / "app.py").write_text("x")
+
+    assert walk_project(tmp_path) == []
+    assert len(walk_project(tmp_path, use_ignore_files=False)) == 1
+
+
+def test_walk_project_prunes_ignored_directories(tmp_path, monkeypatch):
+    """Test that ignored directories are never listed."""
+    (tmp_path / ".gitignore").write_text(".venv/\n")
+    deep = tmp_path / ".venv" / "lib" / "site-packages"
+    deep.mkdir(parents=True)
+    (deep / "mod.py").write_text("x")
+    (tmp_path / "app.py").write_text("x")
+    scanned = []
+    real_scandir = os.scandir
+
+    def recording_scandir(path):
+        scanned.append(str(path))
+        return real_scandir(path)
+
+    monkeypatch.setattr("vibe_sweeper.scanner.os.scandir", recording_scandir)
+
+    files = walk_project(tmp_path)
+
+    assert [f.name for f in files] == ["app.py"]
+    assert not any(".venv" in p for p in scanned)
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlinks not supported")
+def test_walk_project_symlink_loops(tmp_path):
+    """Test that symlinked directories are skipped or followed without looping."""
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "mod.py").write_text("x")
+    try:
+        os.symlink(tmp_path, tmp_path / "pkg" / "loop", target_is_directory=True)
+    except OSError:
+        pytest.skip("cannot create symlinks")
+
+    assert [f.name for f in walk_project(tmp_path)] == ["mod.py"]
+    assert [f.name for f in walk_project(tmp_path, follow_symlinks=True)] == ["mod.py"]
+
+
+def test_walk_project_order_matches_os_walk(tmp_path):
+    """Test that files come out in top-down os.walk order."""
+    for rel in ["b/x.py", "a/y.py", "a/c/z.py", "top.py", "b/d/w.py"]:
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("x")
+    expected = []
+    for dirpath, _, filenames in os.walk(tmp_path.resolve()):
+        expected.extend(Path(dirpath) / name for name in filenames)
+
+    assert walk_project(tmp_path) == expected
+
+
 def test_detect_languages():
     """Test language detection from file extensions."""
     files = [
@@ -101,3 +194,134 @@ def test_ext_lang_map_coverage():
     assert EXT_LANG_MAP[".js"] == "javascript"
     assert EXT_LANG_MAP[".ts"] == "typescript"
 
+
+
+def test_iter_line_batches_matches_splitlines(tmp_path):
+    """Test that batched reading splits lines exactly like str.splitlines()."""
+    content = "first\r\nsecond\rthird\f\nfourth\x85fifth\n\n" + "x" * 50 + "\r\nlast"
+    test_file = tmp_path / "test.py"
+    test_file.write_bytes(content.encode("utf-8"))
+
+    for batch_chars in (1, 7, 64, 1 << 16):
+        lines = []
+        for batch in iter_line_batches(test_file, batch_chars=batch_chars):
+            lines.extend(batch)
+        assert lines == content.splitlines()
+
+
+def test_iter_line_batches_empty_file(tmp_path):
+    """Test that an empty file yields no batches."""
+    test_file = tmp_path / "empty.py"
+    test_file.write_bytes(b"")
+
+    assert list(iter_line_batches(test_file)) == []
+
+
+def test_iter_line_batches_feeds_hasher(tmp_path):
+    """Test that the raw bytes are hashed while reading."""
+    import hashlib
+
+    data = "héllo\nworld\n".encode("utf-8") * 1000
+    test_file = tmp_path / "test.py"
+    test_file.write_bytes(data)
+    hasher = hashlib.sha256()
+
+    for _ in iter_line_batches(test_file, batch_chars=100, hasher=hasher):
+        pass
+
+    assert hasher.hexdigest() == hashlib.sha256(data).hexdigest()
+
+
+def test_iter_line_batches_raises_on_invalid_utf8(tmp_path):
+    """Test that undecodable input is reported to the caller."""
+    test_file = tmp_path / "test.py"
+    test_file.write_bytes(b"ok\n\xff\xfe\n")
+
+    with pytest.raises(UnicodeDecodeError):
+        list(iter_line_batches(test_file))
+
+
+def test_sniff_file_accepts_source(tmp_path):
+    """Test that ordinary source files are not skipped."""
+    path = tmp_path / "a.py"
+    path.write_text("def hello():\n    return 'x' * 2000\n" + "# " + "word " * 400 + "\n")
+
+    assert sniff_file(path) is None
+
+
+def test_sniff_file_detects_binary(tmp_path):
+    """Test that files with NUL bytes in their head are skipped."""
+    path = tmp_path / "a.js"
+    path.write_bytes(b"var a = 1;\0\0\x01")
+
+    assert sniff_file(path) == "binary"
+
+
+def test_sniff_file_detects_minified(tmp_path):
+    """Test that long lines with almost no whitespace are skipped."""
+    path = tmp_path / "bundle.min.js"
+    path.write_text("".join(f"function f{i}(a,b){{return a+b*{i}}};" for i in range(400)))
+
+    assert sniff_file(path) == "minified"
+
+
+def test_sniff_file_keeps_source_with_one_long_line(tmp_path):
+    """Test that a normal source file with one long, dense literal is scanned."""
+    import base64
+    import random
+
+    blob = base64.b64encode(random.Random(0).randbytes(1200)).decode("ascii")
+    body = "".join(f"def handler_{i}(request, value):\n    return request.get(value, {i})\n\n\n" for i in range(60))
+    path = tmp_path / "keys.py"
+    path.write_text(f'"""Fixtures."""\nKEY = "{blob}"\n\n' + body)
+
+    assert sniff_file(path) is None
+
+
+def test_sniff_file_size_limit(tmp_path):
+    """Test that max_file_bytes skips large files and 0 disables the limit."""
+    path = tmp_path / "a.py"
+    path.write_text("x = 1\n" * 100)
+
+    assert sniff_file(path, max_file_bytes=100).startswith("too large")
+    assert sniff_file(path, max_file_bytes=0) is None
+
+
+def test_map_file_small_and_large(tmp_path):
+    """Test that map_file yields the file bytes whether or not it maps them."""
+    path = tmp_path / "a.py"
+    path.write_bytes(b"x = 1\n" * 100)
+
+    with map_file(path) as small:
+        assert small == path.read_bytes()
+    with map_file(path, min_mmap_bytes=1) as mapped:
+        assert mapped[:] == path.read_bytes()
+
+
+def test_mapped_text_lines():
+    """Test line numbers, bounds and decoding on raw bytes."""
+    text = MappedText("one\ntwo \u00e9\nthree".encode("utf-8"))
+
+    assert text.line_number(0) == 1
+    assert text.line_number(text.buffer.index(b"three")) == 3
+    assert text.line_number(4) == 2
+    assert text.line_bounds(5) == (4, 10)
+    assert text.line_text(5) == "two \u00e9"
+    assert [offset for offset, _ in text.iter_windows(size=1)] == [0, 4, 11]
+    assert list(MappedText(b"a\nb\n\n").iter_windows()) == [(0, b"a\nb\n")]
+
+
+@pytest.mark.parametrize(
+    "data, plain",
+    [
+        (b"plain ascii\n", True),
+        ("caf\u00e9 \U0001f600\n".encode("utf-8"), True),
+        (b"crlf\r\n", False),
+        ("nbsp\u00a0#\n".encode("utf-8"), False),
+        ("line\u2028sep".encode("utf-8"), False),
+        ("\u212a".encode("utf-8"), False),
+    ],
+)
+def test_mapped_text_is_plain(data, plain):
+    """Test detection of bytes whose text semantics differ from ASCII."""
+    assert MappedText(data).is_plain is plain
@@ -0,0 +1,72 @@
+"""Import-time regression tests for the CLI."""
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Modules only some commands need; importing the CLI must not load them.
+LAZY_MODULES = (
+    "yaml",
+    "asyncio",
+    "multiprocessing",
+    "numpy",
+    "vibe_sweeper.config",
+    "vibe_sweeper.daemon",
+    "vibe_sweeper.engine",
+    "vibe_sweeper.gitdiff",
+    "vibe_sweeper.refactors",
+)
+
+# Time spent importing vibe_sweeper's own modules (typer and the standard
+# library excluded). Override on slow machines.
+BUDGET_US = int(os.environ.get("VIBE_SWEEPER_IMPORT_BUDGET_MS", "60")) * 1000
+
+
+def _import_times(code: str):
+    """Self import time in microseconds per module, from ``python -X importtime``."""
+    done = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in done.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line[len("import time:") :].split("|")
+        try:
+            self_us = int(fields[0])
+        except ValueError:
+            continue  # the header line
+        times[fields[2].strip()] = self_us
+    return times
+
+
+def test_cli_import_skips_lazy_modules():
+    """Test that importing the CLI does not load command-specific modules."""
+    loaded = _import_times("import vibe_sweeper.cli")
+
+    assert "vibe_sweeper.cli" in loaded
+    assert [name for name in LAZY_MODULES if name in loaded] == []
+
+
+def test_cli_import_time_budget():
+    """Test that vibe_sweeper's own modules import within the budget."""
+    best = min(
+        sum(us for name, us in _import_times("import vibe_sweeper.cli").items() if name.startswith("vibe_sweeper"))
+        for _ in range(3)
+    )
+
+    assert best <= BUDGET_US, f"vibe_sweeper modules took {best / 1000:.1f} ms to import"
+
+
+def test_default_config_loads_without_yaml(tmp_path):
+    """Test that a warm precompiled default config does not import the YAML parser."""
+    env = dict(os.environ, XDG_CACHE_HOME=str(tmp_path))
+    code = "import sys; from vibe_sweeper.config import load_default_config; load_default_config(); print('yaml' in sys.modules)"
+
+    runs = [
+        subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True).stdout.strip()
+        for _ in range(2)
+    ]
+
+    assert runs == ["True", "False"]